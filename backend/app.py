@@ -1,25 +1,69 @@
+import hmac
 import os
-from flask import Flask, request, jsonify
+import queue
+import threading
+import time
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import json
-import google.generativeai as genai
+import click
 from dotenv import load_dotenv
 
-# Import modularized utilities
-from utils.text_processing import extract_keywords, normalize_requirement
-from utils.matching import is_semantic_match, education_match, education_semantic_match
-from utils.ocr import extract_text_from_pdf, extract_text_from_image
-
+# Load .env before the utilities read their configuration from the environment
 load_dotenv()
 
+# Import modularized utilities
+from utils.text_processing import REQUIREMENT_CATEGORIES, extract_keywords, flatten_requirements
+from utils.matching import ResumeIndex, match_requirements
+from utils.resume_store import ResumeStore
+from utils.ingestion import IngestionError, MAX_UPLOAD_BYTES, spool_upload
+from utils.job_store import JobStore
+from utils.ocr_service import OCRBusyError, get_ocr_service
+from utils.execution import StageRunner
+from utils.profiling import PROFILE_HEADER, ProfileCapture
+from utils.providers import get_provider
+from utils.extraction import EXTRACTION_SCHEMA, parse_extraction, validate_extraction
+from utils.singleflight import SingleFlight, COALESCE_KINDS
+from utils.compaction import compact_prompt_inputs, resume_over_budget
+from utils.cache import create_cache, make_cache_key, normalize_job_description
+from utils.embeddings import create_embedder, EMBEDDING_THRESHOLD
+from utils.scoring import build_job_fit_score
+from utils.batch import score_batch, rank_results, BATCH_MAX_PAIRS
+from utils.metrics import (REGISTRY, REQUEST_SECONDS, MODEL_PROMPT_CHARS, MODEL_RESPONSE_CHARS, PROMPT_REDUCTION,
+                           observe_stage, register_cache_metrics, register_ocr_metrics)
+
 app = Flask(__name__)
 CORS(app)
 
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-if not GENAI_API_KEY:
-    raise RuntimeError("GENAI_API_KEY not set in environment variables or .env file.")
+# Werkzeug rejects larger requests with 413 before reading them; the margin leaves room for the other form fields
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 1024 * 1024
+
+# Bump when the extraction prompts change so cached results are not reused
+PROMPT_VERSION = '2'
+
+# Job title and requirements keyed by job description, language and prompt version
+extraction_cache = create_cache('job_extraction')
+
+# Extracted resume text keyed by the hash of the uploaded file
+resume_store = ResumeStore()
 
-genai.configure(api_key=GENAI_API_KEY)
+# Identical concurrent prompts of these kinds share one model call (COVERLY_COALESCE_KINDS)
+model_flights = {kind: SingleFlight(kind) for kind in COALESCE_KINDS}
+
+# Optional embedding similarity for requirements that do not match lexically (COVERLY_EMBEDDINGS)
+embedder = create_embedder()
+
+# Job postings stored by ID with their requirements and precomputed matching artifacts
+job_store = JobStore(embedder=embedder)
+
+# Add a Server-Timing header with per-stage timings to every response (or send X-Server-Timing: 1)
+SERVER_TIMING = os.getenv("COVERLY_SERVER_TIMING", "0") == "1"
+
+# When set, clearing the whole extraction cache requires this value in the X-Coverly-Admin header
+ADMIN_TOKEN = os.getenv("COVERLY_ADMIN_TOKEN", "")
+
+register_cache_metrics({'job_extraction': extraction_cache, 'resumes': resume_store, 'jobs': job_store})
+register_ocr_metrics(get_ocr_service)
 
 # Language code to name mapping
 LANGUAGE_MAP = {
@@ -33,6 +77,7 @@ LANGUAGE_PROMPTS = {
     "English": {
         "extraction": """
 Extract the following from this job description as a JSON object with these keys:
+- "job_title": the most accurate and concise job title for this position, 2–8 words
 - "skills": list of specific skills (e.g. "Python", "TensorFlow", "Prompt Engineering")
 - "tools": list of tools/technologies (e.g. "AWS", "Docker", "Figma")
 - "certifications": list of certifications (e.g. "AWS Certified Solutions Architect")
@@ -40,10 +85,6 @@ Extract the following from this job description as a JSON object with these keys
 - "experience": list of years of experience or explicit requirements (e.g. "3+ years experience in software development")
 
 Only include clear, standardized, non-duplicated, non-overlapping, and meaningful items. Do not include adjectives, parentheticals, or vague phrases. Do not include entire sentences.
-""",
-        "job_title": """
-Based on this job description, what is the most accurate and concise job title for this position?
-Just return the job title only. Limit your answer to 2–8 words.
 """,
         "cover_letter": """
 Write a cover letter in English in a {tone} tone that matches the resume and job description below.
@@ -52,6 +93,7 @@ Write a cover letter in English in a {tone} tone that matches the resume and job
     "French": {
         "extraction": """
 Extrayez les éléments suivants de cette description de poste sous forme d'objet JSON avec ces clés :
+- "job_title": le titre de poste le plus précis et concis, en 2-8 mots
 - "skills": liste des compétences spécifiques (ex: "Python", "TensorFlow", "Prompt Engineering")
 - "tools": liste des outils/technologies (ex: "AWS", "Docker", "Figma")
 - "certifications": liste des certifications (ex: "AWS Certified Solutions Architect")
@@ -59,10 +101,6 @@ Extrayez les éléments suivants de cette description de poste sous forme d'obje
 - "experience": liste des années d'expérience ou des exigences explicites (ex: "3+ ans d'expérience en développement logiciel")
 
 N'incluez que des éléments clairs, standardisés, non dupliqués, non chevauchants et significatifs. N'incluez pas d'adjectifs, de parenthèses ou de phrases vagues. N'incluez pas de phrases entières.
-""",
-        "job_title": """
-Sur la base de cette description de poste, quel est le titre de poste le plus précis et concis ?
-Retournez uniquement le titre du poste. Limitez votre réponse à 2-8 mots.
 """,
         "cover_letter": """
 Rédigez une lettre de motivation en français sur un ton {tone} qui correspond au CV et à la description du poste ci-dessous.
@@ -71,6 +109,7 @@ Rédigez une lettre de motivation en français sur un ton {tone} qui correspond
     "Arabic": {
         "extraction": """
 استخرج العناصر التالية من وصف الوظيفة ككائن JSON بهذه المفاتيح:
+- "job_title": عنوان الوظيفة الأكثر دقة وإيجازًا، في 2-8 كلمات
 - "skills": قائمة المهارات المحددة (مثال: "Python", "TensorFlow", "Prompt Engineering")
 - "tools": قائمة الأدوات/التقنيات (مثال: "AWS", "Docker", "Figma")
 - "certifications": قائمة الشهادات (مثال: "AWS Certified Solutions Architect")
@@ -78,10 +117,6 @@ Rédigez une lettre de motivation en français sur un ton {tone} qui correspond
 - "experience": قائمة سنوات الخبرة أو المتطلبات الصريحة (مثال: "3+ سنوات خبرة في تطوير البرمجيات")
 
 قم بتضمين العناصر الواضحة والموحدة وغير المكررة وغير المتداخلة والهادفة فقط. لا تقم بتضمين الصفات أو الأقواس أو العبارات الغامضة. لا تقم بتضمين جمل كاملة.
-""",
-        "job_title": """
-بناءً على وصف الوظيفة هذا، ما هو عنوان الوظيفة الأكثر دقة وإيجازًا؟
-قم بإرجاع عنوان الوظيفة فقط. قم بتقييد إجابتك إلى 2-8 كلمات.
 """,
         "cover_letter": """
 اكتب خطاب تغطية باللغة العربية بأسلوب {tone} يتناسب مع السيرة الذاتية ووصف الوظيفة أدناه.
@@ -89,165 +124,656 @@ Rédigez une lettre de motivation en français sur un ton {tone} qui correspond
     }
 }
 
+def generate_text(provider, prompt, kind, schema=None):
+    """
+    Sends a prompt to the model provider.
+    Args:
+        provider: Model provider (see utils.providers).
+        prompt (str): Prompt text.
+        kind (str): Kind of prompt ("extraction" or "cover_letter").
+        schema (dict, optional): JSON schema the response must follow.
+    Returns:
+        str: Text of the model response.
+    """
+    MODEL_PROMPT_CHARS.labels(kind=kind).observe(len(prompt))
+    flight = model_flights.get(kind)
+    if flight is None:
+        text = provider.generate(prompt, kind, schema)
+    else:
+        text = flight.do(model_call_key(provider, prompt, kind, schema), provider.generate, prompt, kind, schema)
+    MODEL_RESPONSE_CHARS.labels(kind=kind).observe(len(text))
+    return text
+
+def model_call_key(provider, prompt, kind, schema=None):
+    """
+    Builds the key identifying a model call, so that identical concurrent calls can be coalesced.
+    Args:
+        provider: Model provider.
+        prompt (str): Prompt text.
+        kind (str): Kind of prompt.
+        schema (dict, optional): JSON schema of the response.
+    Returns:
+        str: Hash of the provider, kind, prompt and schema.
+    """
+    return make_cache_key(provider.name, kind, json.dumps(schema, sort_keys=True), prompt)
+
+def job_cache_key(kind, language, job_description):
+    """
+    Builds the cache key of a job description result.
+    Args:
+        kind (str): Kind of result ("extraction").
+        language (str): Language name.
+        job_description (str): Job description text.
+    Returns:
+        str: Cache key.
+    """
+    return make_cache_key(kind, PROMPT_VERSION, language, normalize_job_description(job_description))
+
+def stream_text(provider, prompt, kind):
+    """
+    Streams the response to a prompt from the model provider.
+    Args:
+        provider: Model provider (see utils.providers).
+        prompt (str): Prompt text.
+        kind (str): Kind of prompt.
+    Yields:
+        str: Text chunks as they are generated.
+    """
+    MODEL_PROMPT_CHARS.labels(kind=kind).observe(len(prompt))
+    size = 0
+    for chunk in provider.stream(prompt, kind):
+        size += len(chunk)
+        yield chunk
+    MODEL_RESPONSE_CHARS.labels(kind=kind).observe(size)
+
+def build_extraction_prompt(language, job_description):
+    """
+    Builds the prompt extracting the job title and requirements.
+    Args:
+        language (str): Language name.
+        job_description (str): Job description text.
+    Returns:
+        str: Prompt text.
+    """
+    lang_prompts = LANGUAGE_PROMPTS.get(language, LANGUAGE_PROMPTS["English"])
+    return lang_prompts["extraction"] + "\n\nJob Description:\n" + job_description
+
+def extract_job_details_checked(provider, language, job_description):
+    """
+    Extracts the job title and requirements of a job description with a single
+    schema-constrained model call, reusing cached results. Only complete results
+    (see parse_extraction) are cached.
+    Args:
+        provider: Model provider (see utils.providers).
+        language (str): Language name.
+        job_description (str): Job description text.
+    Returns:
+        tuple: (details, complete) with details as in extract_job_details.
+    """
+    cache_key = job_cache_key('extraction', language, job_description)
+    details = extraction_cache.get(cache_key)
+    if details is not None:
+        return details, True
+
+    with observe_stage('extraction_llm'):
+        extraction_text = generate_text(provider, build_extraction_prompt(language, job_description), 'extraction', EXTRACTION_SCHEMA)
+    details, complete = parse_extraction(extraction_text)
+    if complete:
+        extraction_cache.set(cache_key, details)
+    return details, complete
+
+def extract_job_details(provider, language, job_description):
+    """
+    Extracts the job title and requirements of a job description (see extract_job_details_checked).
+    Shared by the generation routes and /extract-job-title, so each job description costs one model call.
+    Returns:
+        dict: {"job_title": str, "requirements": requirements grouped by category}.
+    """
+    return extract_job_details_checked(provider, language, job_description)[0]
+
+def load_job_details(provider, params):
+    """
+    Returns the job details of a generation request: those of the stored job when the
+    request names a job_id, otherwise extracted from the job description.
+    Args:
+        provider: Model provider (see utils.providers).
+        params (dict): Request parameters from parse_generation_form.
+    Returns:
+        dict: {"job_title": str, "requirements": requirements grouped by category}.
+    """
+    if params['job'] is not None:
+        return params['job'].details
+    return extract_job_details(provider, params['language'], params['job_description'])
+
+def extract_requirements(provider, language, job_description):
+    """
+    Extracts the requirements of a job description (see extract_job_details).
+    Returns:
+        dict: Requirements grouped by category.
+    """
+    return extract_job_details(provider, language, job_description)['requirements']
+
+def busy_response(error):
+    """
+    Builds the response sent when the OCR service is saturated.
+    Args:
+        error (OCRBusyError): The raised error.
+    Returns:
+        tuple: JSON response with status 503 and a Retry-After header.
+    """
+    return jsonify({'error': str(error)}), 503, {'Retry-After': str(error.retry_after)}
+
+def parse_generation_form(form, filename=None, open_resume=None):
+    """
+    Validates the cover letter generation form shared by the generation routes of the
+    Flask and ASGI apps.
+    Args:
+        form: Mapping of the form fields.
+        filename (str, optional): Name of the uploaded resume file, if any.
+        open_resume (callable, optional): Returns the stream of the uploaded resume, which is
+            spooled and checked here (see utils.ingestion).
+    Returns:
+        tuple: (params, None) with the request parameters, or (None, (message, status)).
+    """
+    resume_id = form.get('resume_id')
+    job_description = form.get('job_description')
+
+    # A job_id from /jobs replaces the job description and skips extraction
+    job = None
+    if form.get('job_id'):
+        job = job_store.get(form.get('job_id'))
+        if job is None:
+            return None, ('Unknown job_id', 404)
+        job_description = job.job_description
+
+    if not (filename or resume_id) or not job_description:
+        return None, ('Missing resume or job description', 400)
+
+    # A resume ID from /resumes skips both the upload and text extraction
+    if filename:
+        try:
+            upload = spool_upload(open_resume(), filename)
+        except IngestionError as e:
+            return None, (str(e), e.status)
+        load_resume = lambda: resume_store.ingest(upload)[:2]
+    else:
+        upload = None
+        resume_entry = resume_store.get(resume_id)
+        if resume_entry is None:
+            return None, ('Unknown or expired resume_id. Please upload the resume again.', 404)
+        load_resume = lambda: (resume_id, resume_entry)
+
+    # Convert language code to full name; a stored job defaults to its own language
+    language = LANGUAGE_MAP.get(form.get('language', 'en'), 'English')
+    if job is not None and not form.get('language'):
+        language = job.language
+
+    return {
+        'load_resume': load_resume,
+        'resume_upload': upload,
+        'resume_id': resume_id,
+        'job_description': job_description,
+        'job': job,
+        'tone': form.get('tone', 'Formal'),
+        'language': language,
+        'edited_letter': form.get('edited_letter', None),
+        'generation_seed': form.get('generation_seed', None),
+    }, None
+
+def read_generation_form():
+    """
+    Reads and validates the cover letter generation form of the current Flask request.
+    Returns:
+        tuple: (params, None) with the request parameters, or (None, error_response).
+    """
+    resume_file = request.files.get('resume')
+    params, error = parse_generation_form(request.form, resume_file.filename if resume_file else None,
+                                          (lambda: resume_file.stream) if resume_file else None)
+    if error:
+        message, status = error
+        return None, (jsonify({'error': message}), status)
+    return params, None
+
+def build_cover_letter_prompt(language, tone, resume_text, job_description, edited_letter=None):
+    """
+    Builds the cover letter prompt.
+    Args:
+        language (str): Language name.
+        tone (str): Requested tone.
+        resume_text (str): Resume text.
+        job_description (str): Job description text.
+        edited_letter (str, optional): Previous version of the letter to improve upon.
+    Returns:
+        str: Prompt text.
+    """
+    lang_prompts = LANGUAGE_PROMPTS.get(language, LANGUAGE_PROMPTS["English"])
+    prompt = lang_prompts["cover_letter"].format(tone=tone) + f"\n\nResume:\n{resume_text}\n\nJob Description:\n{job_description}"
+    if edited_letter:
+        prompt += f"\n\nPrevious version of the letter:\n{edited_letter}\n\nPlease improve upon this version while maintaining the same language and tone."
+    return prompt
+
+def build_compact_cover_letter_prompt(params, resume_text, job_details=None):
+    """
+    Compacts the resume, job description and previous letter to the prompt token budgets
+    (see utils.compaction) and builds the cover letter prompt.
+    Args:
+        params (dict): Request parameters from parse_generation_form.
+        resume_text (str): Resume text.
+        job_details (dict, optional): Extraction result, used to rank the sections of a resume
+            over budget by the job requirements (callers wait for it then, see resume_over_budget).
+    Returns:
+        tuple: (prompt, prompt_size) where prompt_size reports the size before and after compaction.
+    """
+    requirements_json = job_details['requirements'] if job_details else None
+    resume_text, job_description, edited_letter, prompt_size = compact_prompt_inputs(resume_text, params['job_description'], params['edited_letter'], requirements_json, params['language'])
+    PROMPT_REDUCTION.observe(prompt_size['reduction'])
+    return build_cover_letter_prompt(params['language'], params['tone'], resume_text, job_description, edited_letter), prompt_size
+
+def score_resume(requirements_json, resume_text, language=None, job=None):
+    """
+    Matches the extracted requirements against the resume and builds the job-fit score.
+    Args:
+        requirements_json (dict): Requirements grouped by category.
+        resume_text (str): Resume text.
+        language (str, optional): Language of the requirements, which selects the normalization
+            pipeline (see utils.languages). Defaults to English.
+        job (PreparedJob, optional): Stored job the requirements come from. Its precomputed
+            artifacts are used and it is matched in its own language.
+    Returns:
+        dict: Job-fit score.
+    """
+    if job is not None:
+        matched, missing = match_requirements(job.unique_requirements, ResumeIndex(resume_text, job.language), embedder, EMBEDDING_THRESHOLD, job)
+        return build_job_fit_score(matched, missing, len(job.unique_requirements))
+    with observe_stage('requirement_normalization'):
+        unique_requirements = flatten_requirements(requirements_json, language)
+    matched, missing = match_requirements(unique_requirements, ResumeIndex(resume_text, language), embedder, EMBEDDING_THRESHOLD)
+    return build_job_fit_score(matched, missing, len(unique_requirements))
+
+def run_cover_letter_generation(stages, capture=None):
+    """
+    Generates a cover letter and job-fit score for the current Flask request.
+    Args:
+        stages (StageRunner): Runner of the request stages.
+        capture (ProfileCapture, optional): Profile capture of the request, which records its inputs.
+    Returns:
+        Flask response, or a (response, status[, headers]) tuple on error.
+    """
+    with stages.measure('upload_parse'):
+        params, error = read_generation_form()
+    if error:
+        return error
+    if capture is not None:
+        if params['resume_upload'] is not None:
+            capture.record_upload(params['resume_upload'])
+        capture.record_text('job_description', params['job_description'])
+        capture.record_text('edited_letter', params['edited_letter'])
+        capture.manifest.update({'language': params['language'], 'tone': params['tone'], 'resume_id': params['resume_id'],
+                                 'job_id': params['job'].job_id if params['job'] is not None else None,
+                                 'embeddings': embedder.backend.name if embedder else 'off'})
+
+    try:
+        with stages:
+            provider = get_provider()
+
+            # Requirement extraction only needs the job description, so it runs alongside OCR
+            stages.submit('resume_text', params['load_resume'])
+            stages.submit('extraction', load_job_details, provider, params)
+
+            # The cover letter only needs the resume and job description, so it starts
+            # as soon as OCR is done and runs while requirements are being matched
+            resume_id, resume_entry = stages.result('resume_text')
+            # Sections of a resume over budget are ranked by the extracted requirements, so the prompt
+            # waits for them; a resume within budget is only cleaned and its prompt starts right away
+            if resume_over_budget(resume_entry['text']):
+                stages.result('extraction')
+            with stages.measure('compaction'):
+                cover_letter_prompt, prompt_size = build_compact_cover_letter_prompt(params, resume_entry['text'], stages.peek('extraction'))
+            stages.submit('cover_letter', generate_text, provider, cover_letter_prompt, 'cover_letter')
+
+            job_details = stages.result('extraction')
+            if capture is not None:
+                capture.record_text('resume_text', resume_entry['text'])
+                capture.record_json('job_details', job_details)
+
+            with stages.measure('matching'):
+                job_fit_score = score_resume(job_details['requirements'], resume_entry['text'], params['language'], params['job'])
+
+            cover_letter = stages.result('cover_letter')
+
+        g.stage_timings = stages.summary()
+        return jsonify({
+            'cover_letter': cover_letter,
+            'resume_id': resume_id,
+            'job_title': job_details['job_title'],
+            'job_fit_score': job_fit_score,
+            'prompt_size': prompt_size,
+            'timings': g.stage_timings
+        })
+
+    except IngestionError as e:
+        return jsonify({'error': str(e)}), e.status
+    except OCRBusyError as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/generate-cover-letter', methods=['POST'])
 def generate_cover_letter():
     """
     Flask route to generate a cover letter based on the uploaded resume and job description.
+    Requests sending the X-Coverly-Profile admin header (or every request with COVERLY_PROFILE=1)
+    are profiled, and the response names their capture in the same header (see utils.profiling).
     Returns:
         JSON response containing the generated cover letter and job-fit score.
     """
-    resume_file = request.files.get('resume')
-    job_description = request.form.get('job_description')
-    tone = request.form.get('tone', 'Formal')
-    language_code = request.form.get('language', 'en')
-    edited_letter = request.form.get('edited_letter', None)
-    generation_seed = request.form.get('generation_seed', None)
+    capture = ProfileCapture.for_request(request.headers, 'generate_cover_letter')
+    if capture is None:
+        return run_cover_letter_generation(StageRunner())
 
-    if not resume_file or not job_description:
-        return jsonify({'error': 'Missing resume or job description'}), 400
+    # Stages run inline so that the profile sees them; OCR workers are separate processes
+    # and only appear as waits (replay_profile.py runs OCR in process)
+    with capture:
+        response = app.make_response(run_cover_letter_generation(StageRunner(concurrent=False), capture))
+    capture.save(status=response.status_code, timings=g.get('stage_timings'))
+    response.headers[PROFILE_HEADER] = capture.capture_id
+    return response
 
-    try:
-        # Convert language code to full name
-        language = LANGUAGE_MAP.get(language_code, 'English')
-        
-        # Extract text from PDF or image using OCR utility functions
-        if resume_file.filename.lower().endswith('.pdf'):
-            resume_text = extract_text_from_pdf(resume_file)
-        elif resume_file.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            resume_text = extract_text_from_image(resume_file.stream)
-        else:
-            return jsonify({'error': 'Unsupported file type. Please upload a PDF or image.'}), 400
+def sse_event(event, data):
+    """
+    Formats a server-sent event with a JSON payload.
+    Args:
+        event (str): Event name.
+        data: JSON-serializable payload.
+    Returns:
+        str: Encoded event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        # Use Gemini model to extract requirements from job description
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        
-        # Get language-specific prompt
-        lang_prompts = LANGUAGE_PROMPTS.get(language, LANGUAGE_PROMPTS["English"])
-        extraction_prompt = lang_prompts["extraction"] + "\n\nJob Description:\n" + job_description
+@app.route('/generate-cover-letter/stream', methods=['POST'])
+def generate_cover_letter_stream():
+    """
+    Streaming variant of /generate-cover-letter using server-sent events.
+    Sends a "score" event with the job-fit score as soon as matching finishes, then a "token"
+    event per chunk of the cover letter, and finally a "done" event (or an "error" event).
+    Returns:
+        text/event-stream response.
+    """
+    stages = StageRunner()
+    with stages.measure('upload_parse'):
+        params, error = read_generation_form()
+    if error:
+        return error
+
+    def events():
+        chunks = queue.Queue()
+        stopped = threading.Event()
+
+        def stream_letter(provider, prompt):
+            # Runs on the stage executor and hands chunks to the response generator
+            try:
+                for chunk in stream_text(provider, prompt, 'cover_letter'):
+                    if stopped.is_set():
+                        break
+                    chunks.put(('token', chunk))
+            except Exception as e:
+                chunks.put(('error', str(e)))
+            finally:
+                chunks.put(None)
 
-        extraction_response = model.generate_content(extraction_prompt)
         try:
-            requirements_json = json.loads(extraction_response.text)
-        except Exception:
-            # Fallback: Try to extract lists from the text if JSON parsing fails
-            requirements_json = {"skills": [], "tools": [], "certifications": [], "education": [], "experience": []}
-            import re
-            for key in requirements_json.keys():
-                match = re.search(rf'"{key}"\s*:\s*\[(.*?)\]', extraction_response.text, re.DOTALL)
-                if match:
-                    items = re.findall(r'"(.*?)"', match.group(1))
-                    requirements_json[key] = items
-
-        # Flatten and clean requirements
-        all_requirements = []
-        for cat in ["skills", "tools", "certifications", "education", "experience"]:
-            clean_items = [normalize_requirement(req) for req in requirements_json.get(cat, [])]
-            clean_items = [req for req in clean_items if req]
-            all_requirements.extend([(cat.capitalize(), req) for req in clean_items])
-
-        # Remove duplicates
-        seen = set()
-        unique_requirements = []
-        for cat, req in all_requirements:
-            key = (cat, req.lower())
-            if key not in seen:
-                seen.add(key)
-                unique_requirements.append((cat, req))
-
-        matched = []
-        missing = []
-        resume_text_full = resume_text
-        # Match requirements to resume
-        for cat, req in unique_requirements:
-            if cat == "Education" and education_semantic_match(req, resume_text_full):
-                matched.append((cat, req))
-                continue
-            if cat == "Experience":
-                if is_semantic_match(req, resume_text_full) or any(word in resume_text_full.lower() for word in ["intern", "internship", "project"]):
-                    matched.append((cat, req))
-                else:
-                    missing.append((cat, req))
-                continue
-            if is_semantic_match(req, resume_text_full):
-                matched.append((cat, req))
-            else:
-                missing.append((cat, req))
-
-        def group_by_category(items):
-            """
-            Groups a list of (category, requirement) tuples by category.
-            Args:
-                items (list): List of (category, requirement) tuples.
-            Returns:
-                dict: Dictionary grouped by category.
-            """
-            grouped = {}
-            for cat, req in items:
-                grouped.setdefault(cat, []).append(req)
-            return grouped
-
-        matched_grouped = group_by_category(matched)
-        missing_grouped = group_by_category(missing)
-
-        # Clean up empty categories and sort
-        for group in [matched_grouped, missing_grouped]:
-            for cat in list(group.keys()):
-                group[cat] = sorted(set([r for r in group[cat] if r and len(r) < 120]))
-                if not group[cat]:
-                    del group[cat]
-
-        # Calculate job-fit score
-        total = len(unique_requirements) if unique_requirements else 1
-        score = int((len(matched) / total) * 100)
-        if score < 30:
-            match_level = "lowMatch"
-            match_icon = "🔴"
-            border_color = "red"
-            encouragement = "Consider tailoring your resume more closely to this role 💪"
-        elif score < 60:
-            match_level = "moderateMatch"
-            match_icon = "🟡"
-            border_color = "yellow"
-            encouragement = "Good start! You could improve your match by highlighting more relevant experience 🎯"
+            with stages:
+                provider = get_provider()
+                stages.submit('resume_text', params['load_resume'])
+                stages.submit('extraction', load_job_details, provider, params)
+
+                resume_id, resume_entry = stages.result('resume_text')
+                # Sections of a resume over budget are ranked by the extracted requirements, so the prompt
+                # waits for them; a resume within budget is only cleaned and its prompt starts right away
+                if resume_over_budget(resume_entry['text']):
+                    stages.result('extraction')
+                with stages.measure('compaction'):
+                    cover_letter_prompt, prompt_size = build_compact_cover_letter_prompt(params, resume_entry['text'], stages.peek('extraction'))
+                stages.submit('cover_letter', stream_letter, provider, cover_letter_prompt)
+
+                job_details = stages.result('extraction')
+                with stages.measure('matching'):
+                    job_fit_score = score_resume(job_details['requirements'], resume_entry['text'], params['language'], params['job'])
+                yield sse_event('score', {'job_fit_score': job_fit_score, 'resume_id': resume_id, 'job_title': job_details['job_title']})
+
+                while True:
+                    item = chunks.get(timeout=stages.timeout)
+                    if item is None:
+                        break
+                    kind, text = item
+                    if kind == 'error':
+                        yield sse_event('error', {'error': text})
+                        return
+                    yield sse_event('token', {'text': text})
+                stages.result('cover_letter')
+            yield sse_event('done', {'resume_id': resume_id, 'prompt_size': prompt_size, 'timings': stages.summary()})
+        except IngestionError as e:
+            yield sse_event('error', {'error': str(e), 'status': e.status})
+        except OCRBusyError as e:
+            yield sse_event('error', {'error': str(e), 'retry_after': e.retry_after})
+        except Exception as e:
+            yield sse_event('error', {'error': str(e) or e.__class__.__name__})
+        finally:
+            # Stop reading the model stream if the client went away
+            stopped.set()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def validate_batch_items(name, items):
+    """
+    Checks the "resumes" or "job_descriptions" list of a /score-batch request.
+    Args:
+        name (str): Name of the list in the request.
+        items: The list.
+    Returns:
+        str or None: Error message, or None if the list is valid.
+    """
+    if not isinstance(items, list):
+        return f'{name} must be a list of objects'
+    keys = set()
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            return f'{name}[{position}] must be an object'
+        key = str(item.get('id', position))
+        # Results are keyed by id, so a duplicate would silently replace an earlier item
+        if key in keys:
+            return f'Duplicate id {key!r} in {name}'
+        keys.add(key)
+    return None
+
+@app.route('/score-batch', methods=['POST'])
+def score_batch_route():
+    """
+    Flask route to score resumes against job descriptions without writing cover letters.
+    Expects JSON with "resumes" (objects with an "id" and either a "resume_id" from /resumes or
+    a "text"), "job_descriptions" (objects with an "id" and either a "job_id" from /jobs or a
+    "text"), and optionally "language", "sort", "top_k" and "group_by" ("resume" or "job").
+    Returns:
+        JSON response containing the job-fit score of every resume/job pair.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'The request body must be a JSON object'}), 400
+    resumes = data.get('resumes') or []
+    job_descriptions = data.get('job_descriptions') or []
+    language = LANGUAGE_MAP.get(data.get('language', 'en'), 'English')
+    top_k = data.get('top_k')
+    group_by = data.get('group_by')
+
+    if not resumes or not job_descriptions:
+        return jsonify({'error': 'Missing resumes or job descriptions'}), 400
+    for name, items in (('resumes', resumes), ('job_descriptions', job_descriptions)):
+        error = validate_batch_items(name, items)
+        if error:
+            return jsonify({'error': error}), 400
+    if len(resumes) * len(job_descriptions) > BATCH_MAX_PAIRS:
+        return jsonify({'error': f'Too many pairs. At most {BATCH_MAX_PAIRS} resume/job pairs are allowed.'}), 400
+    if group_by not in (None, 'resume', 'job'):
+        return jsonify({'error': 'group_by must be "resume" or "job"'}), 400
+    if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+        return jsonify({'error': 'top_k must be a positive integer'}), 400
+
+    # Parse each resume once
+    resume_texts = {}
+    for position, resume in enumerate(resumes):
+        key = str(resume.get('id', position))
+        if resume.get('resume_id'):
+            entry = resume_store.get(resume['resume_id'])
+            if entry is None:
+                return jsonify({'error': f'Unknown or expired resume_id for resume {key}'}), 404
+            resume_texts[key] = entry['text']
+        elif resume.get('text'):
+            resume_texts[key] = resume['text']
         else:
-            match_level = "strongMatch"
-            match_icon = "🟢"
-            border_color = "green"
-            encouragement = "Great match! Your experience aligns well with this role 🎉"
-
-        # Generate cover letter using Gemini
-        cover_letter_prompt = lang_prompts["cover_letter"].format(tone=tone) + f"\n\nResume:\n{resume_text}\n\nJob Description:\n{job_description}"
-        if edited_letter:
-            cover_letter_prompt += f"\n\nPrevious version of the letter:\n{edited_letter}\n\nPlease improve upon this version while maintaining the same language and tone."
-        
-        cover_letter_response = model.generate_content(cover_letter_prompt)
-        cover_letter = cover_letter_response.text
+            return jsonify({'error': f'Resume {key} needs a resume_id or text'}), 400
+
+    # Extract each distinct job description once; stored jobs need no extraction
+    job_keys = {}
+    distinct_jobs = {}
+    stored_jobs = {}
+    for position, job in enumerate(job_descriptions):
+        key = str(job.get('id', position))
+        if job.get('job_id'):
+            prepared = job_store.get(str(job['job_id']))
+            if prepared is None:
+                return jsonify({'error': f'Unknown job_id for job description {key}'}), 404
+            job_keys[key] = f"job:{prepared.job_id}"
+            stored_jobs[job_keys[key]] = prepared
+            continue
+        if not job.get('text'):
+            return jsonify({'error': f'Job description {key} needs a job_id or text'}), 400
+        job_key = job_cache_key('extraction', language, job['text'])
+        job_keys[key] = job_key
+        distinct_jobs.setdefault(job_key, job['text'])
+
+    try:
+        with StageRunner() as stages:
+            provider = get_provider()
+            extracted = stages.map('extraction', lambda text: extract_requirements(provider, language, text), distinct_jobs.values())
+            job_requirements = {job_key: flatten_requirements(requirements_json, language) for job_key, requirements_json in zip(distinct_jobs, extracted)}
+            job_requirements.update(stored_jobs)
+
+            with stages.measure('matching'):
+                scores = score_batch(resume_texts, job_requirements, language=language)
 
+        scores_by_pair = {(resume_key, job_key): score for resume_key, job_key, score in scores}
+        results = [
+            {'resume': resume_key, 'job': job_id, 'job_fit_score': scores_by_pair[(resume_key, job_key)]}
+            for resume_key in resume_texts
+            for job_id, job_key in job_keys.items()
+        ]
+        if data.get('sort') or top_k or group_by:
+            results = rank_results(results, group_by, top_k)
+
+        g.stage_timings = stages.summary()
         return jsonify({
-            'cover_letter': cover_letter,
-            'job_fit_score': {
-                'score': score,
-                'match_level': match_level,
-                'match_icon': match_icon,
-                'border_color': border_color,
-                'explanation': [
-                    f"Your resume matches {score}% of the job requirements.",
-                    encouragement
-                ],
-                'keywords': {
-                    'matched': [req for _, req in matched],
-                    'missing': [req for _, req in missing]
-                },
-                'requirements': {
-                    'matched': matched_grouped,
-                    'missing': missing_grouped
-                }
-            }
+            'results': results,
+            'distinct_job_descriptions': len(distinct_jobs),
+            'timings': g.stage_timings
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/resumes', methods=['POST'])
+def upload_resume():
+    """
+    Flask route to upload a resume once and get an ID to reuse in /generate-cover-letter.
+    Returns:
+        JSON response containing the resume ID and whether it was already stored.
+    """
+    resume_file = request.files.get('resume')
+    if not resume_file:
+        return jsonify({'error': 'Missing resume'}), 400
+
+    try:
+        resume_id, entry, cached = resume_store.ingest(spool_upload(resume_file.stream, resume_file.filename))
+        return jsonify({'resume_id': resume_id, 'cached': cached, 'characters': len(entry['text'])})
+    except IngestionError as e:
+        return jsonify({'error': str(e)}), e.status
+    except OCRBusyError as e:
+        return busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Flask route to store a job posting and get an ID to reuse in /generate-cover-letter and /score-batch.
+    Expects JSON with a "job_description", and optionally "job_id" (generated from the text
+    if omitted), "language", and already extracted "job_title" and "requirements" (grouped
+    by category), which skip the model call.
+    Returns:
+        JSON response containing the job ID, title and requirements.
+    """
+    data = request.get_json(silent=True) or {}
+    job_description = data.get('job_description')
+    if not job_description:
+        return jsonify({'error': 'Missing job description'}), 400
+    language = LANGUAGE_MAP.get(data.get('language', 'en'), 'English')
+
+    if data.get('requirements') is not None and not isinstance(data['requirements'], dict):
+        return jsonify({'error': 'requirements must be an object of lists by category'}), 400
+
+    try:
+        if data.get('requirements') is not None:
+            details = validate_extraction({'job_title': data.get('job_title'), **data['requirements']})
+            # Same rule as model extractions: a job without requirements would score every resume 0%
+            if not any(details['requirements'].values()):
+                return jsonify({'error': f'requirements must hold lists of strings under at least one of: {", ".join(REQUIREMENT_CATEGORIES)}'}), 400
+        else:
+            details, complete = extract_job_details_checked(get_provider(), language, job_description)
+            # Stored jobs never expire, so an unusable extraction is not stored
+            if not complete:
+                return jsonify({'error': 'No requirements could be extracted from the job description. Please try again or send the requirements.'}), 502
+        job_id = job_store.put(job_description, language, details, data.get('job_id'))
+        return jsonify({'job_id': job_id, **details})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """
+    Flask route to list stored job postings, most recently updated first.
+    Accepts "limit" (between 1 and 1000) and "offset" query parameters.
+    Returns:
+        JSON response containing the ID, language and title of each posting.
+    """
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    offset = request.args.get('offset', 0, type=int)
+    if offset < 0:
+        return jsonify({'error': 'offset must not be negative'}), 400
+    return jsonify({'jobs': job_store.list(limit, offset)})
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Flask route to read a stored job posting.
+    Returns:
+        JSON response containing the posting, its title and requirements.
+    """
+    job = job_store.describe(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job_id'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """
+    Flask route to remove a stored job posting.
+    Returns:
+        JSON response telling whether the posting existed.
+    """
+    return jsonify({'removed': job_store.delete(job_id)})
+
 @app.route('/extract-job-title', methods=['POST'])
 def extract_job_title():
     """
@@ -266,16 +792,148 @@ def extract_job_title():
         # Convert language code to full name
         language = LANGUAGE_MAP.get(language_code, 'English')
         
-        # Use Gemini model to extract job title
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        prompt = LANGUAGE_PROMPTS[language]["job_title"] + "\n\nJob Description:\n" + job_description
-        
-        response = model.generate_content(prompt)
-        job_title = response.text.strip()
+        # The title comes from the same cached extraction as the requirements
+        job_title = extract_job_details(get_provider(), language, job_description)['job_title']
         
         return jsonify({'job_title': job_title})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Flask route serving stage latencies, cache counters, model prompt/response sizes and
+    OCR pool state in the Prometheus text format.
+    Returns:
+        text/plain response with all metrics.
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.errorhandler(413)
+def request_too_large(error):
+    """
+    Answers requests over MAX_CONTENT_LENGTH with a JSON error like the other routes.
+    """
+    return jsonify({'error': f"The request is too large. The limit is {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB."}), 413
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Records the request duration and adds the Server-Timing header when enabled.
+    """
+    started = g.get('request_started')
+    if started is not None and request.endpoint != 'metrics':
+        REQUEST_SECONDS.labels(endpoint=request.endpoint or 'unknown', status=response.status_code).observe(time.perf_counter() - started)
+    timings = g.get('stage_timings')
+    if timings and (SERVER_TIMING or request.headers.get('X-Server-Timing') == '1'):
+        response.headers['Server-Timing'] = ', '.join(f'{name};dur={duration}' for name, duration in timings.items())
+    return response
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Flask route to inspect the job description and resume caches and the job store.
+    Returns:
+        JSON response containing the cache sizes and hit/miss counters.
+    """
+    return jsonify({'job_descriptions': extraction_cache.stats(), 'resumes': resume_store.stats(), 'jobs': job_store.stats()})
+
+@app.route('/ocr/stats', methods=['GET'])
+def ocr_stats():
+    """
+    Flask route to inspect the OCR worker pool.
+    Returns:
+        JSON response containing the queue depth, counters and latencies of the OCR service.
+    """
+    return jsonify(get_ocr_service().stats())
+
+@app.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """
+    Flask route to invalidate cached job description results.
+    Removes the entries of the given job description, or every entry when the body is
+    {"all": true} (with the X-Coverly-Admin header when COVERLY_ADMIN_TOKEN is set).
+    Returns:
+        JSON response containing the number of removed entries.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Send a job_description, or "all": true to clear the whole cache'}), 400
+    job_description = data.get('job_description')
+    if job_description:
+        language = LANGUAGE_MAP.get(data.get('language', 'en'), 'English')
+        return jsonify({'removed': int(extraction_cache.delete(job_cache_key('extraction', language, job_description)))})
+
+    if data.get('all') is not True:
+        return jsonify({'error': 'Send a job_description, or "all": true to clear the whole cache'}), 400
+    if ADMIN_TOKEN and not hmac.compare_digest(request.headers.get('X-Coverly-Admin', '').encode(), ADMIN_TOKEN.encode()):
+        return jsonify({'error': 'Clearing the whole cache requires the admin token'}), 403
+    return jsonify({'removed': extraction_cache.clear()})
+
+@app.cli.command('import-jobs')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--language', default='en', help='Language code of postings that do not give one.')
+@click.option('--timeout', default=600.0, help='Seconds to wait for all extractions.')
+def import_jobs(path, language, timeout):
+    """
+    Imports job postings from a JSON array or a JSON Lines file into the job store.
+    Each posting is an object with a "job_description" (or "text") and optionally "job_id"
+    (or "id"), "language", "job_title" and "requirements". Postings without requirements
+    are extracted concurrently, reusing the extraction cache, and everything is stored in
+    one transaction.
+    """
+    with open(path, encoding='utf-8') as f:
+        content = f.read()
+    if content.lstrip().startswith('['):
+        postings = json.loads(content)
+    else:
+        postings = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    jobs = []
+    # Stored jobs never expire, so postings without usable requirements are left out
+    skipped = 0
+    for position, posting in enumerate(postings):
+        job_description = posting.get('job_description') or posting.get('text')
+        if not job_description:
+            raise click.ClickException(f'Posting {position} has no job_description')
+        if posting.get('requirements') is not None and not isinstance(posting['requirements'], dict):
+            raise click.ClickException(f'Posting {position} has requirements that are not grouped by category')
+        job = {
+            'job_id': posting.get('job_id') or posting.get('id'),
+            'job_description': job_description,
+            'language': LANGUAGE_MAP.get(posting.get('language', language), 'English'),
+            'details': None,
+        }
+        if posting.get('requirements') is not None:
+            details = validate_extraction({'job_title': posting.get('job_title'), **posting['requirements']})
+            if not any(details['requirements'].values()):
+                skipped += 1
+                click.echo(f'Skipped posting {position}: its requirements hold no lists of strings under {", ".join(REQUIREMENT_CATEGORIES)}', err=True)
+                continue
+            job['details'] = details
+        jobs.append(job)
+
+    pending = [job for job in jobs if job['details'] is None]
+    with StageRunner(timeout=timeout) as stages:
+        provider = get_provider()
+        extracted = stages.map('extraction', lambda job: extract_job_details_checked(provider, job['language'], job['job_description']), pending)
+    failed = 0
+    for job, (details, complete) in zip(pending, extracted):
+        if complete:
+            job['details'] = details
+        else:
+            failed += 1
+            click.echo(f'Skipped posting {job["job_id"] or job["job_description"][:40]!r}: no requirements could be extracted', err=True)
+    given = len(jobs) - len(pending)
+    jobs = [job for job in jobs if job['details'] is not None]
+
+    job_ids = job_store.put_many(jobs)
+    click.echo(f'Imported {len(job_ids)} job postings ({len(pending) - failed} extracted, {given} with requirements, '
+               f'{skipped + failed} skipped) in {stages.summary()["total"] / 1000:.1f}s into {job_store.path}')
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,400 @@
+"""
+ASGI deployment mode. The model-bound routes (cover letter generation, its streaming
+variant and job title extraction) are served with asyncio, so a request waiting on the
+model holds no thread; every other route is forwarded to the Flask app.
+
+Run with:
+    uvicorn asgi:app --port 5000 --timeout-graceful-shutdown 30
+or:
+    python asgi.py
+"""
+import asyncio
+import functools
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as flask_backend
+from app import (LANGUAGE_MAP, build_compact_cover_letter_prompt, build_extraction_prompt, extraction_cache, job_cache_key,
+                 model_call_key, parse_generation_form, score_resume, sse_event)
+from utils.batch import shutdown_batch_pool
+from utils.compaction import resume_over_budget
+from utils.execution import AsyncStageRunner, get_executor, shutdown_executor
+from utils.extraction import EXTRACTION_SCHEMA, parse_extraction
+from utils.ingestion import IngestionError
+from utils.metrics import MODEL_PROMPT_CHARS, MODEL_RESPONSE_CHARS, REQUEST_SECONDS, observe_stage
+from utils.ocr import shutdown_pdf_pool
+from utils.ocr_service import OCRBusyError, get_ocr_service
+from utils.providers import get_provider
+from utils.singleflight import AsyncSingleFlight, COALESCE_KINDS
+
+# Model-bound requests handled at once; further requests wait up to REQUEST_QUEUE_WAIT seconds, then get a 503
+MAX_CONCURRENT_REQUESTS = int(os.getenv("COVERLY_MAX_CONCURRENT_REQUESTS", "256"))
+REQUEST_QUEUE_WAIT = float(os.getenv("COVERLY_REQUEST_QUEUE_WAIT", "5"))
+BUSY_RETRY_AFTER = int(os.getenv("COVERLY_BUSY_RETRY_AFTER", "2"))
+# Seconds to wait for in-flight requests on shutdown before the worker pools are stopped
+SHUTDOWN_TIMEOUT = float(os.getenv("COVERLY_SHUTDOWN_TIMEOUT", "30"))
+# Threads serving the routes forwarded to the Flask app
+WSGI_WORKERS = int(os.getenv("COVERLY_WSGI_WORKERS", "16"))
+
+# Identical concurrent prompts of these kinds share one model call (COVERLY_COALESCE_KINDS)
+model_flights = {kind: AsyncSingleFlight(kind) for kind in COALESCE_KINDS}
+
+
+class ConcurrencyLimiter:
+    """
+    ASGI middleware bounding the number of model-bound requests in flight. Requests
+    over the limit wait for a slot for up to queue_wait seconds and are then answered
+    with 503 and Retry-After. Also records the request duration metric and, on shutdown,
+    rejects new requests while the in-flight ones drain.
+
+    Args:
+        app: Wrapped ASGI app.
+        paths (dict): Paths the limit applies to -> endpoint name used in the metrics.
+        limit (int): Maximum number of requests in flight.
+        queue_wait (float): Seconds a request may wait for a slot.
+    """
+
+    def __init__(self, app, paths, limit=MAX_CONCURRENT_REQUESTS, queue_wait=REQUEST_QUEUE_WAIT):
+        self.app = app
+        self.paths = paths
+        self.queue_wait = queue_wait
+        self.in_flight = 0
+        self.draining = False
+        self._slots = asyncio.Semaphore(limit)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def _reject(self, scope, receive, send, message):
+        response = JSONResponse({'error': message}, 503, headers={'Retry-After': str(BUSY_RETRY_AFTER)})
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        endpoint = self.paths.get(scope.get('path')) if scope['type'] == 'http' else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+        if self.draining:
+            await self._reject(scope, receive, send, 'The server is shutting down. Please try again shortly.')
+            return
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_wait)
+        except asyncio.TimeoutError:
+            await self._reject(scope, receive, send, 'The server is busy. Please try again shortly.')
+            return
+
+        started = time.perf_counter()
+        status = {}
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._slots.release()
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+            REQUEST_SECONDS.labels(endpoint=endpoint, status=status.get('code', 500)).observe(time.perf_counter() - started)
+
+    async def drain(self, timeout):
+        """
+        Stops accepting requests and waits for the in-flight ones to finish.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if every request finished in time.
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+async def generate_text_async(provider, prompt, kind, schema=None):
+    """
+    Awaitable variant of app.generate_text.
+    """
+    MODEL_PROMPT_CHARS.labels(kind=kind).observe(len(prompt))
+    flight = model_flights.get(kind)
+    if flight is None:
+        text = await provider.generate_async(prompt, kind, schema)
+    else:
+        text = await flight.do(model_call_key(provider, prompt, kind, schema), provider.generate_async, prompt, kind, schema)
+    MODEL_RESPONSE_CHARS.labels(kind=kind).observe(len(text))
+    return text
+
+
+async def stream_text_async(provider, prompt, kind):
+    """
+    Asynchronous variant of app.stream_text.
+    """
+    MODEL_PROMPT_CHARS.labels(kind=kind).observe(len(prompt))
+    size = 0
+    async for chunk in provider.stream_async(prompt, kind):
+        size += len(chunk)
+        yield chunk
+    MODEL_RESPONSE_CHARS.labels(kind=kind).observe(size)
+
+
+async def run_blocking(fn, *args):
+    """
+    Runs a blocking call (SQLite lookups, spooling and hashing an upload, text processing)
+    on the shared stage executor, so that it does not stall the other requests on the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), functools.partial(fn, *args))
+
+
+async def extract_job_details_async(provider, language, job_description):
+    """
+    Awaitable variant of app.extract_job_details, sharing its cache entries. Only complete
+    results (see parse_extraction) are cached.
+    """
+    cache_key = job_cache_key('extraction', language, job_description)
+    details = await run_blocking(extraction_cache.get, cache_key)
+    if details is not None:
+        return details
+
+    with observe_stage('extraction_llm'):
+        extraction_text = await generate_text_async(provider, build_extraction_prompt(language, job_description), 'extraction', EXTRACTION_SCHEMA)
+    details, complete = parse_extraction(extraction_text)
+    if complete:
+        await run_blocking(extraction_cache.set, cache_key, details)
+    return details
+
+
+async def load_job_details_async(provider, params):
+    """
+    Awaitable variant of app.load_job_details.
+    """
+    if params['job'] is not None:
+        return params['job'].details
+    return await extract_job_details_async(provider, params['language'], params['job_description'])
+
+
+async def read_generation_form(request):
+    """
+    Reads and validates the cover letter generation form of a Starlette request.
+
+    Returns:
+        tuple: (params, None) with the request parameters, or (None, error_response).
+    """
+    # Same limit as the Flask app, checked before Starlette spools the body
+    max_length = flask_backend.app.config['MAX_CONTENT_LENGTH']
+    length = request.headers.get('content-length', '')
+    if length.isdigit() and int(length) > max_length:
+        return None, JSONResponse({'error': f'The request is too large. The limit is {max_length // (1024 * 1024)} MB.'}, 413)
+    form = await request.form()
+    upload = form.get('resume')
+    if isinstance(upload, str) or not getattr(upload, 'filename', None):
+        upload = None
+    # Starlette has already spooled the upload, so copying it does not wait on the client, but
+    # copying and hashing it and the job and resume store lookups block, so they run on the executor
+    params, error = await run_blocking(parse_generation_form, form, upload.filename if upload else None,
+                                       (lambda: upload.file) if upload else None)
+    if error:
+        message, status = error
+        return None, JSONResponse({'error': message}, status)
+    return params, None
+
+
+def error_response(error):
+    """
+    Builds the JSON error response of a failed request, with 503 and Retry-After when
+    the OCR service is saturated, and the status of the rejection for invalid uploads.
+    """
+    if isinstance(error, OCRBusyError):
+        return JSONResponse({'error': str(error)}, 503, headers={'Retry-After': str(error.retry_after)})
+    if isinstance(error, IngestionError):
+        return JSONResponse({'error': str(error)}, error.status)
+    return JSONResponse({'error': str(error)}, 500)
+
+
+def add_server_timing(request, response, timings):
+    if flask_backend.SERVER_TIMING or request.headers.get('X-Server-Timing') == '1':
+        response.headers['Server-Timing'] = ', '.join(f'{name};dur={duration}' for name, duration in timings.items())
+    return response
+
+
+async def generate_cover_letter(request):
+    """
+    Async variant of the Flask /generate-cover-letter route, with the same form and response.
+    """
+    stages = AsyncStageRunner()
+    with stages.measure('upload_parse'):
+        params, error = await read_generation_form(request)
+    if error:
+        return error
+
+    try:
+        async with stages:
+            provider = get_provider()
+
+            # OCR and PDF parsing run on the executor while the extraction call is awaited
+            stages.submit('resume_text', params['load_resume'])
+            stages.submit('extraction', load_job_details_async, provider, params)
+
+            resume_id, resume_entry = await stages.result('resume_text')
+            # Sections of a resume over budget are ranked by the extracted requirements, so the prompt
+            # waits for them; a resume within budget is only cleaned and its prompt starts right away
+            if await run_blocking(resume_over_budget, resume_entry['text']):
+                await stages.result('extraction')
+            cover_letter_prompt, prompt_size = await stages.run('compaction', build_compact_cover_letter_prompt, params, resume_entry['text'], stages.peek('extraction'))
+            stages.submit('cover_letter', generate_text_async, provider, cover_letter_prompt, 'cover_letter')
+
+            job_details = await stages.result('extraction')
+            job_fit_score = await stages.run('matching', score_resume, job_details['requirements'], resume_entry['text'], params['language'], params['job'])
+
+            cover_letter = await stages.result('cover_letter')
+
+        timings = stages.summary()
+        return add_server_timing(request, JSONResponse({
+            'cover_letter': cover_letter,
+            'resume_id': resume_id,
+            'job_title': job_details['job_title'],
+            'job_fit_score': job_fit_score,
+            'prompt_size': prompt_size,
+            'timings': timings
+        }), timings)
+
+    except Exception as e:
+        return error_response(e)
+
+
+async def generate_cover_letter_stream(request):
+    """
+    Async variant of the Flask /generate-cover-letter/stream route, with the same events.
+    """
+    stages = AsyncStageRunner()
+    with stages.measure('upload_parse'):
+        params, error = await read_generation_form(request)
+    if error:
+        return error
+
+    async def events():
+        chunks = asyncio.Queue()
+
+        async def stream_letter(provider, prompt):
+            try:
+                async for chunk in stream_text_async(provider, prompt, 'cover_letter'):
+                    await chunks.put(('token', chunk))
+            except Exception as e:
+                await chunks.put(('error', str(e)))
+            finally:
+                await chunks.put(None)
+
+        try:
+            # Leaving the block cancels the model stream, also when the client disconnects
+            async with stages:
+                provider = get_provider()
+                stages.submit('resume_text', params['load_resume'])
+                stages.submit('extraction', load_job_details_async, provider, params)
+
+                resume_id, resume_entry = await stages.result('resume_text')
+                # Sections of a resume over budget are ranked by the extracted requirements, so the prompt
+                # waits for them; a resume within budget is only cleaned and its prompt starts right away
+                if await run_blocking(resume_over_budget, resume_entry['text']):
+                    await stages.result('extraction')
+                cover_letter_prompt, prompt_size = await stages.run('compaction', build_compact_cover_letter_prompt, params, resume_entry['text'], stages.peek('extraction'))
+                stages.submit('cover_letter', stream_letter, provider, cover_letter_prompt)
+
+                job_details = await stages.result('extraction')
+                job_fit_score = await stages.run('matching', score_resume, job_details['requirements'], resume_entry['text'], params['language'], params['job'])
+                yield sse_event('score', {'job_fit_score': job_fit_score, 'resume_id': resume_id, 'job_title': job_details['job_title']})
+
+                while True:
+                    item = await asyncio.wait_for(chunks.get(), stages.timeout)
+                    if item is None:
+                        break
+                    kind, text = item
+                    if kind == 'error':
+                        yield sse_event('error', {'error': text})
+                        return
+                    yield sse_event('token', {'text': text})
+                await stages.result('cover_letter')
+            yield sse_event('done', {'resume_id': resume_id, 'prompt_size': prompt_size, 'timings': stages.summary()})
+        except IngestionError as e:
+            yield sse_event('error', {'error': str(e), 'status': e.status})
+        except OCRBusyError as e:
+            yield sse_event('error', {'error': str(e), 'retry_after': e.retry_after})
+        except Exception as e:
+            yield sse_event('error', {'error': str(e) or e.__class__.__name__})
+
+    return StreamingResponse(events(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def extract_job_title(request):
+    """
+    Async variant of the Flask /extract-job-title route.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    job_description = data.get('job_description')
+    if not job_description:
+        return JSONResponse({'error': 'Missing job description'}, 400)
+
+    try:
+        language = LANGUAGE_MAP.get(data.get('language', 'en'), 'English')
+        details = await extract_job_details_async(get_provider(), language, job_description)
+        return JSONResponse({'job_title': details['job_title']})
+    except Exception as e:
+        return error_response(e)
+
+
+def shutdown_pools():
+    """
+    Stops the stage executor and the PDF, OCR and batch worker processes.
+    """
+    shutdown_executor()
+    shutdown_pdf_pool()
+    get_ocr_service().shutdown()
+    shutdown_batch_pool()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Finish the requests in flight, then stop the worker pools
+    await limiter.drain(SHUTDOWN_TIMEOUT)
+    await asyncio.get_running_loop().run_in_executor(None, shutdown_pools)
+
+
+routes = [
+    Route('/generate-cover-letter', generate_cover_letter, methods=['POST']),
+    Route('/generate-cover-letter/stream', generate_cover_letter_stream, methods=['POST']),
+    Route('/extract-job-title', extract_job_title, methods=['POST']),
+    # Everything else (score batches, resume uploads, metrics, caches) is served by the Flask app
+    Mount('/', app=WSGIMiddleware(flask_backend.app, workers=WSGI_WORKERS)),
+]
+
+starlette_app = Starlette(routes=routes, lifespan=lifespan)
+limiter = ConcurrencyLimiter(starlette_app, {
+    '/generate-cover-letter': 'generate_cover_letter',
+    '/generate-cover-letter/stream': 'generate_cover_letter_stream',
+    '/extract-job-title': 'extract_job_title',
+})
+# CORS preflight requests are answered before they reach the limiter
+app = CORSMiddleware(limiter, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("COVERLY_HOST", "127.0.0.1"), port=int(os.getenv("COVERLY_PORT", "5000")),
+                timeout_graceful_shutdown=int(SHUTDOWN_TIMEOUT))
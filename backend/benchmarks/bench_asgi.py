@@ -0,0 +1,107 @@
+"""
+Compares how /generate-cover-letter throughput scales with the number of concurrent
+clients when served by the synchronous Flask app with a fixed number of worker threads
+and by the ASGI app, using a local fake model and fake OCR. Needs httpx.
+
+Usage:
+    python benchmarks/bench_asgi.py [--requests 128] [--flask-workers 8] [--model-latency 0.5]
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("COVERLY_CACHE_PATH", os.path.join(workdir, "cache.sqlite3"))
+os.environ.setdefault("COVERLY_JOB_STORE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+
+import httpx  # noqa: E402
+
+import app as backend  # noqa: E402
+import asgi  # noqa: E402
+from utils import resume_store  # noqa: E402
+from utils.providers import FakeProvider, set_provider  # noqa: E402
+from bench_concurrency import JOB_DESCRIPTION, RESUME_TEXT  # noqa: E402
+
+RESUME_PDF = b"%PDF-1.4 resume"
+
+
+def form(i):
+    # A new job description per request, so that every request waits on the model
+    return {"job_description": f"{JOB_DESCRIPTION}\nReference {i}"}
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)] * 1000,
+    }
+
+
+def run_flask(requests, clients, workers):
+    # A synchronous server handles at most `workers` requests at once; the rest queue
+    server_threads = threading.Semaphore(workers)
+
+    def one(i):
+        start = time.perf_counter()
+        with server_threads:
+            res = backend.app.test_client().post("/generate-cover-letter", data=dict(
+                form(i), resume=(io.BytesIO(RESUME_PDF), "resume.pdf")), content_type="multipart/form-data")
+        assert res.status_code == 200, res.get_json()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run_asgi(requests, clients):
+    transport = httpx.ASGITransport(app=asgi.app)
+    slots = asyncio.Semaphore(clients)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def one(i):
+            async with slots:
+                start = time.perf_counter()
+                res = await client.post("/generate-cover-letter", data=form(i),
+                                        files={"resume": ("resume.pdf", RESUME_PDF, "application/pdf")})
+                assert res.status_code == 200, res.text
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--flask-workers", type=int, default=8)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    set_provider(FakeProvider(latency=args.model_latency))
+    resume_store.extract_text_from_pdf = lambda _: RESUME_TEXT
+
+    print(f"{args.requests} requests, model latency {args.model_latency * 1000:.0f} ms per call, "
+          f"{args.flask_workers} Flask worker threads")
+    print(f"{'clients':>8} {'server':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for clients in args.clients:
+        requests = max(args.requests, clients)
+        for name, result in (("flask", run_flask(requests, clients, args.flask_workers)),
+                             ("asgi", asyncio.run(run_asgi(requests, clients)))):
+            print(f"{clients:>8} {name:>6} {result['rps']:>8.1f} {result['p50']:>9.1f} {result['p95']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Simulates a burst of candidates submitting the same job description at once and compares
+model calls and latency of /extract-job-title with and without request coalescing, on
+both the Flask and the ASGI app, using a local fake model.
+
+Usage:
+    python benchmarks/bench_coalescing.py [--burst 50] [--model-latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("COVERLY_CACHE_PATH", os.path.join(workdir, "cache.sqlite3"))
+os.environ.setdefault("COVERLY_JOB_STORE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+
+import httpx  # noqa: E402
+
+import app as backend  # noqa: E402
+import asgi  # noqa: E402
+from utils.providers import FakeProvider, set_provider  # noqa: E402
+from utils.singleflight import AsyncSingleFlight, SingleFlight  # noqa: E402
+from bench_concurrency import JOB_DESCRIPTION  # noqa: E402
+
+
+def burst_flask(burst):
+    def one(_):
+        start = time.perf_counter()
+        res = backend.app.test_client().post("/extract-job-title", json={"job_description": JOB_DESCRIPTION})
+        assert res.status_code == 200, res.get_json()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        return list(pool.map(one, range(burst)))
+
+
+async def burst_asgi(burst):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi.app), base_url="http://bench") as client:
+        async def one():
+            start = time.perf_counter()
+            res = await client.post("/extract-job-title", json={"job_description": JOB_DESCRIPTION})
+            assert res.status_code == 200, res.text
+            return time.perf_counter() - start
+
+        return await asyncio.gather(*(one() for _ in range(burst)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"burst of {args.burst} identical job descriptions, model latency {args.model_latency * 1000:.0f} ms")
+    print(f"{'server':>6} {'coalescing':>10} {'model calls':>11} {'p50 ms':>9} {'p95 ms':>9}")
+    for server in ("flask", "asgi"):
+        for coalescing in (False, True):
+            backend.model_flights = {"extraction": SingleFlight("extraction")} if coalescing else {}
+            asgi.model_flights = {"extraction": AsyncSingleFlight("extraction")} if coalescing else {}
+            provider = FakeProvider(latency=args.model_latency)
+            set_provider(provider)
+            backend.extraction_cache.clear()
+
+            if server == "flask":
+                latencies = burst_flask(args.burst)
+            else:
+                latencies = asyncio.run(burst_asgi(args.burst))
+            latencies = sorted(latencies)
+            p95 = latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)]
+            print(f"{server:>6} {'on' if coalescing else 'off':>10} {provider.calls:>11} "
+                  f"{statistics.median(latencies) * 1000:>9.1f} {p95 * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures how much prompt compaction shrinks the cover letter prompt inputs for noisy,
+multi-page resumes (repeated page headers, page numbers, OCR junk), how long it takes,
+and how many of the lines relevant to the job description survive it. The "flat" row is a
+resume without blank lines or headings, as PyPDF2 often extracts it, which compacts to a
+single section cut to the budget.
+
+Usage:
+    python benchmarks/bench_compaction.py [--pages 2 5 10] [--budget 1500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compaction import compact_prompt_inputs, estimate_tokens  # noqa: E402
+from utils import compaction  # noqa: E402
+from fixtures import SECTIONS  # noqa: E402
+
+JOB_DESCRIPTION = (
+    "We are looking for a Machine Learning Engineer with Python, TensorFlow and PyTorch. "
+    "You will deploy models with Docker and Kubernetes on AWS. Bachelor's in Computer Science required."
+)
+REQUIREMENTS = {"skills": ["Python", "TensorFlow", "PyTorch"], "tools": ["Docker", "Kubernetes", "AWS"],
+                "education": ["Bachelor's in Computer Science"]}
+RELEVANT = ("python", "tensorflow", "pytorch", "docker", "kubernetes", "aws")
+FILLER = ["Organized the quarterly offsite for the marketing department", "Managed the office supply budget",
+          "Wrote the internal newsletter about company events", "Coordinated vendor contracts for catering",
+          "Answered customer phone calls at the front desk", "Maintained the filing system for invoices"]
+JUNK = ["~ ' . |", "•", "_____", "|| ;: ,", "..  ..", "—"]
+
+
+def noisy_resume(pages, seed=0):
+    rng = random.Random(seed)
+    lines = ["Jane Doe", "jane.doe@example.com | +1 555 0100", ""]
+    for page in range(pages):
+        lines += ["Jane Doe — Resume", ""]
+        for number in range(6):
+            section = rng.choice(list(SECTIONS) + ["Volunteering", "Interests"])
+            lines.append(section.upper())
+            pool = SECTIONS.get(section, FILLER)
+            for item in rng.sample(pool, k=min(2, len(pool))):
+                lines.append(f"{item}   ({2010 + page}-{number})")
+            lines += [f"{rng.choice(FILLER)} in {2000 + page * 10 + number}", rng.choice(JUNK), ""]
+        lines += [f"Page {page + 1} of {pages}", ""]
+    return "\n".join(lines)
+
+
+def flat_resume(lines=200, seed=0):
+    rng = random.Random(seed)
+    pool = [item for items in SECTIONS.values() for item in items] + FILLER
+    return "\n".join(f"{rng.choice(pool)} ({2000 + number % 20})" for number in range(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--budget", type=int, default=compaction.RESUME_TOKEN_BUDGET)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    compaction.RESUME_TOKEN_BUDGET = args.budget
+
+    resumes = [(pages, noisy_resume(pages)) for pages in args.pages] + [("flat", flat_resume())]
+    print(f"{'pages':>5} {'tokens in':>9} {'tokens out':>10} {'reduction':>9} {'ms':>7} {'relevant kept':>13}")
+    for pages, resume in resumes:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            compacted, _, _, stats = compact_prompt_inputs(resume, JOB_DESCRIPTION, None, REQUIREMENTS)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        relevant_in = {line for line in resume.splitlines() if any(term in line.lower() for term in RELEVANT)}
+        relevant_out = {line for line in compacted.splitlines() if any(term in line.lower() for term in RELEVANT)}
+        kept = len({" ".join(line.split()) for line in relevant_out}) / max(len({" ".join(line.split()) for line in relevant_in}), 1)
+        print(f"{pages:>5} {estimate_tokens(resume):>9} {estimate_tokens(compacted):>10} "
+              f"{stats['reduction']:>9.0%} {elapsed * 1000:>7.2f} {kept:>13.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares /generate-cover-letter latency with stages run back-to-back and concurrently,
+using a local fake model and fake OCR so no network or Tesseract is needed.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--requests 20] [--model-latency 0.3] [--ocr-latency 0.2]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("COVERLY_CACHE_PATH", os.path.join(workdir, "cache.sqlite3"))
+os.environ.setdefault("COVERLY_JOB_STORE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+
+import app as backend  # noqa: E402
+from utils import execution, resume_store  # noqa: E402
+from utils.providers import FakeProvider, set_provider  # noqa: E402
+
+RESUME_TEXT = "Jane Doe\nSoftware Engineer\nPython, Docker, AWS, Machine Learning\nBachelor of Science in Computer Science\nInternship at Acme"
+JOB_DESCRIPTION = "We are looking for a Python engineer with Docker and AWS experience and a Bachelor's in Computer Science."
+
+
+def run(client, n):
+    latencies = []
+    for i in range(n):
+        # Measure the cold path, not the requirement and resume caches
+        backend.extraction_cache.clear()
+        backend.resume_store.cache.clear()
+        start = time.perf_counter()
+        res = client.post("/generate-cover-letter", data={
+            "resume": (io.BytesIO(b"%PDF-1.4 " + str(i).encode()), "resume.pdf"),
+            "job_description": JOB_DESCRIPTION,
+        }, content_type="multipart/form-data")
+        assert res.status_code == 200, res.get_json()
+        latencies.append(time.perf_counter() - start)
+    return latencies, res.get_json()["timings"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.3)
+    parser.add_argument("--ocr-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    def fake_ocr(_):
+        time.sleep(args.ocr_latency)
+        return RESUME_TEXT
+
+    set_provider(FakeProvider(latency=args.model_latency))
+    resume_store.extract_text_from_pdf = fake_ocr
+    client = backend.app.test_client()
+
+    for concurrent in (False, True):
+        execution.CONCURRENT_STAGES = concurrent
+        latencies, timings = run(client, args.requests)
+        label = "concurrent" if concurrent else "sequential"
+        print(f"{label:>10}: p50={statistics.median(latencies) * 1000:.1f}ms "
+              f"max={max(latencies) * 1000:.1f}ms last timings={timings}")
+
+
+if __name__ == "__main__":
+    main()
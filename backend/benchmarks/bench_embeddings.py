@@ -0,0 +1,80 @@
+"""
+Compares per-requirement embedding matching (one resume and one requirement embedding per
+requirement, one dot product at a time) with the batched, cached matrix path, using the
+deterministic local hashing backend.
+
+Usage:
+    python benchmarks/bench_embeddings.py [--resume-words 1500] [--latency 0.02]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.embeddings import CachedEmbedder, HashingEmbeddingBackend  # noqa: E402
+from utils.matching import ResumeIndex  # noqa: E402
+from bench_matching import FILLER, SKILLS  # noqa: E402
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    """Hashing backend that counts calls and adds a fixed per-call latency, like a remote API."""
+
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().embed(texts)
+
+
+def per_requirement(backend, requirements, resume_text):
+    scores = []
+    for req in requirements:
+        req_emb = backend.embed([req])[0]
+        resume_emb = backend.embed([resume_text])[0]
+        scores.append(np.dot(req_emb, resume_emb) / (np.linalg.norm(req_emb) * np.linalg.norm(resume_emb)))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume-words", type=int, default=1500)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per backend call")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    resume = " ".join(rng.choice(SKILLS + FILLER) for _ in range(args.resume_words))
+    index = ResumeIndex(resume)
+
+    print(f"{'requirements':>12} {'per-req ms':>10} {'calls':>6} {'batched ms':>10} {'calls':>6} {'warm ms':>8} {'calls':>6}")
+    for count in (10, 50, 200):
+        requirements = [f"{rng.choice(SKILLS)} {rng.choice(FILLER)}" for _ in range(count)]
+
+        backend = CountingBackend(args.latency)
+        start = time.perf_counter()
+        per_requirement(backend, requirements, resume)
+        legacy_time, legacy_calls = time.perf_counter() - start, backend.calls
+
+        backend = CountingBackend(args.latency)
+        embedder = CachedEmbedder(backend)
+        start = time.perf_counter()
+        embedder.max_similarities(requirements, index.chunks)
+        batched_time, batched_calls = time.perf_counter() - start, backend.calls
+
+        start = time.perf_counter()
+        embedder.max_similarities(requirements, index.chunks)
+        warm_time, warm_calls = time.perf_counter() - start, backend.calls - batched_calls
+
+        print(f"{count:>12} {legacy_time * 1000:>10.1f} {legacy_calls:>6} {batched_time * 1000:>10.1f} "
+              f"{batched_calls:>6} {warm_time * 1000:>8.1f} {warm_calls:>6}")
+
+
+if __name__ == "__main__":
+    main()
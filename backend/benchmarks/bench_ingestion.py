@@ -0,0 +1,178 @@
+"""
+Measures the peak memory of resume ingestion for large and hostile uploads, comparing the
+previous path (whole upload read into memory, pages rendered at full OCR resolution, images
+decoded whatever their size) with the spooled, size-checked path of utils.ingestion.
+Each case runs in a fresh process; peak RSS is reported above the process baseline,
+together with the peak of Python allocations seen by tracemalloc (Pillow and pdfium
+allocate outside of it). Tesseract itself is replaced by a stub, so only ingestion,
+decoding and rasterization are measured.
+
+Usage:
+    python benchmarks/bench_ingestion.py [--cases text-pdf scanned-pdf large-page png-bomb]
+"""
+import argparse
+import hashlib
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+from PyPDF2 import PdfReader  # noqa: E402
+
+from utils import ocr  # noqa: E402
+from utils.ingestion import IngestionError, spool_upload  # noqa: E402
+from fixtures import make_resume_image, make_scanned_pdf, make_text_pdf  # noqa: E402
+
+
+def blank_pdf(size_points):
+    """
+    Builds a one-page PDF without text whose page is size_points wide and high.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {size_points} {size_points}] >>"]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def png_bomb(side):
+    out = io.BytesIO()
+    Image.new("1", (side, side)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def scanned_pdf(pages):
+    # Full-resolution noisy scans compress poorly, like real phone scans
+    images = []
+    for number in range(pages):
+        image = make_resume_image(seed=number, size=(2550, 3300))
+        noise = Image.effect_noise(image.size, 40).convert("RGB")
+        images.append(Image.blend(image, noise, 0.15))
+    out = io.BytesIO()
+    images[0].save(out, format="PDF", save_all=True, append_images=images[1:], resolution=300, quality=90)
+    return out.getvalue()
+
+
+CASES = {
+    "text-pdf": ("100-page text PDF", lambda: make_text_pdf(100, lines_per_page=80), "resume.pdf"),
+    "scanned-pdf": ("4-page 300 DPI scan", lambda: scanned_pdf(4), "scan.pdf"),
+    "large-page": ("2000 pt page, no text", lambda: blank_pdf(2000), "poster.pdf"),
+    "png-bomb": ("100 MP PNG", lambda: png_bomb(10000), "bomb.png"),
+    "small-scan": ("1-page scan", lambda: make_scanned_pdf(1), "small.pdf"),
+}
+
+
+def legacy_ingest(path, filename):
+    # The ingestion path before utils.ingestion: read everything, trust the file name
+    with open(path, "rb") as f:
+        data = f.read()
+    hashlib.sha256(data).hexdigest()
+    if filename.endswith(".png"):
+        previous, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+        try:
+            ocr.preprocess_image(Image.open(io.BytesIO(data)))
+            return ""
+        finally:
+            Image.MAX_IMAGE_PIXELS = previous
+    pdf_file = io.BytesIO(data)
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        tmp.write(pdf_file.read())
+        tmp.flush()
+        reader = PdfReader(tmp.name)
+        pages = []
+        for number in range(min(len(reader.pages), ocr.PDF_MAX_PAGES)):
+            text = reader.pages[number].extract_text()
+            if not (text and text.strip()):
+                import pypdfium2 as pdfium
+                pdf = pdfium.PdfDocument(tmp.name)
+                image = pdf[number].render(scale=ocr.OCR_DPI / 72).to_pil()
+                pdf.close()
+                ocr.preprocess_image(image)
+                text = ""
+            pages.append(text)
+    return "\n".join(pages)
+
+
+def spooled_ingest(path, filename):
+    with open(path, "rb") as f:
+        upload = spool_upload(f, filename)
+    try:
+        if upload.is_image:
+            return ocr.ocr_image(Image.open(io.BytesIO(upload.read())))
+        return ocr.extract_text_from_pdf(upload.open(), parallel=False)
+    finally:
+        upload.close()
+
+
+def _current_rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+def _measure(fn, path, filename, results):
+    ocr.pytesseract.image_to_string = lambda image, timeout=None: ""
+    baseline = _current_rss_kb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        fn(path, filename)
+        outcome = "ok"
+    except IngestionError as e:
+        outcome = f"{e.status} {str(e)[:40]}"
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((max(peak - baseline, 0) / 1024, python_peak / 1024 / 1024, elapsed * 1000, outcome))
+
+
+def measure(fn, path, filename):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(fn, path, filename, results))
+    process.start()
+    process.join()
+    if process.exitcode:
+        return None
+    return results.get()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", nargs="+", default=["text-pdf", "scanned-pdf", "large-page", "png-bomb"], choices=list(CASES))
+    args = parser.parse_args()
+
+    print(f"{'case':>22} {'size KB':>8} {'path':>8} {'peak RSS MB':>11} {'python MB':>9} {'ms':>8}  outcome")
+    with tempfile.TemporaryDirectory() as workdir:
+        for case in args.cases:
+            label, build, filename = CASES[case]
+            path = os.path.join(workdir, filename)
+            with open(path, "wb") as f:
+                f.write(build())
+            size = os.path.getsize(path) / 1024
+            for name, fn in (("before", legacy_ingest), ("spooled", spooled_ingest)):
+                result = measure(fn, path, filename)
+                if result is None:
+                    print(f"{label:>22} {size:>8.0f} {name:>8} {'crashed':>11}")
+                    continue
+                rss, python_peak, elapsed, outcome = result
+                print(f"{label:>22} {size:>8.0f} {name:>8} {rss:>11.1f} {python_peak:>9.1f} {elapsed:>8.1f}  {outcome}")
+
+
+if __name__ == "__main__":
+    main()
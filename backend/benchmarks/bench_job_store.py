@@ -0,0 +1,85 @@
+"""
+Compares preparing a job for matching when it is sent as text (extraction, from the
+model or the extraction cache, then requirement cleanup and normalization) with loading
+a stored job by job_id, whose artifacts and embedding vectors were precomputed at import,
+both with a cold and a warm cache, and the matching time that follows. Also times the
+bulk import, using a local fake model.
+
+Usage:
+    python benchmarks/bench_job_store.py [--jobs 300] [--model-latency 0.5] [--embeddings hashing]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("COVERLY_CACHE_PATH", os.path.join(workdir, "cache.sqlite3"))
+os.environ.setdefault("COVERLY_JOB_STORE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+
+import app as backend  # noqa: E402
+from utils.embeddings import create_embedder  # noqa: E402
+from utils.job_store import JobStore  # noqa: E402
+from utils.providers import FakeProvider  # noqa: E402
+from utils.text_processing import flatten_requirements  # noqa: E402
+from fixtures import resume_lines  # noqa: E402
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return (time.perf_counter() - start) / len(items) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--model-latency", type=float, default=0.5)
+    parser.add_argument("--embeddings", default="hashing", help='"off" or "hashing"')
+    args = parser.parse_args()
+
+    backend.embedder = create_embedder(args.embeddings)
+    backend.job_store = JobStore(os.path.join(workdir, f"jobs-{args.embeddings}.sqlite3"), embedder=backend.embedder)
+    texts = [f"Machine Learning Engineer {i}: Python, Docker and Kubernetes on AWS." for i in range(args.jobs)]
+    job_ids = [f"job-{i}" for i in range(args.jobs)]
+    resume = "\n".join(resume_lines(120))
+
+    start = time.perf_counter()
+    provider = FakeProvider(latency=0)
+    jobs = [{'job_id': job_id, 'job_description': text, 'language': 'English',
+             'details': backend.extract_job_details(provider, 'English', text)} for job_id, text in zip(job_ids, texts)]
+    backend.job_store.put_many(jobs)
+    print(f"imported {args.jobs} jobs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def prepare_text(text):
+        requirements = backend.extract_job_details(provider, 'English', text)['requirements']
+        return requirements, flatten_requirements(requirements, 'English')
+
+    def match_text(prepared):
+        return backend.score_resume(prepared[0], resume, 'English')
+
+    def match_job(job):
+        return backend.score_resume(job.requirements, resume, job.language, job)
+
+    # Only a few cold model calls are made, since each one waits for the model latency
+    cold_texts = texts[:max(1, min(5, args.jobs))]
+    backend.extraction_cache.clear()
+    provider = FakeProvider(latency=args.model_latency)
+    rows = [("text, cold cache", *timed(prepare_text, cold_texts))]
+    for text in texts:
+        backend.extract_job_details(FakeProvider(latency=0), 'English', text)
+    rows.append(("text, warm cache", *timed(prepare_text, texts)))
+    backend.job_store._prepared.clear()
+    rows.append(("job_id, cold", *timed(backend.job_store.get, job_ids)))
+    rows.append(("job_id, warm", *timed(backend.job_store.get, job_ids)))
+
+    print(f"{'path':>18} {'prepare ms/job':>14} {'match ms/job':>12}")
+    for name, prepare_ms, prepared in rows:
+        match_ms, _ = timed(match_job if name.startswith("job_id") else match_text, prepared)
+        print(f"{name:>18} {prepare_ms:>14.3f} {match_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Compares requirement matching with the English pipeline and with the pipeline of the
+requirements' language on synthetic French and Arabic resumes, whose spelling differs
+from the extracted requirements the way real documents do: missing or extra accents,
+ligatures, Arabic diacritics, tatweel, letter variants and presentation forms from PDFs.
+Reports recall (requirements present in the resume that are matched) and matching time.
+
+Usage:
+    python benchmarks/bench_languages.py [--resumes 50] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.matching import ResumeIndex, match_requirements  # noqa: E402
+from utils.text_processing import flatten_requirements  # noqa: E402
+
+# Requirements as the model extracts them, with the spelling each resume may use instead
+CORPORA = {
+    "en": {
+        "requirements": {
+            "skills": ["Python", "Machine Learning", "Natural Language Processing", "Data Visualization"],
+            "tools": ["Docker", "Kubernetes", "PostgreSQL"],
+            "education": ["Bachelor's in Computer Science"],
+            "experience": ["Internship in data engineering"],
+        },
+        "variants": {
+            "Python": ["Python"], "Machine Learning": ["machine learning", "ML"],
+            "Natural Language Processing": ["natural language processing", "NLP"],
+            "Data Visualization": ["data visualization", "Data-Visualization"], "Docker": ["Docker"],
+            "Kubernetes": ["Kubernetes"], "PostgreSQL": ["PostgreSQL", "Postgres"],
+            "Bachelor's in Computer Science": ["Master of Science in Computer Science"],
+            "Internship in data engineering": ["internship at a data team"],
+        },
+        "filler": ["built", "services", "for", "customers", "with", "the", "team", "improved", "reports"],
+    },
+    "fr": {
+        "requirements": {
+            "skills": ["Apprentissage automatique", "Traitement du langage naturel", "Modélisation statistique",
+                       "Gestion de projet"],
+            "tools": ["Python", "Docker", "PostgreSQL"],
+            "education": ["Licence en informatique"],
+            "experience": ["Stage en ingénierie des données"],
+        },
+        "variants": {
+            "Apprentissage automatique": ["apprentissage automatique", "APPRENTISSAGE AUTOMATIQUE", "ML"],
+            "Traitement du langage naturel": ["traitement du langage naturel", "TALN", "NLP"],
+            "Modélisation statistique": ["modelisation statistique", "Modélisation statistique", "MODÉLISATION STATISTIQUE"],
+            "Gestion de projet": ["gestion de projet", "Gestion-de-projet"],
+            "Python": ["Python"], "Docker": ["Docker"], "PostgreSQL": ["Postgres", "PostgreSQL"],
+            "Licence en informatique": ["Master en informatique", "Diplôme d'ingénieur en informatique"],
+            "Stage en ingénierie des données": ["stage de fin d'études", "stagiaire en cœur de réseau"],
+        },
+        "filler": ["conçu", "des", "services", "pour", "les", "clients", "équipe", "amélioré", "rapports", "données"],
+    },
+    "ar": {
+        "requirements": {
+            "skills": ["التعلم الآلي", "معالجة اللغة الطبيعية", "تحليل البيانات", "إدارة المشاريع"],
+            "tools": ["Python", "Docker", "PostgreSQL"],
+            "education": ["بكالوريوس في علوم الحاسوب"],
+            "experience": ["تدريب في هندسة البيانات"],
+        },
+        "variants": {
+            "التعلم الآلي": ["التعلّم الآلي", "التعلم الالي", "ML"],
+            "معالجة اللغة الطبيعية": ["معالجة اللغة الطبيعيّة", "معالجة اللغـة الطبيعية", "NLP"],
+            "تحليل البيانات": ["تحليل البيانات", "تحـليل البيانات", "\ufe97\ufea4\ufee0\ufef4\ufee0 البيانات"],
+            "إدارة المشاريع": ["ادارة المشاريع", "إدارة المشاريع"],
+            "Python": ["Python"], "Docker": ["Docker"], "PostgreSQL": ["Postgres", "PostgreSQL"],
+            "بكالوريوس في علوم الحاسوب": ["ماجستير في علوم الحاسوب", "ماجستير في علوم الحاسب"],
+            "تدريب في هندسة البيانات": ["متدرب في شركة ناشئة", "مشروع تخرج"],
+        },
+        "filler": ["صممت", "خدمات", "للعملاء", "مع", "الفريق", "حسنت", "التقارير", "في", "شركة"],
+    },
+}
+LANGUAGE_NAMES = {"en": "English", "fr": "French", "ar": "Arabic"}
+
+
+def make_resume(corpus, rng, size=3000):
+    """
+    Returns a resume mentioning a random subset of the requirements, each in a random
+    spelling, and the set of requirements it mentions.
+    """
+    present = set()
+    words = []
+    while sum(len(word) + 1 for word in words) < size:
+        if rng.random() < 0.08:
+            requirement = rng.choice(list(corpus["variants"]))
+            present.add(requirement)
+            words.append(rng.choice(corpus["variants"][requirement]))
+        else:
+            words.append(rng.choice(corpus["filler"]))
+    return unicodedata.normalize(rng.choice(["NFC", "NFD"]), " ".join(words)), present
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(code, pipeline_language, resumes, repeat):
+    requirements = flatten_requirements(CORPORA[code]["requirements"], pipeline_language)
+    # Map normalized requirements back to the spellings table
+    originals = {req.strip(): req for reqs in CORPORA[code]["requirements"].values() for req in reqs}
+    hits = total = 0
+    elapsed = 0.0
+    for resume, present in resumes:
+        seconds, (matched, _) = best_of(repeat, lambda: match_requirements(requirements, ResumeIndex(resume, pipeline_language)))
+        elapsed += seconds
+        matched = {originals.get(req, req) for _, req in matched}
+        hits += len(present & matched)
+        total += len(present)
+    return hits / max(total, 1), elapsed / len(resumes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'language':>8} {'pipeline':>8} {'recall':>7} {'ms/resume':>10}")
+    for code, corpus in CORPORA.items():
+        rng = random.Random(code)
+        resumes = [make_resume(corpus, rng) for _ in range(args.resumes)]
+        for pipeline_language in dict.fromkeys(("en", code)):
+            recall, seconds = run(code, LANGUAGE_NAMES[pipeline_language], resumes, args.repeat)
+            print(f"{code:>8} {pipeline_language:>8} {recall:>7.0%} {seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compares the per-requirement matching loop with the batched ResumeIndex matcher
+for growing requirement counts and resume sizes, and checks both give the same results.
+
+Usage:
+    python benchmarks/bench_matching.py [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.matching import ResumeIndex, match_requirements, is_semantic_match, education_semantic_match  # noqa: E402
+
+SKILLS = ["Python", "Java", "TensorFlow", "PyTorch", "Machine Learning", "NLP", "scikit-learn", "PostgreSQL",
+          "Docker", "Kubernetes", "AWS", "GCP", "Azure", "React", "Node.js", "GraphQL", "Spark", "Airflow",
+          "Prompt Engineering", "Figma", "Terraform", "Go", "Rust", "C++", "Pandas", "NumPy", "FastAPI"]
+FILLER = ["designed", "built", "scalable", "services", "for", "customers", "improved", "latency", "team",
+          "worked", "on", "data", "pipelines", "and", "dashboards", "with", "stakeholders", "delivered"]
+EDUCATION = ["Bachelor's in Computer Science", "Master's in Data Science", "PhD in Statistics", "Degree in Engineering"]
+EXPERIENCE = ["3+ years experience in software development", "5 years of backend engineering", "internship"]
+# Requirements and resume phrases that only match through an abbreviation or alias, if at all
+ALIAS_REQUIREMENTS = ["ML", "AI", "NLP", "sklearn", "Postgres", "SQL", "scikit-learn", "Artificial Intelligence",
+                      "machine learning", "Natural Language Processing"]
+# Resumes whose degree is matched by a single-group pattern (PhD, degree, diploma), or that need Unicode folding
+DEGREE_RESUMES = ["PhD in Statistics", "Degree in Mathematics", "Diploma in Engineering", "Master's in Statistics",
+                  "Lives on STRASSE 5, ﬁnance and Straße projects", "Master in Data Science"]
+DEGREE_REQUIREMENTS = [("Education", "PhD in Statistics"), ("Education", "Master's in Statistics"),
+                       ("Education", "Bachelor's in Mathematics"), ("Education", "Degree in Engineering"),
+                       ("Education", "Bachelor's in Computer Science"), ("Skills", "Straße"), ("Skills", "finance")]
+ALIAS_PHRASES = ["machine learning", "artificial intelligence", "natural language processing", "scikit-learn",
+                 "scikitlearn", "postgres", "ML", "AI models", "nlp"]
+
+
+def make_resume(size, rng):
+    words = ["Bachelor of Science in Computer Science\n"]
+    while sum(len(w) + 1 for w in words) < size:
+        roll = rng.random()
+        words.append(rng.choice(SKILLS) if roll < 0.1 else rng.choice(ALIAS_PHRASES) if roll < 0.12 else rng.choice(FILLER))
+    return " ".join(words)
+
+
+def make_requirements(count, rng):
+    requirements = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            requirements.append(("Education", rng.choice(EDUCATION)))
+        elif roll < 0.2:
+            requirements.append(("Experience", rng.choice(EXPERIENCE)))
+        elif roll < 0.3:
+            requirements.append(("Skills", rng.choice(ALIAS_REQUIREMENTS)))
+        else:
+            requirements.append(("Skills", f"{rng.choice(SKILLS)} {i}" if rng.random() < 0.5 else rng.choice(SKILLS)))
+    return requirements
+
+
+def legacy_match(requirements, resume_text):
+    matched, missing = [], []
+    for cat, req in requirements:
+        if cat == "Education" and education_semantic_match(req, resume_text):
+            matched.append((cat, req))
+            continue
+        if cat == "Experience":
+            if is_semantic_match(req, resume_text) or any(word in resume_text.lower() for word in ["intern", "internship", "project"]):
+                matched.append((cat, req))
+            else:
+                missing.append((cat, req))
+            continue
+        if is_semantic_match(req, resume_text):
+            matched.append((cat, req))
+        else:
+            missing.append((cat, req))
+    return matched, missing
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    # Alias-only pairs: spelled-out phrases do not satisfy their abbreviation, only the reverse
+    for resume in ("Worked on machine learning", "Built artificial intelligence tools", "Used ML and sklearn daily"):
+        requirements = [("Skills", req) for req in ALIAS_REQUIREMENTS]
+        assert legacy_match(requirements, resume) == match_requirements(requirements, ResumeIndex(resume)), \
+            f"indexed matcher disagrees with the per-requirement loop on aliases in {resume!r}"
+    for resume in DEGREE_RESUMES:
+        assert legacy_match(DEGREE_REQUIREMENTS, resume) == match_requirements(DEGREE_REQUIREMENTS, ResumeIndex(resume)), \
+            f"indexed matcher disagrees with the per-requirement loop on degrees in {resume!r}"
+
+    print(f"{'resume chars':>12} {'requirements':>12} {'legacy ms':>10} {'indexed ms':>10} {'speedup':>8}")
+    for size in (2_000, 20_000, 100_000):
+        resume = make_resume(size, rng)
+        for count in (10, 50, 200):
+            requirements = make_requirements(count, rng)
+            legacy_time, legacy = best_of(args.repeat, lambda: legacy_match(requirements, resume))
+            indexed_time, indexed = best_of(args.repeat, lambda: match_requirements(requirements, ResumeIndex(resume)))
+            assert legacy == indexed, "indexed matcher disagrees with the per-requirement loop"
+            print(f"{size:>12} {count:>12} {legacy_time * 1000:>10.2f} {indexed_time * 1000:>10.2f} "
+                  f"{legacy_time / indexed_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares serial and process-pool PDF extraction throughput over multi-page fixtures.
+Scanned fixtures need the tesseract binary; they are skipped when it is not installed.
+
+Usage:
+    python benchmarks/bench_pdf.py [--pages 5 20 50] [--scanned]
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ocr  # noqa: E402
+from fixtures import make_scanned_pdf, make_text_pdf  # noqa: E402
+
+
+def timed(pdf_bytes, parallel, max_pages):
+    start = time.perf_counter()
+    text = ocr.extract_text_from_pdf(io.BytesIO(pdf_bytes), max_pages=max_pages, parallel=parallel)
+    return time.perf_counter() - start, text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--scanned", action="store_true", help="Also benchmark image-only PDFs (needs tesseract)")
+    args = parser.parse_args()
+
+    kinds = [("text", make_text_pdf)]
+    if args.scanned:
+        if shutil.which("tesseract"):
+            kinds.append(("scanned", make_scanned_pdf))
+        else:
+            print("tesseract not found, skipping scanned fixtures")
+
+    # Warm the pool so process start-up is not counted
+    timed(make_text_pdf(2), True, 2)
+
+    print(f"workers={ocr.PDF_WORKERS}")
+    print(f"{'kind':>8} {'pages':>6} {'serial ms':>10} {'parallel ms':>12} {'pages/s serial':>15} {'pages/s parallel':>17}")
+    for kind, make in kinds:
+        for pages in args.pages:
+            pdf_bytes = make(pages)
+            serial, serial_text = timed(pdf_bytes, False, pages)
+            parallel, parallel_text = timed(pdf_bytes, True, pages)
+            assert serial_text == parallel_text, "serial and parallel extraction disagree"
+            print(f"{kind:>8} {pages:>6} {serial * 1000:>10.1f} {parallel * 1000:>12.1f} "
+                  f"{pages / serial:>15.1f} {pages / parallel:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures time-to-first-byte of /generate-cover-letter/stream against the time the
+buffered /generate-cover-letter takes to return, using a local fake streaming model.
+
+Usage:
+    python benchmarks/bench_streaming.py [--requests 10] [--extraction-latency 0.5] [--letter-latency 3.0]
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+
+from bench_concurrency import JOB_DESCRIPTION, RESUME_TEXT, backend, resume_store
+from utils.providers import FakeProvider, set_provider
+
+
+def post(client, path, i, **kwargs):
+    return client.post(path, data={
+        "resume": (io.BytesIO(b"%PDF-1.4 " + str(i).encode()), "resume.pdf"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data", **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--extraction-latency", type=float, default=0.5)
+    parser.add_argument("--letter-latency", type=float, default=3.0)
+    args = parser.parse_args()
+
+    set_provider(FakeProvider(latency={"extraction": args.extraction_latency, "cover_letter": args.letter_latency}))
+    resume_store.extract_text_from_pdf = lambda _: RESUME_TEXT
+    client = backend.app.test_client()
+
+    buffered, first_score, first_token, streamed = [], [], [], []
+    for i in range(args.requests):
+        backend.extraction_cache.clear()
+        start = time.perf_counter()
+        assert post(client, "/generate-cover-letter", i).status_code == 200
+        buffered.append(time.perf_counter() - start)
+
+        backend.extraction_cache.clear()
+        start = time.perf_counter()
+        res = post(client, "/generate-cover-letter/stream", i, buffered=False)
+        for raw in res.iter_encoded():
+            event = raw.decode().split("\n", 1)[0].removeprefix("event: ")
+            elapsed = time.perf_counter() - start
+            if event == "score" and len(first_score) <= i:
+                first_score.append(elapsed)
+            elif event == "token" and len(first_token) <= i:
+                first_token.append(elapsed)
+            elif event == "error":
+                raise RuntimeError(json.loads(raw.decode().split("data: ", 1)[1]))
+        streamed.append(time.perf_counter() - start)
+
+    def p50(values):
+        return f"{statistics.median(values) * 1000:.1f}ms"
+
+    print(f"buffered response:   p50={p50(buffered)}")
+    print(f"stream first score:  p50={p50(first_score)}")
+    print(f"stream first token:  p50={p50(first_token)}")
+    print(f"stream complete:     p50={p50(streamed)}")
+
+
+if __name__ == "__main__":
+    main()
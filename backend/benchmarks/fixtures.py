@@ -0,0 +1,105 @@
+"""
+Synthetic resume fixtures for the benchmarks: multi-page PDFs with a text layer,
+scanned (image-only) PDFs and resume images, generated in memory.
+"""
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+SECTIONS = {
+    "Experience": ["Built data pipelines in Python and Airflow", "Deployed services with Docker and Kubernetes on AWS",
+                   "Led a team of four engineers", "Internship at Acme Corp working on machine learning models"],
+    "Skills": ["Python, Java, SQL, PostgreSQL, React, Node.js", "TensorFlow, PyTorch, scikit-learn, Pandas, NumPy",
+               "Prompt Engineering, NLP, Computer Vision"],
+    "Education": ["Bachelor of Science in Computer Science", "Master of Science in Data Science"],
+    "Certifications": ["AWS Certified Solutions Architect", "Google Professional Data Engineer"],
+}
+
+
+def resume_lines(count, seed=0):
+    """
+    Returns count lines of resume-like text.
+    """
+    rng = random.Random(seed)
+    lines = ["Jane Doe", "Software Engineer"]
+    while len(lines) < count:
+        section = rng.choice(list(SECTIONS))
+        lines.append(section)
+        lines.extend(rng.sample(SECTIONS[section], k=min(2, len(SECTIONS[section]))))
+    return lines[:count]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(page_count, lines_per_page=40, seed=0):
+    """
+    Builds a PDF whose pages have a text layer.
+
+    Returns:
+        bytes: PDF content.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for number in range(page_count):
+        lines = resume_lines(lines_per_page, seed=seed + number)
+        stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {page_count} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_resume_image(lines=40, size=(1700, 2200), seed=0):
+    """
+    Renders resume text onto a white page image, like a phone photo or scan.
+
+    Returns:
+        PIL.Image.Image: The page image.
+    """
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for number, line in enumerate(resume_lines(lines, seed=seed)):
+        draw.text((80, 80 + number * 48), line, fill="black")
+    return image
+
+
+def make_scanned_pdf(page_count, seed=0):
+    """
+    Builds an image-only PDF, as produced by a scanner.
+
+    Returns:
+        bytes: PDF content.
+    """
+    pages = [make_resume_image(seed=seed + number, size=(850, 1100)) for number in range(page_count)]
+    out = io.BytesIO()
+    pages[0].save(out, format="PDF", save_all=True, append_images=pages[1:], resolution=100)
+    return out.getvalue()
+
+
+def image_bytes(image, format="PNG"):
+    """
+    Encodes an image.
+
+    Returns:
+        bytes: Encoded image.
+    """
+    out = io.BytesIO()
+    image.save(out, format=format)
+    return out.getvalue()
@@ -0,0 +1,174 @@
+"""
+Offline end-to-end benchmark. Replays a generated corpus of resumes (PDFs, plus scanned
+PDFs and images when tesseract is installed) and job descriptions against
+/generate-cover-letter, /extract-job-title and the matching utilities, with the
+deterministic FakeProvider in place of Gemini. Reports requests/sec, p50/p95/p99
+latency and peak RSS.
+
+Usage:
+    python benchmarks/run_e2e.py [--requests 100] [--concurrency 8] [--cold] [--json results.json]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("COVERLY_CACHE_PATH", os.path.join(workdir, "cache.sqlite3"))
+os.environ.setdefault("COVERLY_JOB_STORE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+
+import app as backend  # noqa: E402
+from utils.matching import ResumeIndex, match_requirements  # noqa: E402
+from utils.providers import FAKE_RESPONSES, FakeProvider, set_provider  # noqa: E402
+from utils.text_processing import flatten_requirements  # noqa: E402
+from fixtures import image_bytes, make_resume_image, make_scanned_pdf, make_text_pdf, resume_lines  # noqa: E402
+
+JOB_DESCRIPTIONS = [
+    "We are hiring a Machine Learning Engineer with strong Python, TensorFlow and PyTorch skills. "
+    "Experience with Docker, Kubernetes and AWS is required. Bachelor's in Computer Science.",
+    "Backend developer needed: 3+ years experience in software development with Java or Go, "
+    "PostgreSQL, REST APIs and CI/CD. AWS Certified Solutions Architect is a plus.",
+    "Data Engineer to build pipelines with Spark, Airflow and SQL. Master's in Data Science preferred. "
+    "Knowledge of GCP and Terraform.",
+    "Frontend engineer with React, Node.js, GraphQL and Figma experience. Internship experience accepted.",
+]
+
+
+def build_corpus(include_scans):
+    corpus = [("resume-1p.pdf", make_text_pdf(1)), ("resume-2p.pdf", make_text_pdf(2, seed=1)),
+              ("resume-3p.pdf", make_text_pdf(3, seed=2))]
+    if include_scans:
+        corpus.append(("scan-2p.pdf", make_scanned_pdf(2)))
+        corpus.append(("photo.png", image_bytes(make_resume_image(seed=3))))
+    return corpus
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own / 2 ** 20, children / 2 ** 20
+
+
+def run_scenario(name, fn, requests, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            fn(i)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "scenario": name,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--extraction-latency", type=float, default=0.3)
+    parser.add_argument("--letter-latency", type=float, default=1.0)
+    parser.add_argument("--cold", action="store_true", help="Make every request miss the caches")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    set_provider(FakeProvider(latency={
+        "extraction": args.extraction_latency,
+        "cover_letter": args.letter_latency,
+    }))
+    include_scans = shutil.which("tesseract") is not None
+    if not include_scans:
+        print("tesseract not found: scanned PDFs and images are left out of the corpus")
+    corpus = build_corpus(include_scans)
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = backend.app.test_client()
+        return local.client
+
+    def job_description(i):
+        text = JOB_DESCRIPTIONS[i % len(JOB_DESCRIPTIONS)]
+        return f"{text}\nReference {i}" if args.cold else text
+
+    def generate(i):
+        filename, data = corpus[i % len(corpus)]
+        if args.cold and filename.endswith(".pdf"):
+            # Trailing bytes after %%EOF change the hash without changing the PDF
+            data += f"\n% {i}\n".encode()
+        res = client().post("/generate-cover-letter", data={
+            "resume": (io.BytesIO(data), filename),
+            "job_description": job_description(i),
+            "tone": "Formal",
+        }, content_type="multipart/form-data")
+        if res.status_code != 200:
+            raise RuntimeError(f"{res.status_code}: {res.get_json()}")
+
+    def job_title(i):
+        res = client().post("/extract-job-title", json={"job_description": job_description(i)})
+        if res.status_code != 200:
+            raise RuntimeError(f"{res.status_code}: {res.get_json()}")
+
+    requirements = flatten_requirements(json.loads(FAKE_RESPONSES["extraction"]))
+    resume_texts = ["\n".join(resume_lines(40 * pages, seed=pages)) for pages in (1, 2, 5)]
+
+    def matching(i):
+        match_requirements(requirements, ResumeIndex(resume_texts[i % len(resume_texts)]))
+
+    results = [
+        run_scenario("generate-cover-letter", generate, args.requests, args.concurrency),
+        run_scenario("extract-job-title", job_title, args.requests, args.concurrency),
+        run_scenario("matching", matching, args.requests * 10, args.concurrency),
+    ]
+    own_rss, children_rss = peak_rss_mb()
+
+    print(f"{'scenario':>22} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(f"{result['scenario']:>22} {result['requests']:>6} {result['errors']:>6} {result['rps']:>8} "
+              f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}")
+        if result["first_error"]:
+            print(f"{'':>22} first error: {result['first_error']}")
+    print(f"peak RSS: {own_rss:.1f} MB (largest child process: {children_rss:.1f} MB)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "peak_rss_mb": own_rss, "peak_child_rss_mb": children_rss,
+                       "args": vars(args)}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Replays a profile capture written by utils.profiling (COVERLY_PROFILE or the X-Coverly-Profile
+admin header) against the utils modules, in process and with a fake model, so that a slow
+request can be investigated offline. Resume text extraction (PDF parsing, rasterization and
+OCR), requirement normalization, matching and prompt compaction are profiled together.
+
+By default captures only hold input hashes: the resume text is then looked up in the resume
+store by its hash, a stored job (job_id) in the job store, and the canned fake extraction
+replaces the job details otherwise. Captures taken with COVERLY_PROFILE_INPUTS=1 replay on their own.
+
+Usage:
+    python replay_profile.py profiles/<capture_id> [--repeat 5] [--reference] [--sort tottime]
+        [--restrict "matching|ocr"] [--output replay.prof]
+"""
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+
+from PIL import Image
+
+from utils.compaction import compact_prompt_inputs
+from utils.embeddings import EMBEDDING_THRESHOLD, create_embedder
+from utils.extraction import parse_extraction
+from utils.ingestion import spool_upload
+from utils.job_store import JobStore
+from utils.matching import ResumeIndex, education_semantic_match, is_semantic_match, match_requirements
+from utils.ocr import extract_text_from_pdf, ocr_image
+from utils.providers import FakeProvider
+from utils.resume_store import ResumeStore
+from utils.text_processing import flatten_requirements
+
+
+def load_capture(path):
+    """
+    Reads the manifest of a capture and the inputs saved with it.
+
+    Returns:
+        tuple: (manifest, inputs) where inputs maps input names to their saved path.
+    """
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    inputs = {}
+    for name, entry in manifest['inputs'].items():
+        if entry.get('file') and os.path.exists(os.path.join(path, "inputs", entry['file'])):
+            inputs[name] = os.path.join(path, "inputs", entry['file'])
+    return manifest, inputs
+
+
+def read_text(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def extract_resume(manifest, inputs):
+    """
+    Extracts the resume text as the request did, but in this process, so that PDF parsing,
+    rasterization and OCR show up in the profile. Falls back to the recorded text, then to
+    the resume store entry of the recorded hash.
+    """
+    if 'resume' in inputs:
+        with open(inputs['resume'], "rb") as f:
+            upload = spool_upload(f, os.path.basename(inputs['resume']))
+        try:
+            if upload.is_image:
+                return ocr_image(Image.open(io.BytesIO(upload.read())))
+            return extract_text_from_pdf(upload.open(), parallel=False)
+        except Exception as e:
+            print(f"resume extraction failed ({type(e).__name__}: {e}); using the recorded resume text", file=sys.stderr)
+        finally:
+            upload.close()
+    if 'resume_text' in inputs:
+        return read_text(inputs['resume_text'])
+    resume_hash = manifest['inputs'].get('resume', {}).get('sha256') or manifest.get('resume_id')
+    entry = ResumeStore().get(resume_hash) if resume_hash else None
+    if entry is None:
+        raise SystemExit("The capture has no resume and its hash is not in the resume store.")
+    return entry['text']
+
+
+def reference_match(requirements, resume_text):
+    # The per-requirement functions, which normalize and scan the resume once per requirement
+    for cat, req in requirements:
+        if cat == "Education":
+            education_semantic_match(req, resume_text)
+        else:
+            is_semantic_match(req, resume_text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("capture", help="Capture directory")
+    parser.add_argument("--repeat", type=int, default=1, help="Times normalization, matching and compaction are run")
+    parser.add_argument("--reference", action="store_true", help="Also run is_semantic_match and education_semantic_match per requirement")
+    parser.add_argument("--embeddings", help='Embeddings backend ("off" or "hashing"); defaults to the captured one, with hashing instead of gemini')
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    parser.add_argument("--limit", type=int, default=40, help="Number of functions listed")
+    parser.add_argument("--restrict", help="Only list functions whose file or name matches this regular expression")
+    parser.add_argument("--output", help="Write the replay profile to this file")
+    args = parser.parse_args()
+
+    manifest, inputs = load_capture(args.capture)
+    language = manifest.get('language', 'English')
+    embeddings = args.embeddings or manifest.get('embeddings', 'off')
+    embedder = create_embedder("hashing" if embeddings == "gemini" else embeddings)
+    provider = FakeProvider()
+
+    job = JobStore().get(manifest['job_id']) if manifest.get('job_id') else None
+    if 'job_details' in inputs:
+        job_details = json.loads(read_text(inputs['job_details']))
+    elif job is not None:
+        job_details = job.details
+    else:
+        print("the capture has no job details; using the fake extraction", file=sys.stderr)
+        job_details = parse_extraction(provider.generate("", "extraction"))[0]
+    if 'job_description' in inputs:
+        job_description = read_text(inputs['job_description'])
+    else:
+        job_description = job.job_description if job is not None else ""
+    edited_letter = read_text(inputs['edited_letter']) if 'edited_letter' in inputs else None
+
+    profile = cProfile.Profile()
+    timings = {}
+
+    def stage(name, fn, *fn_args):
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            return fn(*fn_args)
+        finally:
+            profile.disable()
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    resume_text = stage('resume_text', extract_resume, manifest, inputs)
+    for _ in range(args.repeat):
+        requirements = stage('requirement_normalization', flatten_requirements, job_details['requirements'], language)
+        index = stage('resume_index', ResumeIndex, resume_text, language)
+        stage('matching', match_requirements, requirements, index, embedder, EMBEDDING_THRESHOLD)
+        if args.reference:
+            stage('reference_matching', reference_match, requirements, resume_text)
+        compacted = stage('compaction', compact_prompt_inputs, resume_text, job_description, edited_letter, job_details['requirements'], language)
+        stage('cover_letter', provider.generate, "\n\n".join(text for text in compacted[:3] if text), "cover_letter")
+
+    captured = manifest.get('timings') or {}
+    print(f"capture {manifest['capture_id']} ({manifest['route']}, {language}, {len(resume_text)} resume chars, "
+          f"{len(requirements)} requirements)")
+    print(f"{'stage':>26} {'captured ms':>12} {'replay ms':>10}")
+    for name, elapsed in timings.items():
+        recorded = captured.get(name)
+        recorded = f"{recorded:.2f}" if isinstance(recorded, (int, float)) else "-"
+        print(f"{name:>26} {recorded:>12} {elapsed / args.repeat if name != 'resume_text' else elapsed:>10.2f}")
+
+    if args.output:
+        profile.dump_stats(args.output)
+    stats = pstats.Stats(profile).sort_stats(args.sort)
+    restrictions = [args.restrict, args.limit] if args.restrict else [args.limit]
+    stats.print_stats(*restrictions)
+
+
+if __name__ == "__main__":
+    main()
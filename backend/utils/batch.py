@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .embeddings import create_embedder, EMBEDDING_THRESHOLD
+from .job_store import PreparedJob
+from .matching import ResumeIndex, match_requirements
+from .scoring import build_job_fit_score
+
+BATCH_WORKERS = int(os.getenv("COVERLY_BATCH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+BATCH_MAX_PAIRS = int(os.getenv("COVERLY_BATCH_MAX_PAIRS", "20000"))
+
+_batch_pool = None
+# Embedder of this process, created on first use so pool workers get their own
+_embedder = None
+_embedder_ready = False
+
+
+def _get_embedder():
+    global _embedder, _embedder_ready
+    if not _embedder_ready:
+        _embedder = create_embedder()
+        _embedder_ready = True
+    return _embedder
+
+
+def _get_batch_pool():
+    global _batch_pool
+    if _batch_pool is None:
+        _batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+    return _batch_pool
+
+
+def shutdown_batch_pool(wait=True):
+    """
+    Stops the batch scoring processes. The pool is recreated on next use.
+
+    Args:
+        wait (bool): Wait for running tasks to finish.
+    """
+    global _batch_pool
+    pool, _batch_pool = _batch_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def score_resume_against_jobs(resume_key, resume_text, jobs, language=None):
+    """
+    Scores one resume against several jobs, indexing the resume only once.
+
+    Args:
+        resume_key (str): Identifier of the resume, returned with the scores.
+        resume_text (str): Resume text.
+        jobs (list): List of (job_key, unique_requirements) tuples. A PreparedJob from the
+            job store can stand in for the requirements; it is matched in its own language.
+        language (str, optional): Language of the requirements. Defaults to English.
+
+    Returns:
+        list: List of (resume_key, job_key, job_fit_score) tuples.
+    """
+    # One index per language, built the first time a job in that language needs it
+    indexes = {}
+    embedder = _get_embedder()
+    scores = []
+    for job_key, requirements in jobs:
+        prepared = requirements if isinstance(requirements, PreparedJob) else None
+        job_language = prepared.language if prepared else language
+        if prepared:
+            requirements = prepared.unique_requirements
+        index = indexes.get(job_language)
+        if index is None:
+            index = indexes[job_language] = ResumeIndex(resume_text, job_language)
+        matched, missing = match_requirements(requirements, index, embedder, EMBEDDING_THRESHOLD, prepared)
+        scores.append((resume_key, job_key, build_job_fit_score(matched, missing, len(requirements))))
+    return scores
+
+
+def score_batch(resumes, jobs, workers=BATCH_WORKERS, language=None):
+    """
+    Scores every resume against every job, spreading the work over a process pool.
+    Each task indexes one resume and matches it against a slice of the jobs, so that
+    one resume against many jobs is split across workers as well.
+
+    Args:
+        resumes (dict): Resume key -> resume text.
+        jobs (dict): Job key -> list of unique (category, requirement) tuples, or a PreparedJob.
+        workers (int): Number of worker processes. 1 scores inline.
+        language (str, optional): Language of the requirements. Defaults to English.
+
+    Returns:
+        list: List of (resume_key, job_key, job_fit_score) tuples.
+    """
+    job_items = list(jobs.items())
+    if not resumes or not job_items:
+        return []
+
+    # Enough slices per resume to keep every worker busy when there are few resumes
+    slices = max(1, min(len(job_items), -(-workers // len(resumes))))
+    size = -(-len(job_items) // slices)
+    tasks = [(resume_key, resume_text, job_items[start:start + size], language)
+             for resume_key, resume_text in resumes.items()
+             for start in range(0, len(job_items), size)]
+
+    if workers <= 1 or len(tasks) == 1:
+        results = [score_resume_against_jobs(*task) for task in tasks]
+    else:
+        pool = _get_batch_pool()
+        results = list(pool.map(score_resume_against_jobs, *zip(*tasks), chunksize=max(1, len(tasks) // (workers * 4))))
+    return [score for task_scores in results for score in task_scores]
+
+
+def rank_results(results, group_by=None, top_k=None):
+    """
+    Sorts scored pairs by descending score and keeps the best top_k, overall or per group.
+
+    Args:
+        results (list): Result dicts with "resume", "job" and "job_fit_score" keys.
+        group_by (str, optional): "resume" to rank jobs per resume, "job" to rank resumes per job.
+        top_k (int, optional): Number of results to keep (per group when grouped).
+
+    Returns:
+        list: Ranked result dicts.
+    """
+    ranked = sorted(results, key=lambda result: result['job_fit_score']['score'], reverse=True)
+    if not group_by:
+        return ranked[:top_k] if top_k else ranked
+    kept = []
+    counts = {}
+    for result in ranked:
+        group = result[group_by]
+        if top_k and counts.get(group, 0) >= top_k:
+            continue
+        counts[group] = counts.get(group, 0) + 1
+        kept.append(result)
+    return kept
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_BACKEND = os.getenv("COVERLY_CACHE_BACKEND", "memory")
+CACHE_SIZE = int(os.getenv("COVERLY_CACHE_SIZE", "1024"))
+CACHE_TTL = float(os.getenv("COVERLY_CACHE_TTL", "86400"))
+CACHE_PATH = os.getenv("COVERLY_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache.sqlite3"))
+
+
+def normalize_job_description(text):
+    """
+    Normalizes a job description so that copies differing only in whitespace share a cache key.
+
+    Args:
+        text (str): Job description.
+
+    Returns:
+        str: Normalized job description.
+    """
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(*parts):
+    """
+    Builds a content-addressed cache key from the given parts.
+
+    Args:
+        *parts (str): Values identifying the cached result (e.g. kind, prompt version, language, text).
+
+    Returns:
+        str: SHA-256 hex digest of the parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a size limit and time-to-live.
+
+    Args:
+        max_size (int): Maximum number of entries.
+        ttl (float): Seconds an entry stays valid. 0 disables expiry.
+    """
+
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl and time.time() - entry[1] > self.ttl:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Stores value under key, evicting the least recently used entries if full.
+        """
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Removes key from the cache. Returns True if it was present.
+        """
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        """
+        Removes every entry. Returns the number of entries removed.
+        """
+        with self._lock:
+            count = len(self._data)
+            self._data.clear()
+            return count
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, limits and hit/miss counters.
+        """
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._data), "max_size": self.max_size,
+                    "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+class SQLiteCache:
+    """
+    On-disk cache backed by SQLite, with a size limit and time-to-live.
+    Values must be JSON-serializable. Several caches can share a file using different tables.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        table (str): Table name for this cache.
+        max_size (int): Maximum number of entries.
+        ttl (float): Seconds an entry stays valid. 0 disables expiry.
+    """
+
+    def __init__(self, path=CACHE_PATH, table="cache", max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        if not re.fullmatch(r'\w+', table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Stores value under key, evicting the least recently used entries if full.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        """
+        Removes key from the cache. Returns True if it was present.
+        """
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def clear(self):
+        """
+        Removes every entry. Returns the number of entries removed.
+        """
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, limits and hit/miss counters.
+        """
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return {"backend": "sqlite", "entries": entries, "max_size": self.max_size,
+                    "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+def create_cache(table, backend=None, max_size=None, ttl=None, path=None):
+    """
+    Creates a cache using the backend configured by COVERLY_CACHE_BACKEND ("memory" or "sqlite").
+
+    Args:
+        table (str): Name of the cache, used as the SQLite table name.
+        backend (str, optional): Overrides the configured backend.
+        max_size (int, optional): Overrides COVERLY_CACHE_SIZE.
+        ttl (float, optional): Overrides COVERLY_CACHE_TTL.
+        path (str, optional): Overrides COVERLY_CACHE_PATH for the SQLite backend.
+
+    Returns:
+        LRUCache or SQLiteCache: The cache instance.
+    """
+    backend = backend or CACHE_BACKEND
+    max_size = CACHE_SIZE if max_size is None else max_size
+    ttl = CACHE_TTL if ttl is None else ttl
+    if backend == "sqlite":
+        return SQLiteCache(path or CACHE_PATH, table=table, max_size=max_size, ttl=ttl)
+    if backend == "memory":
+        return LRUCache(max_size=max_size, ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
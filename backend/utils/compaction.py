@@ -0,0 +1,289 @@
+import math
+import os
+import re
+
+from .automaton import AhoCorasick
+from .languages import get_pipeline
+from .text_processing import flatten_requirements
+
+COMPACTION = os.getenv("COVERLY_COMPACTION", "1") != "0"
+RESUME_TOKEN_BUDGET = int(os.getenv("COVERLY_RESUME_TOKEN_BUDGET", "1500"))
+JOB_TOKEN_BUDGET = int(os.getenv("COVERLY_JOB_TOKEN_BUDGET", "1000"))
+LETTER_TOKEN_BUDGET = int(os.getenv("COVERLY_LETTER_TOKEN_BUDGET", "1000"))
+# Rough token estimate used for the budgets; close enough for English and French
+CHARS_PER_TOKEN = 4
+
+_SPACES = re.compile(r'[ \t\f\v\u00a0\u200b]+')
+_PAGE_ARTIFACT = re.compile(r'^(page\s*\d+(\s*(of|/|sur)\s*\d+)?|\d+\s*(/|of|sur)\s*\d+|[-–—\s]*\d{1,3}[-–—\s]*)$', re.I)
+_WORDS = re.compile(r'\b\w+\b')
+# One-word lines such as "C", "R", "Go" or "C++" in a skills list
+_SHORT_TOKEN = re.compile(r'^[^\W_][\w+#.]{0,4}$')
+# Non-blank lines at the top and bottom of a page where headers and footers are looked for
+HEADER_FOOTER_LINES = 2
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "experience", "work experience", "professional experience",
+    "employment", "education", "skills", "technical skills", "projects", "certifications",
+    "languages", "interests", "awards", "publications", "volunteering", "references", "contact",
+    "résumé", "profil", "expérience", "expériences professionnelles", "formation", "compétences",
+    "projets", "langues", "centres d'intérêt", "الملخص", "الخبرة", "الخبرات", "التعليم", "المهارات",
+    "المشاريع", "الشهادات", "اللغات",
+}
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of model tokens in text.
+
+    Args:
+        text (str): Input text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _is_junk(line):
+    if _PAGE_ARTIFACT.match(line):
+        return True
+    if _SHORT_TOKEN.match(line):
+        return False
+    visible = line.replace(" ", "")
+    alnum = sum(char.isalnum() for char in visible)
+    # OCR noise: stray marks and lines made mostly of punctuation
+    return alnum < 2 or alnum < 0.25 * len(visible)
+
+
+def _header_footer_lines(pages):
+    # Lines found at the top or bottom of at least two pages
+    positions = {}
+    for number, page in enumerate(pages):
+        lines = [key for key in (_SPACES.sub(" ", line).strip().casefold() for line in page.splitlines()) if key]
+        for key in lines[:HEADER_FOOTER_LINES] + lines[-HEADER_FOOTER_LINES:]:
+            positions.setdefault(key, set()).add(number)
+    return {key for key, numbers in positions.items() if len(numbers) > 1}
+
+
+def clean_lines(text):
+    """
+    Collapses whitespace, drops OCR junk and page artifacts (page numbers, "Page 2 of 3"),
+    consecutive duplicate lines, and headers and footers repeated at the top or bottom of
+    several pages (pages are separated by form feeds, see extract_text_from_pdf), whose
+    first occurrence is kept. Other repeated lines, such as two identical job titles, are kept.
+    Blank lines are kept, collapsed to one, as paragraph separators.
+
+    Args:
+        text (str): Raw text.
+
+    Returns:
+        list: Cleaned lines, with "" between paragraphs.
+    """
+    pages = text.split("\f")
+    repeated = _header_footer_lines(pages) if len(pages) > 1 else set()
+    lines = []
+    seen = set()
+    previous = None
+    for page in pages:
+        page_lines = [_SPACES.sub(" ", raw_line).strip() for raw_line in page.splitlines()]
+        content = [position for position, line in enumerate(page_lines) if line]
+        edges = set(content[:HEADER_FOOTER_LINES] + content[-HEADER_FOOTER_LINES:])
+        for position, line in enumerate(page_lines):
+            if not line:
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+            key = line.casefold()
+            if key == previous or _is_junk(line):
+                continue
+            if position in edges and key in repeated:
+                if key in seen:
+                    continue
+                seen.add(key)
+            previous = key
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _is_heading(line):
+    words = line.split()
+    if len(words) > 4:
+        return False
+    bare = line.rstrip(":").strip()
+    return bare.casefold() in SECTION_HEADINGS or line.endswith(":") or (bare.isupper() and len(bare) > 2)
+
+
+def split_sections(lines):
+    """
+    Groups cleaned lines into sections, starting a new one at blank lines and headings.
+
+    Args:
+        lines (list): Output of clean_lines.
+
+    Returns:
+        list: Sections as lists of lines.
+    """
+    sections = [[]]
+    for line in lines:
+        if not line or _is_heading(line):
+            if sections[-1]:
+                sections.append([])
+            if not line:
+                continue
+        sections[-1].append(line)
+    return [section for section in sections if section]
+
+
+def _truncate(lines, budget):
+    # Leading lines of a section that fit in budget (with the blank line after it); the first
+    # line is cut when it alone does not fit
+    kept = []
+    chars = 2
+    for line in lines:
+        chars += len(line) + (1 if kept else 0)
+        if math.ceil(chars / CHARS_PER_TOKEN) > budget:
+            break
+        kept.append(line)
+    if not kept and budget > 0:
+        kept = [lines[0][:budget * CHARS_PER_TOKEN - 2]]
+    return [line for line in kept if line]
+
+
+def _fit(sections, order, budget):
+    # Keeps sections in order of preference while they fit, cutting the first one that does
+    # not fit to the remaining budget, then restores document order
+    kept = {}
+    used = 0
+    for position in order:
+        # Includes the blank line separating it from the next section
+        tokens = estimate_tokens("\n".join(sections[position]) + "\n\n")
+        if used + tokens <= budget:
+            kept[position] = sections[position]
+            used += tokens
+        elif budget - used > 0:
+            lines = _truncate(sections[position], budget - used)
+            if lines:
+                kept[position] = lines
+                used += estimate_tokens("\n".join(lines) + "\n\n")
+    return "\n\n".join("\n".join(kept[position]) for position in sorted(kept))
+
+
+def rank_sections(sections, job_description, requirements_json=None, language=None):
+    """
+    Scores resume sections by relevance to the job: each requirement found in a section
+    counts twice, each job description keyword once.
+
+    Args:
+        sections (list): Sections as lists of lines.
+        job_description (str): Job description text.
+        requirements_json (dict, optional): Extracted requirements grouped by category.
+        language (str, optional): Language of the job description. Defaults to English.
+
+    Returns:
+        list: Score of each section.
+    """
+    pipeline = get_pipeline(language)
+    keywords = set(pipeline.extract_keywords(job_description, top_n=40))
+    requirements = []
+    if requirements_json:
+        requirements = [pipeline.normalize_text(req) for _, req in flatten_requirements(requirements_json, language)]
+    automaton = AhoCorasick(requirements)
+    scores = []
+    for section in sections:
+        text = "\n".join(section)
+        words = set(_WORDS.findall(pipeline.fold(text)))
+        scores.append(2 * len(automaton.find_all(pipeline.normalize_text(text))) + len(keywords & words))
+    return scores
+
+
+def resume_over_budget(resume_text, budget=None):
+    """
+    Tells whether compaction will have to drop resume sections, which are then ranked
+    by the extracted requirements. Callers wait for extraction only in that case; a resume
+    within budget is only cleaned, so its prompt does not depend on the requirements.
+
+    Args:
+        resume_text (str): Resume text.
+        budget (int, optional): Maximum number of tokens. Defaults to COVERLY_RESUME_TOKEN_BUDGET.
+
+    Returns:
+        bool: True if the cleaned resume is over budget.
+    """
+    budget = RESUME_TOKEN_BUDGET if budget is None else budget
+    return COMPACTION and estimate_tokens("\n".join(clean_lines(resume_text))) > budget
+
+
+def compact_resume(resume_text, job_description, requirements_json=None, budget=None, language=None):
+    """
+    Cleans the resume and, when it is over budget, keeps its most relevant sections.
+    The first section (name and contact details) is always kept first, and the first
+    section that does not fit is cut to the remaining budget rather than dropped.
+
+    Args:
+        resume_text (str): Resume text.
+        job_description (str): Job description text.
+        requirements_json (dict, optional): Extracted requirements, if already known.
+        budget (int, optional): Maximum number of tokens. Defaults to COVERLY_RESUME_TOKEN_BUDGET.
+        language (str, optional): Language of the job description. Defaults to English.
+
+    Returns:
+        str: Compacted resume text.
+    """
+    budget = RESUME_TOKEN_BUDGET if budget is None else budget
+    sections = split_sections(clean_lines(resume_text))
+    text = "\n\n".join("\n".join(section) for section in sections)
+    if estimate_tokens(text) <= budget:
+        return text
+    scores = rank_sections(sections, job_description, requirements_json, language)
+    order = [0] + sorted(range(1, len(sections)), key=lambda position: (-scores[position], position))
+    return _fit(sections, order, budget) or text[:budget * CHARS_PER_TOKEN]
+
+
+def compact_text(text, budget):
+    """
+    Cleans text and keeps the paragraphs that fit in the budget, in order; the first
+    paragraph that does not fit is cut to the remaining budget.
+
+    Args:
+        text (str): Input text (job description or previous letter).
+        budget (int): Maximum number of tokens.
+
+    Returns:
+        str: Compacted text.
+    """
+    sections = split_sections(clean_lines(text))
+    return _fit(sections, range(len(sections)), budget) or text.strip()[:budget * CHARS_PER_TOKEN]
+
+
+def compact_prompt_inputs(resume_text, job_description, edited_letter=None, requirements_json=None, language=None):
+    """
+    Compacts the texts sent in the cover letter prompt to the configured token budgets.
+
+    Args:
+        resume_text (str): Resume text.
+        job_description (str): Job description text.
+        edited_letter (str, optional): Previous version of the letter.
+        requirements_json (dict, optional): Extracted requirements, if already known.
+        language (str, optional): Language of the job description. Defaults to English.
+
+    Returns:
+        tuple: (resume_text, job_description, edited_letter, stats) where stats holds the
+            character and estimated token counts before and after compaction.
+    """
+    originals = [resume_text, job_description, edited_letter or ""]
+    if COMPACTION:
+        resume_text = compact_resume(resume_text, job_description, requirements_json, language=language)
+        job_description = compact_text(job_description, JOB_TOKEN_BUDGET)
+        if edited_letter:
+            edited_letter = compact_text(edited_letter, LETTER_TOKEN_BUDGET)
+    original_chars = sum(len(text) for text in originals)
+    compacted_chars = len(resume_text) + len(job_description) + len(edited_letter or "")
+    stats = {
+        'original_chars': original_chars,
+        'compacted_chars': compacted_chars,
+        'original_tokens': sum(estimate_tokens(text) for text in originals),
+        'compacted_tokens': estimate_tokens(resume_text) + estimate_tokens(job_description) + estimate_tokens(edited_letter or ""),
+        'reduction': round(1 - compacted_chars / original_chars, 3) if original_chars else 0.0,
+    }
+    return resume_text, job_description, edited_letter, stats
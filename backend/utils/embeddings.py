@@ -0,0 +1,199 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from .cache import LRUCache
+from .providers import configure_gemini
+
+EMBEDDINGS_BACKEND = os.getenv("COVERLY_EMBEDDINGS", "off")
+EMBEDDING_MODEL = os.getenv("COVERLY_EMBEDDING_MODEL", "models/text-embedding-004")
+EMBEDDING_THRESHOLD = float(os.getenv("COVERLY_EMBEDDING_THRESHOLD", "0.78"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("COVERLY_EMBEDDING_CACHE_SIZE", "20000"))
+CHUNK_WORDS = int(os.getenv("COVERLY_CHUNK_WORDS", "60"))
+CHUNK_OVERLAP = int(os.getenv("COVERLY_CHUNK_OVERLAP", "15"))
+
+
+def chunk_text(text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    Splits text into overlapping windows of words, so that each chunk can be embedded on its own.
+
+    Args:
+        text (str): Text to split.
+        chunk_words (int): Number of words per chunk.
+        overlap (int): Number of words shared by consecutive chunks.
+
+    Returns:
+        list: Chunk strings. Empty if the text has no words.
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(chunk_words - overlap, 1)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+class GeminiEmbeddingBackend:
+    """
+    Embeds texts with the Gemini embedding API, several texts per request.
+
+    Args:
+        model (str): Embedding model name.
+        batch_size (int): Maximum number of texts per request.
+    """
+
+    def __init__(self, model=EMBEDDING_MODEL, batch_size=100):
+        configure_gemini()
+        self.model = model
+        self.batch_size = batch_size
+        self.name = f"gemini:{model}"
+
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            np.ndarray: Matrix with one embedding row per text.
+        """
+        import google.generativeai as genai
+
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            response = genai.embed_content(model=self.model, content=batch, task_type="semantic_similarity")
+            vectors.extend(response["embedding"])
+        return np.asarray(vectors, dtype=np.float32)
+
+
+@lru_cache(maxsize=200000)
+def _feature_bucket(feature, dim):
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbeddingBackend:
+    """
+    Deterministic local embedding stand-in based on hashed words and character trigrams.
+    Needs no network, so it is used for tests and benchmarks.
+
+    Args:
+        dim (int): Embedding dimension.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def embed(self, texts):
+        """
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            np.ndarray: Matrix with one embedding row per text.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                padded = f"#{word}#"
+                features = [word] + [padded[i:i + 3] for i in range(len(padded) - 2)]
+                for feature in features:
+                    bucket, sign = _feature_bucket(feature, self.dim)
+                    vectors[row, bucket] += sign
+        return vectors
+
+
+class CachedEmbedder:
+    """
+    Embeds texts in batches and caches the vectors by content hash, so that a text
+    (a resume chunk or a requirement) is only sent to the backend once.
+
+    Args:
+        backend: Object with a name attribute and an embed(texts) method returning a matrix.
+        cache (LRUCache, optional): Vector cache. Defaults to an in-process LRU cache.
+    """
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache or LRUCache(max_size=EMBEDDING_CACHE_SIZE, ttl=0)
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.backend.name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts):
+        """
+        Returns L2-normalized embeddings of texts, calling the backend once for all uncached texts.
+
+        Args:
+            texts (list): Texts to embed.
+
+        Returns:
+            np.ndarray: Matrix with one unit-length row per text.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            embedded = np.asarray(self.backend.embed(missing), dtype=np.float32)
+            norms = np.linalg.norm(embedded, axis=1, keepdims=True)
+            embedded = embedded / np.where(norms == 0, 1, norms)
+            fresh = dict(zip(missing, embedded))
+            for key, text in zip(keys, texts):
+                if text in fresh:
+                    self.cache.set(key, fresh[text])
+            vectors = [fresh[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def max_similarities(self, queries, passages, query_vectors=None):
+        """
+        Scores every query against every passage with one matrix multiply.
+
+        Args:
+            queries (list): Query texts (requirements).
+            passages (list): Passage texts (resume chunks).
+            query_vectors (dict, optional): Query text -> stored unit-length vector, for
+                queries embedded ahead of time (see utils.job_store).
+
+        Returns:
+            np.ndarray: Highest cosine similarity of each query over all passages.
+        """
+        if not queries:
+            return np.zeros(0, dtype=np.float32)
+        if not passages:
+            return np.zeros(len(queries), dtype=np.float32)
+        if query_vectors and all(query in query_vectors for query in queries):
+            similarities = np.vstack([query_vectors[query] for query in queries]) @ self.embed(list(passages)).T
+            return similarities.max(axis=1)
+        vectors = self.embed(list(queries) + list(passages))
+        similarities = vectors[:len(queries)] @ vectors[len(queries):].T
+        return similarities.max(axis=1)
+
+
+def create_embedder(backend=None):
+    """
+    Creates the embedder configured by COVERLY_EMBEDDINGS ("off", "gemini" or "hashing").
+
+    Args:
+        backend (str, optional): Overrides the configured backend.
+
+    Returns:
+        CachedEmbedder or None: The embedder, or None when embeddings are off.
+    """
+    backend = backend or EMBEDDINGS_BACKEND
+    if backend == "off":
+        return None
+    if backend == "gemini":
+        return CachedEmbedder(GeminiEmbeddingBackend())
+    if backend == "hashing":
+        return CachedEmbedder(HashingEmbeddingBackend())
+    raise ValueError(f"Unknown embeddings backend: {backend}")
@@ -0,0 +1,299 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+from .metrics import STAGE_SECONDS
+
+EXECUTOR_WORKERS = int(os.getenv("COVERLY_EXECUTOR_WORKERS", "16"))
+STAGE_TIMEOUT = float(os.getenv("COVERLY_STAGE_TIMEOUT", "60"))
+CONCURRENT_STAGES = os.getenv("COVERLY_CONCURRENT_STAGES", "1") != "0"
+
+_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="coverly-stage")
+_executor_lock = threading.Lock()
+
+
+class StageTimeoutError(RuntimeError):
+    """Raised when a stage does not finish within its timeout."""
+
+
+def get_executor():
+    """
+    Returns the shared, bounded thread pool used to run request stages.
+
+    Returns:
+        ThreadPoolExecutor: The shared executor.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="coverly-stage")
+        return _executor
+
+
+def shutdown_executor(wait=True):
+    """
+    Stops the shared thread pool, cancelling stages that have not started. A new pool
+    is created on next use.
+
+    Args:
+        wait (bool): Wait for running stages to finish.
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class StageRunner:
+    """
+    Runs the named stages of a single request on the shared thread pool and records
+    how long each one took, both for the response and in the stage duration histogram.
+    Used as a context manager so that stages still pending when the request fails are
+    cancelled instead of occupying a worker.
+
+    Args:
+        executor (Executor, optional): Executor to submit stages to. Defaults to the shared pool.
+        timeout (float): Default number of seconds to wait for a stage result.
+        concurrent (bool, optional): If False, stages run inline when submitted. Defaults to COVERLY_CONCURRENT_STAGES.
+    """
+
+    def __init__(self, executor=None, timeout=STAGE_TIMEOUT, concurrent=None):
+        self.executor = executor or get_executor()
+        self.timeout = timeout
+        self.concurrent = CONCURRENT_STAGES if concurrent is None else concurrent
+        self.timings = {}
+        self._futures = {}
+        self._started = time.perf_counter()
+
+    def _record(self, name, elapsed):
+        self.timings[name] = round(elapsed * 1000, 2)
+        STAGE_SECONDS.labels(stage=name).observe(elapsed)
+
+    def _timed(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def submit(self, name, fn, *args, **kwargs):
+        """
+        Starts a stage in the background.
+
+        Args:
+            name (str): Stage name, used for timings and to fetch the result.
+            fn (callable): Function to run.
+
+        Returns:
+            Future: The future of the stage.
+        """
+        if self.concurrent:
+            future = self.executor.submit(self._timed, name, fn, *args, **kwargs)
+        else:
+            future = Future()
+            try:
+                future.set_result(self._timed(name, fn, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        self._futures[name] = future
+        return future
+
+    def result(self, name, timeout=None):
+        """
+        Waits for a stage and returns its result, re-raising any exception it raised.
+
+        Args:
+            name (str): Stage name given to submit().
+            timeout (float, optional): Seconds to wait. Defaults to the runner timeout.
+
+        Returns:
+            The value returned by the stage function.
+        """
+        future = self._futures[name]
+        try:
+            return future.result(timeout=timeout if timeout is not None else self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise StageTimeoutError(f"Stage '{name}' timed out")
+
+    def map(self, name, fn, items, timeout=None):
+        """
+        Runs fn on every item concurrently and records one timing for the whole group.
+
+        Args:
+            name (str): Stage name used for the timing.
+            fn (callable): Function called with each item.
+            items (iterable): Arguments for fn.
+            timeout (float, optional): Seconds to wait for all items. Defaults to the runner timeout.
+
+        Returns:
+            list: Results in the order of items.
+        """
+        with self.measure(name):
+            if not self.concurrent:
+                return [fn(item) for item in items]
+            futures = [self.executor.submit(fn, item) for item in items]
+            deadline = time.perf_counter() + (timeout if timeout is not None else self.timeout)
+            try:
+                return [future.result(timeout=max(deadline - time.perf_counter(), 0)) for future in futures]
+            except FutureTimeoutError:
+                raise StageTimeoutError(f"Stage '{name}' timed out")
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Times a stage that runs inline in the request thread.
+
+        Args:
+            name (str): Stage name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def peek(self, name):
+        """
+        Returns the result of a stage that already finished successfully, without waiting.
+
+        Args:
+            name (str): Stage name given to submit().
+
+        Returns:
+            The value returned by the stage function, or None if it is still running or failed.
+        """
+        future = self._futures.get(name)
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def cancel_pending(self):
+        """
+        Cancels every stage that has not started yet.
+        """
+        for future in self._futures.values():
+            future.cancel()
+
+    def summary(self):
+        """
+        Returns:
+            dict: Per-stage timings in milliseconds, plus the total elapsed time.
+        """
+        timings = dict(self.timings)
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 2)
+        return timings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cancel_pending()
+        return False
+
+
+class AsyncStageRunner(StageRunner):
+    """
+    Asyncio counterpart of StageRunner for the ASGI app. Coroutine functions run as
+    tasks on the event loop, so waiting on the model holds no thread, while blocking
+    functions (OCR, PDF parsing, matching) are offloaded to the shared thread pool.
+    Used as an async context manager so that pending stages are cancelled when the
+    request fails or the client disconnects.
+
+    Args:
+        executor (Executor, optional): Executor for blocking stages. Defaults to the shared pool.
+        timeout (float): Default number of seconds to wait for a stage result.
+    """
+
+    def __init__(self, executor=None, timeout=STAGE_TIMEOUT):
+        super().__init__(executor, timeout, concurrent=True)
+
+    async def _call(self, fn, *args):
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+
+    async def _timed(self, name, fn, *args):
+        start = time.perf_counter()
+        try:
+            return await self._call(fn, *args)
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def submit(self, name, fn, *args):
+        """
+        Starts a stage in the background.
+
+        Args:
+            name (str): Stage name, used for timings and to fetch the result.
+            fn (callable): Coroutine function, or blocking function to run on the executor.
+
+        Returns:
+            asyncio.Task: The task of the stage.
+        """
+        task = asyncio.ensure_future(self._timed(name, fn, *args))
+        self._futures[name] = task
+        return task
+
+    async def result(self, name, timeout=None):
+        """
+        Waits for a stage and returns its result, re-raising any exception it raised.
+
+        Args:
+            name (str): Stage name given to submit().
+            timeout (float, optional): Seconds to wait. Defaults to the runner timeout.
+
+        Returns:
+            The value returned by the stage function.
+        """
+        task = self._futures[name]
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout if timeout is not None else self.timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+            raise StageTimeoutError(f"Stage '{name}' timed out")
+
+    async def run(self, name, fn, *args):
+        """
+        Runs a stage and waits for its result.
+        """
+        self.submit(name, fn, *args)
+        return await self.result(name)
+
+    async def map(self, name, fn, items, timeout=None):
+        """
+        Runs fn on every item concurrently and records one timing for the whole group.
+
+        Args:
+            name (str): Stage name used for the timing.
+            fn (callable): Coroutine function or blocking function called with each item.
+            items (iterable): Arguments for fn.
+            timeout (float, optional): Seconds to wait for all items. Defaults to the runner timeout.
+
+        Returns:
+            list: Results in the order of items.
+        """
+        with self.measure(name):
+            tasks = [asyncio.ensure_future(self._call(fn, item)) for item in items]
+            try:
+                return await asyncio.wait_for(asyncio.gather(*tasks), timeout if timeout is not None else self.timeout)
+            except asyncio.TimeoutError:
+                raise StageTimeoutError(f"Stage '{name}' timed out")
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.cancel_pending()
+        return False
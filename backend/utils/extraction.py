@@ -0,0 +1,94 @@
+import json
+import re
+
+from .metrics import EXTRACTION_FALLBACKS, observe_stage
+from .text_processing import REQUIREMENT_CATEGORIES
+
+# Response schema of the fused extraction prompt (OpenAPI subset accepted by Gemini)
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "job_title": {"type": "string"},
+        **{category: {"type": "array", "items": {"type": "string"}} for category in REQUIREMENT_CATEGORIES},
+    },
+    "required": ["job_title"] + REQUIREMENT_CATEGORIES,
+}
+
+_TITLE_PATTERN = re.compile(r'"job_title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_CATEGORY_PATTERNS = {category: re.compile(rf'"{category}"\s*:\s*\[(.*?)\]', re.DOTALL) for category in REQUIREMENT_CATEGORIES}
+_ITEM_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_CODE_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+def _clean_items(items):
+    if not isinstance(items, list):
+        return []
+    cleaned = []
+    for item in items:
+        if isinstance(item, str) and item.strip():
+            cleaned.append(item.strip())
+    return cleaned
+
+
+def validate_extraction(data):
+    """
+    Checks a decoded extraction response and keeps only well-formed values.
+
+    Args:
+        data (dict): Decoded model response.
+
+    Returns:
+        dict: {"job_title": str, "requirements": {category: [str, ...]}}.
+
+    Raises:
+        ValueError: If data is not a JSON object.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Extraction response is not a JSON object")
+    job_title = data.get("job_title")
+    return {
+        "job_title": job_title.strip() if isinstance(job_title, str) else "",
+        "requirements": {category: _clean_items(data.get(category)) for category in REQUIREMENT_CATEGORIES},
+    }
+
+
+def salvage_extraction(text):
+    """
+    Recovers what it can from an extraction response that is not valid JSON, e.g. a
+    truncated one. Only used when the schema-constrained response fails to parse.
+
+    Args:
+        text (str): Raw model response.
+
+    Returns:
+        dict: Same shape as validate_extraction.
+    """
+    title = _TITLE_PATTERN.search(text)
+    requirements = {}
+    for category, pattern in _CATEGORY_PATTERNS.items():
+        match = pattern.search(text)
+        requirements[category] = _clean_items(_ITEM_PATTERN.findall(match.group(1))) if match else []
+    return {"job_title": title.group(1).strip() if title else "", "requirements": requirements}
+
+
+def parse_extraction(text):
+    """
+    Parses and validates the response to the fused extraction prompt, falling back to
+    salvage_extraction (counted in the fallback metric) when it is not valid JSON.
+
+    Args:
+        text (str): Raw model response.
+
+    Returns:
+        tuple: (details, complete) where details is {"job_title": str, "requirements":
+            {category: [str, ...]}} and complete is False if the response had to be salvaged
+            or has no requirements at all (e.g. a refusal). Incomplete results are not cached
+            or stored, so that a bad response is not served for every candidate.
+    """
+    try:
+        details = validate_extraction(json.loads(_CODE_FENCE.sub("", text.strip())))
+    except ValueError:
+        EXTRACTION_FALLBACKS.inc()
+        with observe_stage('extraction_fallback_parse'):
+            return salvage_extraction(text), False
+    return details, any(details["requirements"].values())
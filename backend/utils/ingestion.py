@@ -0,0 +1,189 @@
+import hashlib
+import os
+import tempfile
+import warnings
+
+from PIL import Image
+
+MAX_UPLOAD_BYTES = int(os.getenv("COVERLY_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Uploads larger than this are spooled to disk instead of memory
+UPLOAD_SPOOL_BYTES = int(os.getenv("COVERLY_UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+# PDFs with more pages are rejected before any page is read (COVERLY_PDF_MAX_PAGES still limits how many are read)
+MAX_DOCUMENT_PAGES = int(os.getenv("COVERLY_MAX_DOCUMENT_PAGES", "100"))
+# Images (uploads, PDF scans and rendered pages) with more pixels are rejected before decoding
+MAX_IMAGE_PIXELS = int(os.getenv("COVERLY_MAX_IMAGE_PIXELS", str(40_000_000)))
+CHUNK_SIZE = 64 * 1024
+
+# Pillow refuses to decode images above twice this limit anywhere in the process, OCR workers included
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+_SIGNATURES = [
+    (b"%PDF-", "pdf"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+]
+IMAGE_KINDS = ("png", "jpeg")
+
+
+class IngestionError(ValueError):
+    """
+    Raised when an upload is rejected. status is the HTTP status routes answer with.
+    """
+
+    status = 400
+
+
+class UnsupportedFileType(IngestionError):
+    """Raised when an uploaded resume is neither a PDF nor a supported image."""
+
+    status = 415
+
+    def __init__(self, message='Unsupported file type. Please upload a PDF or image.'):
+        super().__init__(message)
+
+
+class UploadTooLarge(IngestionError):
+    """Raised when an upload exceeds COVERLY_MAX_UPLOAD_BYTES."""
+
+    status = 413
+
+
+class DocumentTooLarge(IngestionError):
+    """Raised when a PDF has too many pages or an image too many pixels to be decoded safely."""
+
+    status = 413
+
+
+def sniff_type(head):
+    """
+    Identifies a resume file from its first bytes instead of its name.
+
+    Args:
+        head (bytes): First bytes of the file (at least 8; PDFs may start with up to 1 KB of junk).
+
+    Returns:
+        str or None: "pdf", "png", "jpeg", or None if unsupported.
+    """
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    # Readers accept a PDF header anywhere in the first kilobyte
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    return None
+
+
+def check_image_pixels(width, height, max_pixels=MAX_IMAGE_PIXELS):
+    """
+    Raises DocumentTooLarge if an image of this size would be too large to decode.
+    """
+    if width * height > max_pixels:
+        raise DocumentTooLarge(f'The image is too large ({width}x{height} pixels). The limit is {max_pixels} pixels.')
+
+
+def check_page_count(page_count, max_pages=MAX_DOCUMENT_PAGES):
+    """
+    Raises DocumentTooLarge if a PDF has more pages than allowed.
+    """
+    if page_count > max_pages:
+        raise DocumentTooLarge(f'The PDF has {page_count} pages. The limit is {max_pages} pages.')
+
+
+class Upload:
+    """
+    A resume upload spooled to a temporary file (in memory while small, on disk beyond
+    COVERLY_UPLOAD_SPOOL_BYTES), with its size, SHA-256 and type found from its content.
+
+    Args:
+        file (SpooledTemporaryFile): Spooled content.
+        filename (str): Name given by the client, kept for display only.
+        size (int): Size in bytes.
+        sha256 (str): Hex digest of the content.
+        kind (str): "pdf", "png" or "jpeg".
+    """
+
+    def __init__(self, file, filename, size, sha256, kind):
+        self.file = file
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.kind = kind
+
+    @property
+    def is_image(self):
+        return self.kind in IMAGE_KINDS
+
+    def open(self):
+        """
+        Returns the spooled file, rewound.
+        """
+        self.file.seek(0)
+        return self.file
+
+    def read(self):
+        """
+        Returns the whole content. Bounded by the upload size limit.
+        """
+        return self.open().read()
+
+    def close(self):
+        self.file.close()
+
+
+def spool_upload(stream, filename=None, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Copies an upload stream to a spooled temporary file in chunks, hashing it on the way,
+    and checks its type from its magic bytes and, for images, its pixel count from the header.
+
+    Args:
+        stream (file-like object): Upload stream.
+        filename (str, optional): Name given by the client.
+        max_bytes (int): Maximum upload size.
+
+    Returns:
+        Upload: The spooled upload.
+
+    Raises:
+        UploadTooLarge: If the stream is longer than max_bytes.
+        UnsupportedFileType: If the content is neither a PDF nor a PNG or JPEG image.
+        DocumentTooLarge: If the image has too many pixels.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f'The resume is too large. The limit is {max_bytes / (1024 * 1024):.3g} MB.')
+            if len(head) < 1024:
+                head += chunk[:1024 - len(head)]
+            digest.update(chunk)
+            spool.write(chunk)
+
+        kind = sniff_type(head)
+        if kind is None:
+            raise UnsupportedFileType()
+        upload = Upload(spool, filename or "", size, digest.hexdigest(), kind)
+        if upload.is_image:
+            # Opening only parses the header; pixels are decoded later, in the OCR workers
+            try:
+                with warnings.catch_warnings():
+                    # Sizes between the limit and twice the limit are rejected below instead
+                    warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                    with Image.open(upload.open()) as image:
+                        width, height = image.size
+            except Image.DecompressionBombError:
+                raise DocumentTooLarge(f'The image is too large. The limit is {MAX_IMAGE_PIXELS} pixels.')
+            except OSError:
+                raise UnsupportedFileType('The image could not be read. Please upload a PDF or image.')
+            check_image_pixels(width, height)
+        upload.open()
+        return upload
+    except BaseException:
+        spool.close()
+        raise
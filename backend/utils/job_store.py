@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .automaton import AhoCorasick
+from .cache import LRUCache, make_cache_key, normalize_job_description
+from .languages import get_pipeline
+from .text_processing import flatten_requirements
+
+JOB_STORE_PATH = os.getenv("COVERLY_JOB_STORE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jobs.sqlite3"))
+# Prepared jobs kept in memory, so repeated requests for a posting skip decoding and automaton building
+JOB_CACHE_SIZE = int(os.getenv("COVERLY_JOB_CACHE_SIZE", "256"))
+JOB_ID_PATTERN = re.compile(r'[\w.:-]{1,128}')
+
+
+class PreparedJob:
+    """
+    A stored job posting with everything matching needs computed ahead of time: the
+    de-duplicated requirements, their normalized forms and alias expansions, and
+    optionally their embedding vectors. Passed to match_requirements as `prepared`.
+
+    Args:
+        job_id (str): Job ID.
+        language (str): Language name the requirements were extracted in.
+        job_description (str): Posting text, used in the cover letter prompt.
+        job_title (str): Extracted job title.
+        requirements (dict): Requirements grouped by category, as extracted.
+        unique_requirements (list): Output of flatten_requirements.
+        normalized (dict): Requirement -> normalized requirement.
+        aliases (dict): Requirement -> normalized aliases that satisfy it.
+        vectors (dict, optional): Requirement -> unit-length embedding vector.
+    """
+
+    def __init__(self, job_id, language, job_description, job_title, requirements, unique_requirements, normalized,
+                 aliases, vectors=None):
+        self.job_id = job_id
+        self.language = language
+        self.job_description = job_description
+        self.job_title = job_title
+        self.requirements = requirements
+        self.unique_requirements = unique_requirements
+        self.normalized = normalized
+        self.aliases = aliases
+        self.vectors = vectors or {}
+        self._automaton = None
+
+    @property
+    def automaton(self):
+        """
+        Automaton over the normalized requirements, built on first use.
+        """
+        if self._automaton is None:
+            self._automaton = AhoCorasick(self.normalized.values())
+        return self._automaton
+
+    @property
+    def details(self):
+        """
+        The job in the shape returned by extract_job_details.
+        """
+        return {'job_title': self.job_title, 'requirements': self.requirements}
+
+    def __getstate__(self):
+        # Batch scoring sends jobs to worker processes; they rebuild the automaton
+        state = self.__dict__.copy()
+        state['_automaton'] = None
+        return state
+
+
+def make_job_id(language, job_description):
+    """
+    Returns the content-derived ID of a posting stored without an explicit ID, so that
+    importing the same posting twice updates it instead of duplicating it.
+    """
+    return make_cache_key('job', language, normalize_job_description(job_description))[:32]
+
+
+def prepare_artifacts(requirements, language, embedder=None):
+    """
+    Computes the matching artifacts of extracted requirements.
+
+    Args:
+        requirements (dict): Requirements grouped by category.
+        language (str): Language name the requirements were extracted in.
+        embedder (CachedEmbedder, optional): Embedder for the requirement vectors.
+
+    Returns:
+        dict: JSON-serializable artifacts, plus "vectors" as a matrix (or None).
+    """
+    pipeline = get_pipeline(language)
+    unique_requirements = flatten_requirements(requirements, language)
+    texts = list(dict.fromkeys(req for _, req in unique_requirements))
+    return {
+        'unique_requirements': [list(item) for item in unique_requirements],
+        'normalized': {req: pipeline.normalize_text(req) for req in texts},
+        'aliases': {req: sorted(pipeline.alias_lookup[pipeline.fold(req)]) for req in texts if pipeline.fold(req) in pipeline.alias_lookup},
+        'embedding_model': embedder.backend.name if embedder and texts else None,
+        'vectors': embedder.embed(texts) if embedder and texts else None,
+    }
+
+
+class JobStore:
+    """
+    SQLite store of job postings by ID with their extracted title and requirements and the
+    precomputed matching artifacts, so that requests naming a job_id go straight to matching.
+    Unlike the extraction cache, entries do not expire and are not evicted.
+
+    Args:
+        path (str): Path of the SQLite database file.
+        embedder (CachedEmbedder, optional): Embedder whose vectors are stored with each job.
+            Stored vectors of another embedding model are ignored.
+        cache_size (int): Number of prepared jobs kept in memory.
+    """
+
+    def __init__(self, path=JOB_STORE_PATH, embedder=None, cache_size=JOB_CACHE_SIZE):
+        self.path = path
+        self.embedder = embedder
+        self.hits = 0
+        self.misses = 0
+        self._prepared = LRUCache(max_size=cache_size, ttl=0)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, language TEXT NOT NULL, "
+            "job_description TEXT NOT NULL, job_title TEXT NOT NULL, requirements TEXT NOT NULL, "
+            "artifacts TEXT NOT NULL, embedding_model TEXT, vectors BLOB, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _row(self, job_id, language, job_description, details, now):
+        artifacts = prepare_artifacts(details['requirements'], language, self.embedder)
+        vectors = artifacts.pop('vectors')
+        embedding_model = artifacts.pop('embedding_model')
+        return (job_id, language, job_description, details['job_title'], json.dumps(details['requirements']),
+                json.dumps(artifacts), embedding_model,
+                None if vectors is None else np.asarray(vectors, dtype=np.float32).tobytes(), now, now)
+
+    def put_many(self, jobs):
+        """
+        Stores several postings in one transaction, replacing postings with the same ID.
+
+        Args:
+            jobs (list): Dicts with "job_description", "language" (name), "details" (the
+                extract_job_details result) and optionally "job_id".
+
+        Returns:
+            list: The ID of each posting.
+        """
+        now = time.time()
+        rows = []
+        for job in jobs:
+            job_id = str(job['job_id']) if job.get('job_id') else make_job_id(job['language'], job['job_description'])
+            if not JOB_ID_PATTERN.fullmatch(job_id):
+                raise ValueError(f"Invalid job_id: {job_id}")
+            rows.append(self._row(job_id, job['language'], job['job_description'], job['details'], now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO jobs (job_id, language, job_description, job_title, requirements, artifacts, "
+                "embedding_model, vectors, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET language = excluded.language, "
+                "job_description = excluded.job_description, job_title = excluded.job_title, "
+                "requirements = excluded.requirements, artifacts = excluded.artifacts, "
+                "embedding_model = excluded.embedding_model, vectors = excluded.vectors, updated = excluded.updated",
+                rows,
+            )
+            self._conn.commit()
+        for row in rows:
+            self._prepared.delete(row[0])
+        return [row[0] for row in rows]
+
+    def put(self, job_description, language, details, job_id=None):
+        """
+        Stores one posting (see put_many).
+
+        Returns:
+            str: The posting ID.
+        """
+        return self.put_many([{'job_id': job_id, 'job_description': job_description, 'language': language, 'details': details}])[0]
+
+    def get(self, job_id):
+        """
+        Returns the PreparedJob of a posting, or None if the ID is unknown.
+        """
+        prepared = self._prepared.get(job_id)
+        if prepared is not None:
+            self.hits += 1
+            return prepared
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT language, job_description, job_title, requirements, artifacts, embedding_model, vectors "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        language, job_description, job_title, requirements, artifacts, embedding_model, vectors = row
+        artifacts = json.loads(artifacts)
+        texts = list(artifacts['normalized'])
+        rows = None
+        if vectors is not None and self.embedder and embedding_model == self.embedder.backend.name:
+            rows = dict(zip(texts, np.frombuffer(vectors, dtype=np.float32).reshape(len(texts), -1)))
+        prepared = PreparedJob(
+            job_id, language, job_description, job_title, json.loads(requirements),
+            [tuple(item) for item in artifacts['unique_requirements']], artifacts['normalized'],
+            {req: set(aliases) for req, aliases in artifacts['aliases'].items()}, rows,
+        )
+        self._prepared.set(job_id, prepared)
+        return prepared
+
+    def describe(self, job_id):
+        """
+        Returns the stored posting as a JSON-serializable dict, or None if the ID is unknown.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, language, job_title, requirements, job_description, created, updated FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {'job_id': row[0], 'language': row[1], 'job_title': row[2], 'requirements': json.loads(row[3]),
+                'job_description': row[4], 'created': row[5], 'updated': row[6]}
+
+    def list(self, limit=100, offset=0):
+        """
+        Returns:
+            list: ID, language and title of stored postings, most recently updated first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, language, job_title, updated FROM jobs ORDER BY updated DESC, job_id LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [{'job_id': job_id, 'language': language, 'job_title': job_title, 'updated': updated}
+                for job_id, language, job_title, updated in rows]
+
+    def delete(self, job_id):
+        """
+        Removes a posting. Returns True if it was present.
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+        self._prepared.delete(job_id)
+        return cursor.rowcount > 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Posting count, lookup counters and the in-memory prepared job count.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return {'backend': 'sqlite', 'entries': entries, 'prepared': self._prepared.stats()['entries'],
+                'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,275 @@
+import re
+import unicodedata
+
+from .automaton import AhoCorasick
+
+# --- English tables (the defaults, shared by the legacy matching functions) ---
+
+# Common abbreviations and aliases of requirements
+ABBREVIATIONS = {
+    "machine learning": ["ml"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "scikit-learn": ["scikitlearn", "sklearn"],
+    "postgresql": ["postgres", "sql"],
+    "bachelor's": ["bsc", "bachelor"],
+    "master's": ["msc", "master"],
+    "internship": ["intern", "project"],
+}
+
+# Fields of study accepted when the resume lists no explicit degree
+EDUCATION_FIELDS = ["computer science", "data science", "ai", "artificial intelligence"]
+
+# Fields of study compared between a requirement and a resume degree
+DEGREE_FIELDS = ["computer science", "data science", "ai", "artificial intelligence", "statistics", "engineering", "mechatronics", "mathematics"]
+
+DEGREE_PATTERNS = [re.compile(pat, flags=re.I) for pat in [
+    r"(bachelor[’'s]*\s*(of)?\s*(arts|science)?\s*in\s*[A-Za-z &]+)",
+    r"(master[’'s]*\s*(of)?\s*(arts|science)?\s*in\s*[A-Za-z &]+)",
+    r"(ph\.?d\.?\s*in\s*[A-Za-z &]+)",
+    r"(degree\s*in\s*[A-Za-z &]+)",
+    r"(diploma\s*in\s*[A-Za-z &]+)"
+]]
+
+# Words that count as experience when an experience requirement is not matched directly
+EXPERIENCE_SIGNALS = ["intern", "internship", "project"]
+
+STOPWORDS = [
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "but", "not", "have", "has", "will", "can", "all", "you", "your", "our", "they", "their", "job", "role", "work", "who", "what", "when", "where", "how", "why", "a", "an", "to", "of", "in", "on", "as", "by", "at", "is", "it", "be", "or", "we"
+]
+
+# Adjectives and filler phrases removed from requirements (regular expression alternatives)
+FILLER_PHRASES = [
+    "strong", "proven", "excellent", "nice to have", "preferred", "required", "plus", "solid", "good", "advanced", "basic", "familiar", "experience with", "knowledge of", "understanding of", "ability to", "must have", "should have", "demonstrated", "hands-on", "expertise in", "background in", "proficiency in", "skills in", "skills with", "working with", "working knowledge of", "including", r"etc\.?"
+]
+
+# --- French tables ---
+
+FRENCH_ABBREVIATIONS = {
+    "apprentissage automatique": ["machine learning", "ml"],
+    "intelligence artificielle": ["artificial intelligence", "ia", "ai"],
+    "traitement automatique du langage naturel": ["natural language processing", "tal", "nlp"],
+    "licence": ["bachelor", "bac+3"],
+    "master": ["mastère", "msc", "bac+5"],
+    "stage": ["stagiaire", "alternance", "internship", "intern"],
+    "informatique": ["computer science"],
+    "science des données": ["data science"],
+}
+
+FRENCH_EDUCATION_FIELDS = ["informatique", "science des données", "sciences des données", "intelligence artificielle", "ia"]
+
+FRENCH_DEGREE_FIELDS = FRENCH_EDUCATION_FIELDS + ["statistique", "ingénierie", "génie", "mathématiques", "mécatronique"]
+
+FRENCH_DEGREE_PATTERNS = [re.compile(pat, flags=re.I) for pat in [
+    r"(licence\s*(?:professionnelle\s*)?(?:en|d['’])\s*[^\W\d_][\w &'’-]+)",
+    r"(mast[eè]re?\s*(?:spécialisé\s*)?(?:en|de|d['’])\s*[^\W\d_][\w &'’-]+)",
+    r"(doctorat\s*(?:en|de|d['’])\s*[^\W\d_][\w &'’-]+)",
+    r"(dipl[oô]me\s*(?:d['’]ingénieur\s*)?(?:en|de|d['’])\s*[^\W\d_][\w &'’-]+)",
+]]
+
+FRENCH_EXPERIENCE_SIGNALS = ["stage", "stagiaire", "alternance", "projet"]
+
+FRENCH_STOPWORDS = [
+    "les", "des", "une", "pour", "avec", "dans", "sur", "par", "est", "sont", "qui", "que", "quoi", "aux", "nous", "vous",
+    "ils", "elles", "votre", "vos", "notre", "nos", "leur", "leurs", "ces", "cette", "son", "ses", "pas", "plus", "mais",
+    "ou", "et", "de", "du", "la", "le", "un", "en", "au", "il", "elle", "poste", "travail", "être", "avoir", "sera", "tout",
+]
+
+FRENCH_FILLER_PHRASES = [
+    r"bonnes? connaissances? (?:de|des|du|en)", r"connaissances? (?:de|des|du|en)", r"ma[iî]trise (?:de|des|du)",
+    r"exp[ée]riences? (?:avec|en|dans)", r"capacit[ée] [àa]", r"comp[ée]tences? en", r"solides?", r"excellente?s?",
+    r"souhait[ée]e?s?", r"requise?s?", r"appr[ée]ci[ée]e?s?", "un plus", r"id[ée]alement", "notamment",
+    r"avanc[ée]e?s?", "de base", r"etc\.?",
+]
+
+# --- Arabic tables ---
+
+ARABIC_ABBREVIATIONS = {
+    "تعلم الآلة": ["التعلم الآلي", "machine learning", "ml"],
+    "الذكاء الاصطناعي": ["artificial intelligence", "ai"],
+    "معالجة اللغة الطبيعية": ["natural language processing", "nlp"],
+    "بكالوريوس": ["ليسانس", "bachelor"],
+    "ماجستير": ["master"],
+    "تدريب": ["متدرب", "internship", "intern"],
+    "علوم الحاسوب": ["علوم الكمبيوتر", "علوم الحاسب", "computer science"],
+    "علم البيانات": ["علوم البيانات", "data science"],
+}
+
+ARABIC_EDUCATION_FIELDS = ["علوم الحاسوب", "علوم الكمبيوتر", "علوم الحاسب", "علم البيانات", "علوم البيانات", "الذكاء الاصطناعي"]
+
+ARABIC_DEGREE_FIELDS = ARABIC_EDUCATION_FIELDS + ["الإحصاء", "الهندسة", "الرياضيات"]
+
+ARABIC_DEGREE_PATTERNS = [re.compile(pat) for pat in [
+    r"((?:بكالوريوس|ليسانس)\s+(?:في\s+)?[^\W\d_][\w ]+)",
+    r"(ماجستير\s+(?:في\s+)?[^\W\d_][\w ]+)",
+    r"(دكتوراه\s+(?:في\s+)?[^\W\d_][\w ]+)",
+    r"((?:شهادة|دبلوم)\s+في\s+[^\W\d_][\w ]+)",
+]]
+
+ARABIC_EXPERIENCE_SIGNALS = ["تدريب", "متدرب", "مشروع", "مشاريع"]
+
+ARABIC_STOPWORDS = [
+    "في", "من", "على", "إلى", "عن", "مع", "هذا", "هذه", "ذلك", "التي", "الذي", "الذين", "كان", "كانت", "يكون", "أن",
+    "إن", "أو", "ثم", "كما", "لدى", "لدينا", "نحن", "أنت", "هو", "هي", "هم", "كل", "بعض", "غير", "عند", "حيث", "الوظيفة",
+    "العمل", "سوف", "قد", "لا", "ما", "و",
+]
+
+ARABIC_FILLER_PHRASES = [
+    "القدرة على", "خبرة في", "معرفة", "إجادة", "إتقان", "يفضل", "مطلوب", "قوية", "قوي", "ممتازة", "ممتاز", "جيدة", "جيد",
+    "متقدمة", "أساسية", "بما في ذلك", "مثل", "إلخ",
+]
+
+# --- Normalization ---
+
+_SEPARATORS = re.compile(r'[\s\-_/]')
+_WORDS = re.compile(r'\b\w+\b')
+_COMBINING_MARKS = re.compile(r'[\u0300-\u036f]')
+_LIGATURES = str.maketrans({"\u0153": "oe", "\u00e6": "ae"})
+# Harakat, superscript alef and Quranic marks, plus the tatweel (kashida) used to stretch words
+_ARABIC_MARKS = re.compile(r'[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+# Hamza-carrying alef forms, alef maqsura and ta marbuta are often used interchangeably
+_ARABIC_LETTERS = str.maketrans({"\u0623": "\u0627", "\u0625": "\u0627", "\u0622": "\u0627", "\u0671": "\u0627", "\u0649": "\u064a", "\u0629": "\u0647"})
+
+
+class LanguagePipeline:
+    """
+    Normalization and matching tables of one language, compiled once at import:
+    Unicode NFKC, case folding and the language's own folding (accents for French,
+    diacritics, tatweel and letter variants for Arabic), stopwords, requirement filler
+    phrases, aliases, fields of study, degree patterns and experience signals.
+
+    Args:
+        code (str): Language code.
+        stopwords (list): Words ignored by keyword extraction.
+        filler_phrases (list): Regular expression alternatives removed from requirements.
+        aliases (dict): Canonical requirement -> list of aliases.
+        education_fields (list): Fields accepted when the resume lists no explicit degree.
+        degree_fields (list): Fields compared between a requirement and a resume degree.
+        degree_patterns (list): Compiled patterns finding degrees in a resume.
+        master_words (list): Words of a master's degree, which satisfies a bachelor's requirement.
+        bachelor_words (list): Words of a bachelor's degree requirement.
+        experience_signals (list): Words that count as experience.
+        fold_accents (bool): Strip Latin accents.
+        arabic (bool): Strip Arabic diacritics and tatweel and unify letter variants.
+        normalize_aliases (bool): Match aliases by their normalized form, so that multi-word
+            aliases are found in the normalized resume. Off for English, whose aliases are
+            matched folded only, like is_semantic_match does.
+    """
+
+    def __init__(self, code, stopwords, filler_phrases, aliases, education_fields, degree_fields, degree_patterns,
+                 master_words, bachelor_words, experience_signals, fold_accents=False, arabic=False,
+                 normalize_aliases=True):
+        self.code = code
+        self.fold_accents = fold_accents
+        self.arabic = arabic
+        self.stopwords = frozenset(self.fold(word) for word in stopwords)
+        self.filler_pattern = re.compile(r'\b(' + '|'.join(filler_phrases) + r')\b', flags=re.I)
+        self.education_fields = [self.fold(field) for field in education_fields]
+        self.degree_fields = [self.fold(field) for field in degree_fields]
+        self.degree_patterns = degree_patterns
+        self.master_words = [self.fold(word) for word in master_words]
+        self.bachelor_words = [self.fold(word) for word in bachelor_words]
+        self.experience_signals = [self.fold(word) for word in experience_signals]
+
+        # Folded requirement -> forms, searched in the normalized resume, of every alias that satisfies it
+        alias_form = self.normalize_text if normalize_aliases else self.fold
+        self.alias_lookup = {}
+        for canonical, names in aliases.items():
+            group = [canonical] + names
+            normalized = {alias_form(name) for name in group}
+            for name in group:
+                self.alias_lookup.setdefault(self.fold(name), set()).update(normalized)
+        self.alias_automaton = AhoCorasick(alias for group in self.alias_lookup.values() for alias in group)
+
+    def fold(self, text):
+        """
+        Lowercases text and applies the language's Unicode folding.
+
+        Args:
+            text (str): Input text.
+
+        Returns:
+            str: Folded text.
+        """
+        if text.isascii():
+            return text.lower()
+        text = unicodedata.normalize("NFKC", text).casefold()
+        if self.fold_accents:
+            text = _COMBINING_MARKS.sub("", unicodedata.normalize("NFD", text)).translate(_LIGATURES)
+        if self.arabic:
+            text = _ARABIC_MARKS.sub("", text).translate(_ARABIC_LETTERS)
+        return text
+
+    def normalize_text(self, text):
+        """
+        Folds text and removes whitespace, hyphens, underscores and slashes.
+        """
+        return _SEPARATORS.sub("", self.fold(text))
+
+    def normalize_requirement(self, req):
+        """
+        Removes parentheticals, filler phrases, bullets and trailing punctuation from a requirement.
+        """
+        req = re.sub(r'\(.*?\)', '', req)
+        req = self.filler_pattern.sub('', req)
+        req = re.sub(r'[-–•]', '', req)
+        req = req.strip()
+        req = re.sub(r'[.,;:،؛]+$', '', req)
+        return req.strip()
+
+    def extract_keywords(self, text, top_n=20):
+        """
+        Returns the top_n most frequent folded words of text, excluding stopwords.
+        """
+        freq = {}
+        for word in _WORDS.findall(self.fold(text)):
+            if len(word) > 2 and word not in self.stopwords:
+                freq[word] = freq.get(word, 0) + 1
+        return [word for word, _ in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:top_n]]
+
+    def extract_degrees(self, resume_text):
+        """
+        Returns the degree strings found in a resume.
+        """
+        degrees = []
+        for pattern in self.degree_patterns:
+            for found in pattern.findall(resume_text):
+                degree = " ".join(found).strip() if isinstance(found, tuple) else found.strip()
+                if degree:
+                    degrees.append(degree)
+        return degrees
+
+
+PIPELINES = {
+    "en": LanguagePipeline("en", STOPWORDS, FILLER_PHRASES, ABBREVIATIONS, EDUCATION_FIELDS, DEGREE_FIELDS,
+                           DEGREE_PATTERNS, ["master"], ["bachelor"], EXPERIENCE_SIGNALS, normalize_aliases=False),
+    "fr": LanguagePipeline("fr", FRENCH_STOPWORDS + STOPWORDS, FRENCH_FILLER_PHRASES + FILLER_PHRASES,
+                           {**ABBREVIATIONS, **FRENCH_ABBREVIATIONS}, FRENCH_EDUCATION_FIELDS + EDUCATION_FIELDS,
+                           FRENCH_DEGREE_FIELDS + DEGREE_FIELDS, FRENCH_DEGREE_PATTERNS + DEGREE_PATTERNS,
+                           ["master", "mastère", "bac+5"], ["licence", "bachelor", "bac+3"],
+                           FRENCH_EXPERIENCE_SIGNALS + EXPERIENCE_SIGNALS, fold_accents=True),
+    "ar": LanguagePipeline("ar", ARABIC_STOPWORDS + STOPWORDS, ARABIC_FILLER_PHRASES + FILLER_PHRASES,
+                           {**ABBREVIATIONS, **ARABIC_ABBREVIATIONS}, ARABIC_EDUCATION_FIELDS + EDUCATION_FIELDS,
+                           ARABIC_DEGREE_FIELDS + DEGREE_FIELDS, ARABIC_DEGREE_PATTERNS + DEGREE_PATTERNS,
+                           ["ماجستير", "master"], ["بكالوريوس", "ليسانس", "bachelor"],
+                           ARABIC_EXPERIENCE_SIGNALS + EXPERIENCE_SIGNALS, arabic=True),
+}
+
+LANGUAGE_CODES = {"english": "en", "french": "fr", "arabic": "ar"}
+
+
+def get_pipeline(language=None):
+    """
+    Returns the normalization pipeline of a language.
+
+    Args:
+        language (str, optional): Language code ("en", "fr", "ar") or name ("French").
+            Defaults to English, which is also used for unknown languages.
+
+    Returns:
+        LanguagePipeline: The pipeline.
+    """
+    if not language:
+        return PIPELINES["en"]
+    code = language.lower()
+    return PIPELINES.get(LANGUAGE_CODES.get(code, code), PIPELINES["en"])
@@ -1,5 +1,7 @@
 import numpy as np
-import re
+from .automaton import AhoCorasick
+from .embeddings import chunk_text
+from .languages import ABBREVIATIONS, DEGREE_FIELDS, EDUCATION_FIELDS, get_pipeline
 from .text_processing import normalize_text
 
 def is_semantic_match(req, resume_text, embeddings_model=None, threshold=0.78):
@@ -32,17 +34,7 @@ def is_semantic_match(req, resume_text, embeddings_model=None, threshold=0.78):
             pass
 
     # Check for common abbreviations and aliases
-    ABBREVIATIONS = {
-        "machine learning": ["ml"],
-        "artificial intelligence": ["ai"],
-        "natural language processing": ["nlp"],
-        "scikit-learn": ["scikitlearn", "sklearn"],
-        "postgresql": ["postgres", "sql"],
-        "bachelor's": ["bsc", "bachelor"],
-        "master's": ["msc", "master"],
-        "internship": ["intern", "project"],
-    }
-    req_lc = req.lower()
+    req_lc = get_pipeline().fold(req)
     for canonical, aliases in ABBREVIATIONS.items():
         if req_lc == canonical or req_lc in aliases:
             for alias in [canonical] + aliases:
@@ -64,17 +56,29 @@ def education_match(req, resume_text):
     Returns:
         bool: True if match found, else False.
     """
-    req_lc = req.lower()
-    resume_lc = resume_text.lower()
+    fold = get_pipeline().fold
+    req_lc = fold(req)
+    resume_lc = fold(resume_text)
     # Master's degree satisfies Bachelor's requirement
     if "master" in resume_lc and "bachelor" in req_lc:
         return True
-    FIELDS = ["computer science", "data science", "ai", "artificial intelligence"]
-    for field in FIELDS:
-        if field in req_lc and any(f in resume_lc for f in FIELDS):
+    for field in EDUCATION_FIELDS:
+        if field in req_lc and any(f in resume_lc for f in EDUCATION_FIELDS):
             return True
     return False
 
+def extract_degrees(resume_text):
+    """
+    Extracts the degrees mentioned in a resume.
+
+    Args:
+        resume_text (str): Resume text.
+
+    Returns:
+        list: Degree strings found in the resume.
+    """
+    return get_pipeline().extract_degrees(resume_text)
+
 def education_semantic_match(req, resume_text, embeddings_model=None, threshold=0.78):
     """
     Checks if the education requirement semantically matches the resume text using degree patterns and optional embeddings.
@@ -88,17 +92,8 @@ def education_semantic_match(req, resume_text, embeddings_model=None, threshold=
     Returns:
         bool: True if match found, else False.
     """
-    degree_patterns = [
-        r"(bachelor[’'s]*\s*(of)?\s*(arts|science)?\s*in\s*[A-Za-z &]+)",
-        r"(master[’'s]*\s*(of)?\s*(arts|science)?\s*in\s*[A-Za-z &]+)",
-        r"(ph\.?d\.?\s*in\s*[A-Za-z &]+)",
-        r"(degree\s*in\s*[A-Za-z &]+)",
-        r"(diploma\s*in\s*[A-Za-z &]+)"
-    ]
-    resume_degrees = []
-    for pat in degree_patterns:
-        resume_degrees += re.findall(pat, resume_text, flags=re.I)
-    resume_degrees = [" ".join(tup).strip() for tup in resume_degrees if any(tup)]
+    resume_degrees = extract_degrees(resume_text)
+    fold = get_pipeline().fold
 
     if not resume_degrees:
         return education_match(req, resume_text)
@@ -115,10 +110,136 @@ def education_semantic_match(req, resume_text, embeddings_model=None, threshold=
                     return True
             except Exception:
                 pass
-        req_lc = req.lower()
-        deg_lc = degree.lower()
-        FIELDS = ["computer science", "data science", "ai", "artificial intelligence", "statistics", "engineering", "mechatronics", "mathematics"]
-        for field in FIELDS:
+        req_lc = fold(req)
+        deg_lc = fold(degree)
+        for field in DEGREE_FIELDS:
             if field in req_lc and field in deg_lc:
                 return True
     return False
+
+
+class ResumeIndex:
+    """
+    Precomputed views of a resume, built once and shared by every requirement matched against it.
+
+    Args:
+        resume_text (str): Resume text.
+        language (str, optional): Language code or name of the requirements. Defaults to English.
+    """
+
+    def __init__(self, resume_text, language=None):
+        pipeline = self.pipeline = get_pipeline(language)
+        self.text = resume_text
+        self.lower = pipeline.fold(resume_text)
+        # No token set: the normalized resume has no whitespace, so the requirement automaton
+        # scan of it also covers the partial word match of is_semantic_match
+        self.normalized = pipeline.normalize_text(resume_text)
+        self.aliases = pipeline.alias_automaton.find_all(self.normalized)
+        self.degrees = pipeline.extract_degrees(resume_text)
+        self.degrees_normalized = [pipeline.normalize_text(degree) for degree in self.degrees]
+        self.degrees_lower = [pipeline.fold(degree) for degree in self.degrees]
+        self.has_master = any(word in self.lower for word in pipeline.master_words)
+        self.has_education_field = any(field in self.lower for field in pipeline.education_fields)
+        self.has_experience_signal = any(word in self.lower for word in pipeline.experience_signals)
+        self._chunks = None
+
+    @property
+    def chunks(self):
+        """
+        Resume chunks (plus the extracted degrees) used for embedding similarity, computed on first use.
+        """
+        if self._chunks is None:
+            self._chunks = chunk_text(self.text) + self.degrees
+        return self._chunks
+
+    def education_match(self, req):
+        """
+        Same result as education_semantic_match(req, resume_text) without embeddings.
+
+        Args:
+            req (str): Education requirement.
+
+        Returns:
+            bool: True if match found, else False.
+        """
+        pipeline = self.pipeline
+        req_lc = pipeline.fold(req)
+        if not self.degrees:
+            if self.has_master and any(word in req_lc for word in pipeline.bachelor_words):
+                return True
+            return self.has_education_field and any(field in req_lc for field in pipeline.education_fields)
+
+        req_norm = pipeline.normalize_text(req)
+        for degree_norm, degree_lc in zip(self.degrees_normalized, self.degrees_lower):
+            if degree_norm in req_norm:
+                return True
+            if any(field in req_lc and field in degree_lc for field in pipeline.degree_fields):
+                return True
+        return False
+
+def match_requirements(requirements, index, embedder=None, threshold=0.78, prepared=None):
+    """
+    Matches requirements against an indexed resume in one batched pass.
+    For English, gives the same results as calling is_semantic_match and education_semantic_match
+    per requirement, but scans the resume once for all requirements instead of once per requirement.
+    With an embedder, requirements that do not match lexically are embedded together with the
+    resume chunks in one batch and match when their best chunk similarity exceeds the threshold.
+
+    Args:
+        requirements (list): List of (category, requirement) tuples.
+        index (ResumeIndex): Indexed resume.
+        embedder (CachedEmbedder, optional): Embedder for semantic similarity.
+        threshold (float): Similarity threshold.
+        prepared (PreparedJob, optional): Stored job the requirements come from, whose
+            precomputed normalized forms, aliases and vectors are used (see utils.job_store).
+
+    Returns:
+        tuple: (matched, missing) lists of (category, requirement) tuples.
+    """
+    pipeline = index.pipeline
+    if prepared is not None:
+        req_norms = prepared.normalized
+        automaton = prepared.automaton
+    else:
+        req_norms = {req: pipeline.normalize_text(req) for _, req in requirements}
+        automaton = AhoCorasick(req_norms.values())
+    # Every normalized requirement found in the normalized resume, in a single scan.
+    # This also covers the partial word match of is_semantic_match, since the
+    # normalized resume contains no whitespace to split on.
+    found = automaton.find_all(index.normalized)
+
+    def lexical_match(req):
+        req_norm = req_norms[req]
+        if not req_norm or req_norm in found:
+            return True
+        if prepared is not None:
+            return bool(prepared.aliases.get(req, set()) & index.aliases)
+        return bool(pipeline.alias_lookup.get(pipeline.fold(req), set()) & index.aliases)
+
+    matched = []
+    missing = []
+    for cat, req in requirements:
+        if cat == "Education" and index.education_match(req):
+            matched.append((cat, req))
+            continue
+        if cat == "Experience":
+            if lexical_match(req) or index.has_experience_signal:
+                matched.append((cat, req))
+            else:
+                missing.append((cat, req))
+            continue
+        if lexical_match(req):
+            matched.append((cat, req))
+        else:
+            missing.append((cat, req))
+
+    if embedder and missing:
+        similarities = embedder.max_similarities([req for _, req in missing], index.chunks,
+                                                 prepared.vectors if prepared is not None else None)
+        semantic = {item for item, sim in zip(missing, similarities) if sim > threshold}
+        if semantic:
+            # Keep matched requirements in their original order
+            selected = set(matched) | semantic
+            matched = [item for item in requirements if item in selected]
+            missing = [item for item in missing if item not in semantic]
+    return matched, missing
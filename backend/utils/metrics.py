@@ -0,0 +1,258 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            # Unlabeled metrics are exported as 0 before their first update
+            self._children[()] = self._new_child()
+
+    def labels(self, *values, **kwargs):
+        """
+        Returns the child metric for the given label values.
+        """
+        key = tuple(str(kwargs[name]) for name in self.labelnames) if kwargs else tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def render(self, name, labelnames, key):
+        return [f"{name}_total{_format_labels(labelnames, key)} {self._value}"]
+
+
+class Counter(_Metric):
+    """
+    Monotonic counter. Use labels(...).inc(), or inc() when it has no labels.
+    """
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+
+    def render(self, name, labelnames, key):
+        with self._lock:
+            lines = [f"{name}_bucket{_format_labels(labelnames, key, [('le', bound)])} {count}"
+                     for bound, count in zip(self._buckets, self._counts)]
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, [('le', '+Inf')])} {self._count}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, key)} {self._sum}")
+            lines.append(f"{name}_count{_format_labels(labelnames, key)} {self._count}")
+        return lines
+
+
+class Histogram(_Metric):
+    """
+    Histogram with cumulative buckets. Use labels(...).observe(value).
+    """
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class CallbackMetric:
+    """
+    Counter or gauge whose samples are read from a callback at scrape time, for values
+    that are already tracked elsewhere (cache hit counters, OCR queue depth).
+
+    Args:
+        name (str): Metric name.
+        help (str): Help text.
+        type (str): "counter" or "gauge".
+        labelnames (tuple): Label names.
+        callback (callable): Returns a dict of label value tuples to numbers.
+    """
+
+    def __init__(self, name, help, type, labelnames, callback):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self):
+        sample_name = f"{self.name}_total" if self.type == "counter" else self.name
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        try:
+            samples = self.callback()
+        except Exception:
+            samples = {}
+        for key, value in samples.items():
+            if value is not None:
+                lines.append(f"{sample_name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "coverly_stage_duration_seconds", "Time spent in each stage of request handling.", ["stage"]))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "coverly_request_duration_seconds", "Time spent handling HTTP requests.", ["endpoint", "status"]))
+MODEL_PROMPT_CHARS = REGISTRY.register(Histogram(
+    "coverly_model_prompt_chars", "Size of the prompts sent to the model, in characters.", ["kind"], SIZE_BUCKETS))
+MODEL_RESPONSE_CHARS = REGISTRY.register(Histogram(
+    "coverly_model_response_chars", "Size of the model responses, in characters.", ["kind"], SIZE_BUCKETS))
+EXTRACTION_FALLBACKS = REGISTRY.register(Counter(
+    "coverly_extraction_fallback_parses", "Extraction responses that were not valid JSON and needed the regex fallback."))
+PROMPT_REDUCTION = REGISTRY.register(Histogram(
+    "coverly_prompt_compaction_reduction", "Fraction of the cover letter prompt inputs removed by compaction.",
+    buckets=(0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1)))
+COALESCED_CALLS = REGISTRY.register(Counter(
+    "coverly_model_calls_coalesced", "Model calls that shared an identical call already in flight instead of sending their own.", ["kind"]))
+PDF_PAGES_SKIPPED = REGISTRY.register(Counter(
+    "coverly_pdf_pages_skipped", "PDF pages left out of the extracted text because they timed out or failed.", ["reason"]))
+
+
+@contextmanager
+def observe_stage(stage):
+    """
+    Records how long the enclosed block takes in the stage duration histogram.
+
+    Args:
+        stage (str): Stage name.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def register_cache_metrics(caches):
+    """
+    Exports the entry counts and hit/miss counters of caches.
+
+    Args:
+        caches (dict): Cache name -> object with a stats() method.
+    """
+    def counters():
+        samples = {}
+        for name, cache in caches.items():
+            stats = cache.stats()
+            samples[(name, "hit")] = stats["hits"]
+            samples[(name, "miss")] = stats["misses"]
+        return samples
+
+    REGISTRY.register(CallbackMetric(
+        "coverly_cache_requests", "Cache lookups by result.", "counter", ["cache", "result"], counters))
+    REGISTRY.register(CallbackMetric(
+        "coverly_cache_entries", "Entries currently stored in each cache.", "gauge", ["cache"],
+        lambda: {(name,): cache.stats()["entries"] for name, cache in caches.items()}))
+
+
+def register_ocr_metrics(get_service):
+    """
+    Exports the queue depth, counters and latencies of the OCR service.
+
+    Args:
+        get_service (callable): Returns the OCR service.
+    """
+    def gauges():
+        stats = get_service().stats()
+        return {
+            ("in_flight",): stats["in_flight"],
+            ("queue_depth",): stats["queue_depth"],
+            ("latency_p50_ms",): stats["latency_ms"]["p50"],
+            ("latency_p95_ms",): stats["latency_ms"]["p95"],
+        }
+
+    def counters():
+        stats = get_service().stats()
+        return {(result,): stats[result] for result in ("completed", "failed", "rejected")}
+
+    REGISTRY.register(CallbackMetric("coverly_ocr", "State of the OCR worker pool.", "gauge", ["value"], gauges))
+    REGISTRY.register(CallbackMetric("coverly_ocr_jobs", "OCR jobs by outcome.", "counter", ["result"], counters))
@@ -1,24 +1,355 @@
+import io
+import math
+import os
+import shutil
+import signal
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
 from PyPDF2 import PdfReader
-from PIL import Image
+from PyPDF2.errors import PdfReadError
+from PIL import Image, ImageOps
 import pytesseract
 
-def extract_text_from_pdf(pdf_file):
+from .ingestion import CHUNK_SIZE, MAX_IMAGE_PIXELS, IngestionError, check_image_pixels, check_page_count
+from .metrics import PDF_PAGES_SKIPPED
+
+PDF_MAX_PAGES = int(os.getenv("COVERLY_PDF_MAX_PAGES", "20"))
+PDF_PAGE_TIMEOUT = float(os.getenv("COVERLY_PDF_PAGE_TIMEOUT", "20"))
+PDF_WORKERS = int(os.getenv("COVERLY_PDF_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Extra seconds the request waits for a page past its timeout before recycling a stuck worker
+PDF_TIMEOUT_GRACE = float(os.getenv("COVERLY_PDF_TIMEOUT_GRACE", "5"))
+OCR_DPI = int(os.getenv("COVERLY_OCR_DPI", "300"))
+# Longest side an image is downscaled to before OCR when it carries no DPI information (~300 DPI A4)
+OCR_MAX_SIDE = int(os.getenv("COVERLY_OCR_MAX_SIDE", "3508"))
+OCR_BINARIZE_THRESHOLD = int(os.getenv("COVERLY_OCR_BINARIZE_THRESHOLD", "160"))
+
+_pdf_pool = None
+# Reader of the PDF most recently opened by this process, reused across its pages
+_reader_cache = {}
+
+
+def preprocess_image(image):
+    """
+    Prepares an image for OCR: applies the EXIF orientation, downscales it to OCR_DPI
+    (or to OCR_MAX_SIDE when the image has no DPI), converts it to grayscale and binarizes it.
+    Smaller, two-tone images take Tesseract much less time without losing accuracy.
+
+    Args:
+        image (PIL.Image.Image): Image to prepare.
+
+    Returns:
+        PIL.Image.Image: Binarized grayscale image.
+    """
+    image = ImageOps.exif_transpose(image)
+    dpi = image.info.get("dpi", (0, 0))[0]
+    scale = OCR_DPI / dpi if dpi and dpi > OCR_DPI else 1.0
+    scale = min(scale, OCR_MAX_SIDE / max(image.size))
+    if scale < 1.0:
+        size = (max(int(image.width * scale), 1), max(int(image.height * scale), 1))
+        image = image.resize(size, Image.LANCZOS)
+    image = ImageOps.autocontrast(image.convert("L"))
+    return image.point(lambda value: 255 if value > OCR_BINARIZE_THRESHOLD else 0, mode="1")
+
+
+def ocr_image(image, timeout=PDF_PAGE_TIMEOUT):
+    """
+    Runs OCR on a preprocessed copy of an image. Shared by image uploads and scanned PDF pages.
+
+    Args:
+        image (PIL.Image.Image): Image to read.
+        timeout (float): Seconds after which Tesseract is stopped.
+
+    Returns:
+        str: Extracted text.
+
+    Raises:
+        DocumentTooLarge: If the image has more than COVERLY_MAX_IMAGE_PIXELS pixels.
+    """
+    # Checked before preprocessing, which is what decodes the pixels
+    check_image_pixels(*image.size)
+    return pytesseract.image_to_string(preprocess_image(image), timeout=timeout)
+
+
+def rasterize_pdf_page(pdf_path, page_number):
+    """
+    Renders a PDF page to an image for OCR. Uses pypdfium2 when installed, otherwise
+    falls back to the largest image embedded in the page, which is the scan itself
+    for most scanned PDFs. Rendering is scaled down so that the page stays within
+    COVERLY_MAX_IMAGE_PIXELS, and embedded images are checked before being decoded.
+
+    Args:
+        pdf_path (str): Path of the PDF file.
+        page_number (int): Zero-based page number.
+
+    Returns:
+        PIL.Image.Image or None: Page image, or None if the page cannot be rendered.
+
+    Raises:
+        DocumentTooLarge: If an embedded image has too many pixels.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            page = pdf[page_number]
+            width, height = page.get_size()
+            # pdfium rounds the rendered size up, so leave a pixel of margin on each side
+            scale = min(OCR_DPI / 72, math.sqrt(MAX_IMAGE_PIXELS / max(width * height, 1)) * 0.999)
+            return page.render(scale=scale).to_pil()
+        finally:
+            pdf.close()
+
+    page = _open_reader(pdf_path).pages[page_number]
+    # page.images decodes every image, so their declared sizes are checked first
+    x_objects = page.get("/Resources", {}).get("/XObject", {})
+    for x_object in x_objects.values():
+        x_object = x_object.get_object()
+        if x_object.get("/Subtype") == "/Image":
+            check_image_pixels(int(x_object.get("/Width", 0)), int(x_object.get("/Height", 0)))
+    images = [Image.open(io.BytesIO(image.data)) for image in page.images]
+    if not images:
+        return None
+    return max(images, key=lambda image: image.width * image.height)
+
+
+def _open_reader(pdf_path):
+    reader = _reader_cache.get(pdf_path)
+    if reader is None:
+        _reader_cache.clear()
+        reader = _reader_cache[pdf_path] = PdfReader(pdf_path)
+    return reader
+
+
+def read_page(pdf_path, page_number):
+    """
+    Reads one PDF page for the worker processes: its text layer or, for a scan, the page
+    rendered for OCR, which the caller sends to the OCR service.
+
+    Args:
+        pdf_path (str): Path of the PDF file.
+        page_number (int): Zero-based page number.
+
+    Returns:
+        str or bytes: Page text, or the page rendered as a grayscale PNG when it has no text layer.
+    """
+    page_text = _open_reader(pdf_path).pages[page_number].extract_text()
+    if page_text and page_text.strip():
+        return page_text
+    image = rasterize_pdf_page(pdf_path, page_number)
+    if image is None:
+        return ""
+    buffer = io.BytesIO()
+    # The DPI lets preprocess_image scale the scan like it does for image uploads
+    image.convert("L").save(buffer, format="PNG", **({'dpi': image.info['dpi']} if 'dpi' in image.info else {}))
+    return buffer.getvalue()
+
+
+def extract_page_text(pdf_path, page_number):
     """
-    Extracts text from a PDF file.
+    Extracts the text of one PDF page in this process, falling back to OCR when the page has no text layer.
+
+    Args:
+        pdf_path (str): Path of the PDF file.
+        page_number (int): Zero-based page number.
+
+    Returns:
+        str: Extracted page text.
+    """
+    page = read_page(pdf_path, page_number)
+    return ocr_image(Image.open(io.BytesIO(page))) if isinstance(page, bytes) else page
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pdf_pool
+
+
+def shutdown_pdf_pool(wait=True):
+    """
+    Stops the PDF page worker processes. The pool is recreated on next use.
+
+    Args:
+        wait (bool): Wait for running pages to finish.
+    """
+    global _pdf_pool
+    pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class PageTimeoutError(Exception):
+    """Raised in a PDF worker when a page takes longer than its timeout."""
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeoutError()
+
+
+def _with_page_timeout(fn, pdf_path, page_number, timeout):
+    # The alarm stops a page stuck in Python code (e.g. PyPDF2 on a pathological content
+    # stream), so the process is free for the next page or request. Tesseract is stopped
+    # by its own timeout; no alarm where SIGALRM is missing (Windows) or off the main thread.
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return fn(pdf_path, page_number)
+    previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(pdf_path, page_number)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _read_page_in_worker(pdf_path, page_number, timeout):
+    return _with_page_timeout(read_page, pdf_path, page_number, timeout)
+
+
+def _skip_page(reason):
+    PDF_PAGES_SKIPPED.labels(reason=reason).inc()
+    return ""
+
+
+def _extract_page_or_skip(pdf_path, page_number, timeout):
+    # In-process variant: a page that fails or times out is skipped like in the pool
+    try:
+        return _with_page_timeout(extract_page_text, pdf_path, page_number, timeout)
+    except IngestionError:
+        raise
+    except PageTimeoutError:
+        return _skip_page("timeout")
+    except Exception:
+        return _skip_page("error")
+
+
+def _ocr_scanned_pages(pages):
+    # Imported here because ocr_service imports this module
+    from .ocr_service import OCRBusyError, get_ocr_service
+
+    service = get_ocr_service()
+    scans = [number for number, page in enumerate(pages) if isinstance(page, bytes)]
+    if not scans:
+        return pages
+
+    def read(number):
+        try:
+            return service.extract_text(pages[number])
+        except (IngestionError, OCRBusyError):
+            raise
+        except FutureTimeoutError:
+            return _skip_page("timeout")
+        except Exception:
+            return _skip_page("error")
+
+    # The service bounds the OCR processes; one thread per service worker keeps them all busy
+    with ThreadPoolExecutor(max_workers=min(service.workers, len(scans))) as executor:
+        for number, text in zip(scans, executor.map(read, scans)):
+            pages[number] = text
+    return pages
+
+
+def _recycle_pdf_pool(pool):
+    # A worker stuck in native code (rendering, decoding) ignores the alarm; terminate the
+    # pool's processes so it does not occupy them for later requests. Pages of other
+    # requests running in this pool fail and are skipped.
+    global _pdf_pool
+    if _pdf_pool is pool:
+        _pdf_pool = None
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _extract_pages_parallel(pdf_path, page_count, timeout):
+    global _pdf_pool
+    pool = _get_pdf_pool()
+    futures = [pool.submit(_read_page_in_worker, pdf_path, number, timeout) for number in range(page_count)]
+    pages = []
+    stuck = False
+    try:
+        for future in futures:
+            try:
+                pages.append(future.result(timeout=timeout + PDF_TIMEOUT_GRACE))
+            except IngestionError:
+                raise
+            except PageTimeoutError:
+                pages.append(_skip_page("timeout"))
+            except FutureTimeoutError:
+                # The worker did not stop at its alarm; skip the page instead of blocking the request
+                stuck = True
+                pages.append(_skip_page("timeout"))
+            except BrokenProcessPool:
+                # The pool was recycled by another request, or a worker crashed on this PDF
+                if _pdf_pool is pool:
+                    _pdf_pool = None
+                pages.append(_skip_page("error"))
+            except Exception:
+                # A page PyPDF2 or the renderer fails on is skipped like a page that times out
+                pages.append(_skip_page("error"))
+    finally:
+        for future in futures:
+            future.cancel()
+        if stuck:
+            _recycle_pdf_pool(pool)
+    return pages
+
+
+def extract_text_from_pdf(pdf_file, max_pages=PDF_MAX_PAGES, page_timeout=PDF_PAGE_TIMEOUT, parallel=True):
+    """
+    Extracts text from a PDF file page by page in the PDF worker processes, each page with
+    its own timeout. Pages without a text layer (scans) are rendered in the workers and read
+    by the shared OCR service (see utils.ocr_service).
+    The file is copied to disk in chunks and only the page count is read before pages
+    are processed one at a time, so memory does not grow with the size of the PDF.
 
     Args:
         pdf_file (file-like object): The uploaded PDF file.
+        max_pages (int): Only the first max_pages pages are read.
+        page_timeout (float): Seconds after which a page is stopped and skipped. Pages that
+            fail to parse or OCR are skipped too.
+        parallel (bool): Whether to use the worker processes. False reads the pages and runs
+            OCR in this process, e.g. for profiling.
 
     Returns:
-        str: Extracted text from the PDF.
-    """
-    reader = PdfReader(pdf_file)
-    text = ""
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text
-    return text
+        str: Extracted text from the PDF, with a form feed at each page break.
+
+    Raises:
+        IngestionError: If the PDF cannot be read.
+        OCRBusyError: If a scanned page cannot be queued in the OCR service.
+        DocumentTooLarge: If the PDF has more than COVERLY_MAX_DOCUMENT_PAGES pages, or a
+            scanned page an image with too many pixels.
+    """
+    # Workers open the PDF from a path instead of receiving its bytes for every page
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    try:
+        with tmp:
+            shutil.copyfileobj(pdf_file, tmp, CHUNK_SIZE)
+        try:
+            page_count = len(PdfReader(tmp.name).pages)
+        except PdfReadError as e:
+            raise IngestionError(f'The PDF could not be read: {e}')
+        check_page_count(page_count)
+        page_count = min(page_count, max_pages)
+
+        if parallel:
+            pages = _ocr_scanned_pages(_extract_pages_parallel(tmp.name, page_count, page_timeout))
+        else:
+            pages = [_extract_page_or_skip(tmp.name, number, page_timeout) for number in range(page_count)]
+    finally:
+        _reader_cache.pop(tmp.name, None)
+        os.remove(tmp.name)
+    # Form feeds mark page breaks, so that compaction can tell headers and footers apart
+    return "\n\f".join(page for page in pages if page)
+
 
 def extract_text_from_image(image_file):
     """
@@ -31,5 +362,5 @@ def extract_text_from_image(image_file):
         str: Extracted text from the image.
     """
     image = Image.open(image_file)
-    text = pytesseract.image_to_string(image)
-    return text
\ No newline at end of file
+    text = ocr_image(image)
+    return text
@@ -0,0 +1,167 @@
+import io
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from .ocr import ocr_image, PDF_PAGE_TIMEOUT
+
+OCR_WORKERS = int(os.getenv("COVERLY_OCR_WORKERS", str(min(os.cpu_count() or 1, 2))))
+OCR_MAX_QUEUE = int(os.getenv("COVERLY_OCR_MAX_QUEUE", "8"))
+OCR_QUEUE_WAIT = float(os.getenv("COVERLY_OCR_QUEUE_WAIT", "0.5"))
+OCR_TIMEOUT = float(os.getenv("COVERLY_OCR_TIMEOUT", str(PDF_PAGE_TIMEOUT)))
+OCR_RETRY_AFTER = int(os.getenv("COVERLY_OCR_RETRY_AFTER", "5"))
+
+
+class OCRBusyError(RuntimeError):
+    """Raised when the OCR pool and its queue are full. Routes answer 503 with Retry-After."""
+
+    def __init__(self, retry_after=OCR_RETRY_AFTER):
+        super().__init__("The OCR service is busy. Please try again shortly.")
+        self.retry_after = retry_after
+
+
+def _ocr_worker(image_bytes, timeout):
+    start = time.perf_counter()
+    text = ocr_image(Image.open(io.BytesIO(image_bytes)), timeout=timeout)
+    return text, time.perf_counter() - start
+
+
+class OCRService:
+    """
+    Runs image OCR in a fixed-size process pool so that Tesseract never runs in, or
+    starves, the request threads. At most workers + max_queue images are accepted at
+    a time; further requests wait up to queue_wait seconds and are then rejected.
+
+    Args:
+        workers (int): Number of OCR processes.
+        max_queue (int): Number of images allowed to wait for a free process.
+        queue_wait (float): Seconds to wait for a slot before rejecting.
+        timeout (float): Seconds after which Tesseract is stopped.
+    """
+
+    def __init__(self, workers=OCR_WORKERS, max_queue=OCR_MAX_QUEUE, queue_wait=OCR_QUEUE_WAIT, timeout=OCR_TIMEOUT):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_wait = queue_wait
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1000)
+        self._processing = deque(maxlen=1000)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def extract_text(self, image_bytes):
+        """
+        Extracts text from an encoded image.
+
+        Args:
+            image_bytes (bytes): Uploaded image content.
+
+        Returns:
+            str: Extracted text.
+
+        Raises:
+            OCRBusyError: If the pool and queue are full.
+        """
+        if not self._slots.acquire(timeout=self.queue_wait):
+            with self._lock:
+                self._rejected += 1
+            raise OCRBusyError()
+
+        start = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._get_pool().submit(_ocr_worker, image_bytes, self.timeout)
+            # Tesseract stops itself after the timeout; the margin covers queueing and decoding
+            text, processing = future.result(timeout=self.timeout * 2)
+        except BrokenProcessPool:
+            with self._lock:
+                self._pool = None
+                self._failed += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        with self._lock:
+            self._completed += 1
+            self._latencies.append(time.perf_counter() - start)
+            self._processing.append(processing)
+        return text
+
+    def shutdown(self, wait=True):
+        """
+        Stops the OCR processes. The pool is recreated on next use.
+
+        Args:
+            wait (bool): Wait for running jobs to finish.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Pool size, queue depth, counters and latency percentiles in milliseconds.
+        """
+        def percentile(values, q):
+            if not values:
+                return None
+            ordered = sorted(values)
+            return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+        with self._lock:
+            latencies = list(self._latencies)
+            processing = list(self._processing)
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': min(self._pending, self.workers),
+                'queue_depth': max(self._pending - self.workers, 0),
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'latency_ms': {'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95)},
+                'processing_ms': {'p50': percentile(processing, 0.5), 'p95': percentile(processing, 0.95)},
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service():
+    """
+    Returns the OCR service shared by the whole backend process, creating it on first use.
+
+    Returns:
+        OCRService: The shared service.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OCRService()
+        return _service
@@ -0,0 +1,191 @@
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import shutil
+import threading
+import time
+import tracemalloc
+import uuid
+
+# Profile every cover letter request (only for local investigation; profiled requests run their stages one by one)
+PROFILE_ALL = os.getenv("COVERLY_PROFILE", "0") == "1"
+# Requests sending this value in the X-Coverly-Profile header are profiled; unset disables the header
+PROFILE_TOKEN = os.getenv("COVERLY_PROFILE_TOKEN", "")
+PROFILE_DIR = os.getenv("COVERLY_PROFILE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles"))
+# Captures kept on disk; the oldest ones are removed beyond this
+PROFILE_KEEP = int(os.getenv("COVERLY_PROFILE_KEEP", "20"))
+# Captures only hold the hashes and sizes of the inputs, which are candidates' documents; with 1 the
+# resume, job description and extracted text are also saved, so that the capture replays on its own
+PROFILE_INPUTS = os.getenv("COVERLY_PROFILE_INPUTS", "0") == "1"
+PROFILE_TOP_ALLOCATIONS = int(os.getenv("COVERLY_PROFILE_TOP_ALLOCATIONS", "30"))
+PROFILE_HEADER = "X-Coverly-Profile"
+
+# tracemalloc is process-wide, so only one request is captured at a time
+_capture_lock = threading.Lock()
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def profiling_requested(headers):
+    """
+    Tells whether a request should be profiled, from COVERLY_PROFILE or the admin header.
+
+    Args:
+        headers: Request headers.
+
+    Returns:
+        bool: True if the request should be profiled.
+    """
+    if PROFILE_ALL:
+        return True
+    value = headers.get(PROFILE_HEADER)
+    return bool(PROFILE_TOKEN and value) and hmac.compare_digest(value.encode(), PROFILE_TOKEN.encode())
+
+
+def rotate_captures(directory=PROFILE_DIR, keep=PROFILE_KEEP):
+    """
+    Removes the oldest captures of a directory so that at most keep remain.
+
+    Returns:
+        int: Number of removed captures.
+    """
+    captures = sorted(name for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name, "manifest.json")))
+    removed = captures[:max(len(captures) - keep, 0)]
+    for name in removed:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return len(removed)
+
+
+class ProfileCapture:
+    """
+    cProfile and tracemalloc capture of a single request, written to its own directory of
+    PROFILE_DIR: the raw profile (profile.prof), a text summary (profile.txt), the top
+    allocations (allocations.txt) and a manifest with the input hashes, sizes and stage timings.
+    Inputs recorded with record_* are only saved under inputs/ when COVERLY_PROFILE_INPUTS=1.
+    Used as a context manager around the profiled work.
+
+    Args:
+        route (str): Name of the profiled route.
+        directory (str): Directory holding the captures.
+        keep_inputs (bool): Save the inputs themselves, not only their hashes.
+    """
+
+    def __init__(self, route, directory=PROFILE_DIR, keep_inputs=PROFILE_INPUTS):
+        self.route = route
+        self.capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(directory, self.capture_id)
+        self.directory = directory
+        self.keep_inputs = keep_inputs
+        self.manifest = {'capture_id': self.capture_id, 'route': route, 'created': time.time(), 'inputs': {}}
+        self._profile = cProfile.Profile()
+        self._started = None
+        self._traced = False
+
+    @classmethod
+    def for_request(cls, headers, route):
+        """
+        Returns a capture if the request should be profiled and no other capture is running, else None.
+        """
+        if not profiling_requested(headers) or not _capture_lock.acquire(blocking=False):
+            return None
+        return cls(route)
+
+    def _input_path(self, name):
+        path = os.path.join(self.path, "inputs", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def record_upload(self, upload):
+        """
+        Records the hash, type and size of the resume upload, and saves it in chunks if inputs are kept.
+
+        Args:
+            upload (Upload): Spooled upload, rewound afterwards.
+        """
+        entry = {'sha256': upload.sha256, 'kind': upload.kind, 'size': upload.size}
+        if self.keep_inputs:
+            entry['file'] = f"resume.{upload.kind}"
+            with open(self._input_path(entry['file']), "wb") as f:
+                shutil.copyfileobj(upload.open(), f)
+            upload.open()
+        self.manifest['inputs']['resume'] = entry
+
+    def record_text(self, name, text):
+        """
+        Records the hash and length of a text input, and saves it if inputs are kept.
+        """
+        if text is None:
+            return
+        entry = {'sha256': sha256_text(text), 'chars': len(text)}
+        if self.keep_inputs:
+            entry['file'] = f"{name}.txt"
+            with open(self._input_path(entry['file']), "w", encoding="utf-8") as f:
+                f.write(text)
+        self.manifest['inputs'][name] = entry
+
+    def record_json(self, name, data):
+        """
+        Records the hash of a JSON-serializable input, such as the extracted job details, and saves it if inputs are kept.
+        """
+        content = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        entry = {'sha256': sha256_text(content)}
+        if self.keep_inputs:
+            entry['file'] = f"{name}.json"
+            with open(self._input_path(entry['file']), "w", encoding="utf-8") as f:
+                f.write(content)
+        self.manifest['inputs'][name] = entry
+
+    def __enter__(self):
+        os.makedirs(self.path, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._traced = True
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profile.disable()
+        try:
+            self.manifest['elapsed_ms'] = round((time.perf_counter() - self._started) * 1000, 2)
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            self.manifest['traced_memory'] = {'current_bytes': current, 'peak_bytes': peak}
+            if exc is not None:
+                self.manifest['error'] = f"{exc_type.__name__}: {exc}"
+            self._write(snapshot)
+        finally:
+            if self._traced:
+                tracemalloc.stop()
+            _capture_lock.release()
+        return False
+
+    def _write(self, snapshot):
+        self._profile.dump_stats(os.path.join(self.path, "profile.prof"))
+        summary = io.StringIO()
+        pstats.Stats(self._profile, stream=summary).sort_stats("cumulative").print_stats(60)
+        with open(os.path.join(self.path, "profile.txt"), "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        with open(os.path.join(self.path, "allocations.txt"), "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    def save(self, **fields):
+        """
+        Adds fields (e.g. the stage timings and response status) to the manifest, writes it
+        and removes the oldest captures beyond COVERLY_PROFILE_KEEP.
+        """
+        self.manifest.update(fields)
+        with open(os.path.join(self.path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        rotate_captures(self.directory)
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from .execution import STAGE_TIMEOUT
+
+MODEL_PROVIDER = os.getenv("COVERLY_MODEL_PROVIDER", "gemini")
+MODEL_NAME = os.getenv("COVERLY_MODEL_NAME", "models/gemini-1.5-flash-latest")
+FAKE_LATENCY = float(os.getenv("COVERLY_FAKE_LATENCY", "0"))
+FAKE_LETTER_LATENCY = os.getenv("COVERLY_FAKE_LETTER_LATENCY")
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_gemini():
+    """
+    Configures the Gemini client with GENAI_API_KEY, once per process.
+
+    Raises:
+        RuntimeError: If GENAI_API_KEY is not set.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        api_key = os.getenv("GENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("GENAI_API_KEY not set in environment variables or .env file.")
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _configured = True
+
+
+class GeminiProvider:
+    """
+    Model provider backed by the Gemini API.
+
+    Args:
+        model_name (str): Gemini model name.
+        timeout (float): Request timeout in seconds.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, timeout=STAGE_TIMEOUT):
+        configure_gemini()
+        import google.generativeai as genai
+        self.name = f"gemini:{model_name}"
+        self.timeout = timeout
+        self._model = genai.GenerativeModel(model_name)
+
+    def _generation_config(self, schema):
+        if schema is None:
+            return None
+        return {"response_mime_type": "application/json", "response_schema": schema}
+
+    def generate(self, prompt, kind=None, schema=None):
+        """
+        Sends a prompt and returns the full response text.
+
+        Args:
+            prompt (str): Prompt text.
+            kind (str, optional): Kind of prompt ("extraction" or "cover_letter").
+            schema (dict, optional): JSON schema the response must follow. The response
+                is then a JSON document.
+
+        Returns:
+            str: Response text.
+        """
+        response = self._model.generate_content(prompt, generation_config=self._generation_config(schema),
+                                                request_options={'timeout': self.timeout})
+        return response.text
+
+    def stream(self, prompt, kind=None):
+        """
+        Sends a prompt and yields the response text as it is generated.
+
+        Args:
+            prompt (str): Prompt text.
+            kind (str, optional): Kind of prompt.
+
+        Yields:
+            str: Text chunks.
+        """
+        response = self._model.generate_content(prompt, stream=True, request_options={'timeout': self.timeout})
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    async def generate_async(self, prompt, kind=None, schema=None):
+        """
+        Awaitable variant of generate() on the client's shared asynchronous channel.
+        """
+        response = await self._model.generate_content_async(prompt, generation_config=self._generation_config(schema),
+                                                            request_options={'timeout': self.timeout})
+        return response.text
+
+    async def stream_async(self, prompt, kind=None):
+        """
+        Asynchronous variant of stream().
+        """
+        response = await self._model.generate_content_async(prompt, stream=True, request_options={'timeout': self.timeout})
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+FAKE_RESPONSES = {
+    "extraction": json.dumps({
+        "job_title": "Machine Learning Engineer",
+        "skills": ["Python", "Machine Learning", "Prompt Engineering"],
+        "tools": ["Docker", "AWS", "Kubernetes"],
+        "certifications": ["AWS Certified Solutions Architect"],
+        "education": ["Bachelor's in Computer Science"],
+        "experience": ["3+ years experience in software development"],
+    }),
+    "cover_letter": (
+        "Dear Hiring Manager,\n\n"
+        "I am excited to apply for this position. My experience building Python services, "
+        "deploying them with Docker on AWS and training machine learning models matches the "
+        "requirements of the role.\n\n"
+        "Thank you for your consideration.\n\nSincerely,\nJane Doe"
+    ),
+}
+
+
+class FakeProvider:
+    """
+    Deterministic local model provider with configurable latency and canned responses.
+    Needs no network, so the backend can be benchmarked and profiled offline.
+
+    Args:
+        latency (float or dict): Seconds per call, or a dict of kind -> seconds.
+        responses (dict, optional): Kind -> canned response text. Defaults to FAKE_RESPONSES.
+        chunks (int): Number of chunks a streamed response is split into.
+        jitter (float): Maximum random fraction added to the latency, from a seeded generator.
+        seed (int): Seed of the jitter generator.
+    """
+
+    def __init__(self, latency=0.0, responses=None, chunks=20, jitter=0.0, seed=0):
+        self.name = "fake"
+        self.latency = latency
+        self.responses = dict(FAKE_RESPONSES, **(responses or {}))
+        self.chunks = chunks
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self, kind):
+        latency = self.latency.get(kind, 0.0) if isinstance(self.latency, dict) else self.latency
+        with self._lock:
+            self.calls += 1
+            if self.jitter:
+                latency *= 1 + self._random.random() * self.jitter
+        return latency
+
+    def _response(self, kind):
+        return self.responses.get(kind, self.responses["cover_letter"])
+
+    def _chunks(self, text):
+        size = max(len(text) // self.chunks, 1)
+        return [text[start:start + size] for start in range(0, len(text), size)]
+
+    def generate(self, prompt, kind=None, schema=None):
+        """
+        Returns the canned response of kind after the configured latency.
+        """
+        time.sleep(self._delay(kind))
+        return self._response(kind)
+
+    def stream(self, prompt, kind=None):
+        """
+        Yields the canned response of kind in chunks, spreading the latency over them.
+        """
+        latency = self._delay(kind)
+        for chunk in self._chunks(self._response(kind)):
+            time.sleep(latency / self.chunks)
+            yield chunk
+
+    async def generate_async(self, prompt, kind=None, schema=None):
+        """
+        Awaitable variant of generate().
+        """
+        await asyncio.sleep(self._delay(kind))
+        return self._response(kind)
+
+    async def stream_async(self, prompt, kind=None):
+        """
+        Asynchronous variant of stream().
+        """
+        latency = self._delay(kind)
+        for chunk in self._chunks(self._response(kind)):
+            await asyncio.sleep(latency / self.chunks)
+            yield chunk
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(name=None):
+    """
+    Creates the model provider configured by COVERLY_MODEL_PROVIDER ("gemini" or "fake").
+
+    Args:
+        name (str, optional): Overrides the configured provider.
+
+    Returns:
+        GeminiProvider or FakeProvider: The provider.
+    """
+    name = name or MODEL_PROVIDER
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "fake":
+        latency = FAKE_LATENCY
+        if FAKE_LETTER_LATENCY is not None:
+            latency = {"extraction": FAKE_LATENCY, "cover_letter": float(FAKE_LETTER_LATENCY)}
+        return FakeProvider(latency=latency)
+    raise ValueError(f"Unknown model provider: {name}")
+
+
+def get_provider():
+    """
+    Returns the model provider shared by the whole process, creating it on first use.
+
+    Returns:
+        GeminiProvider or FakeProvider: The shared provider.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider()
+        return _provider
+
+
+def set_provider(provider):
+    """
+    Replaces the shared model provider, e.g. with a FakeProvider in benchmarks.
+
+    Args:
+        provider: Object with generate(prompt, kind, schema) and stream(prompt, kind) methods,
+            and their generate_async and stream_async variants for the ASGI app.
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,79 @@
+import os
+
+from .cache import SQLiteCache, CACHE_PATH, CACHE_TTL
+from .ocr import extract_text_from_pdf
+from .ocr_service import get_ocr_service
+from .metrics import observe_stage
+
+RESUME_CACHE_SIZE = int(os.getenv("COVERLY_RESUME_CACHE_SIZE", "512"))
+RESUME_CACHE_TTL = float(os.getenv("COVERLY_RESUME_CACHE_TTL", str(CACHE_TTL)))
+
+
+def extract_resume_text(upload):
+    """
+    Extracts text from a spooled resume upload. Images are read by the shared OCR service.
+
+    Args:
+        upload (Upload): Spooled upload, from utils.ingestion.spool_upload.
+
+    Returns:
+        str: Extracted resume text.
+    """
+    if upload.is_image:
+        with observe_stage('image_ocr'):
+            return get_ocr_service().extract_text(upload.read())
+    with observe_stage('pdf_extraction'):
+        return extract_text_from_pdf(upload.open())
+
+
+class ResumeStore:
+    """
+    On-disk store of extracted resume text, keyed by the SHA-256 of the uploaded bytes.
+    Uploading the same file again returns the stored text without running PDF extraction or OCR.
+
+    Args:
+        cache (SQLiteCache, optional): Backing cache. Defaults to the "resumes" table of the cache database.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or SQLiteCache(CACHE_PATH, table="resumes", max_size=RESUME_CACHE_SIZE, ttl=RESUME_CACHE_TTL)
+
+    def ingest(self, upload):
+        """
+        Returns the stored entry of a resume, extracting and storing its text on first upload.
+        The upload is closed afterwards.
+
+        Args:
+            upload (Upload): Spooled upload, from utils.ingestion.spool_upload.
+
+        Returns:
+            tuple: (resume_id, entry, cached) where entry holds "text" and "filename".
+        """
+        try:
+            resume_id = upload.sha256
+            entry = self.cache.get(resume_id)
+            if entry is not None:
+                return resume_id, entry, True
+
+            text = extract_resume_text(upload)
+            entry = {
+                'text': text,
+                'filename': upload.filename,
+            }
+            self.cache.set(resume_id, entry)
+            return resume_id, entry, False
+        finally:
+            upload.close()
+
+    def get(self, resume_id):
+        """
+        Returns the stored entry of a resume ID, or None if it is unknown or was evicted.
+        """
+        return self.cache.get(resume_id)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, limits and hit/miss counters of the store.
+        """
+        return self.cache.stats()
@@ -0,0 +1,74 @@
+def group_by_category(items):
+    """
+    Groups a list of (category, requirement) tuples by category.
+
+    Args:
+        items (list): List of (category, requirement) tuples.
+
+    Returns:
+        dict: Dictionary grouped by category.
+    """
+    grouped = {}
+    for cat, req in items:
+        grouped.setdefault(cat, []).append(req)
+    return grouped
+
+def build_job_fit_score(matched, missing, total_requirements):
+    """
+    Builds the job-fit score returned to the frontend from the matched and missing requirements.
+
+    Args:
+        matched (list): Matched (category, requirement) tuples.
+        missing (list): Missing (category, requirement) tuples.
+        total_requirements (int): Number of unique requirements.
+
+    Returns:
+        dict: Score, match level, explanation and the grouped matched/missing requirements.
+    """
+    matched_grouped = group_by_category(matched)
+    missing_grouped = group_by_category(missing)
+
+    # Clean up empty categories and sort
+    for group in [matched_grouped, missing_grouped]:
+        for cat in list(group.keys()):
+            group[cat] = sorted(set([r for r in group[cat] if r and len(r) < 120]))
+            if not group[cat]:
+                del group[cat]
+
+    # Calculate job-fit score
+    total = total_requirements if total_requirements else 1
+    score = int((len(matched) / total) * 100)
+    if score < 30:
+        match_level = "lowMatch"
+        match_icon = "🔴"
+        border_color = "red"
+        encouragement = "Consider tailoring your resume more closely to this role 💪"
+    elif score < 60:
+        match_level = "moderateMatch"
+        match_icon = "🟡"
+        border_color = "yellow"
+        encouragement = "Good start! You could improve your match by highlighting more relevant experience 🎯"
+    else:
+        match_level = "strongMatch"
+        match_icon = "🟢"
+        border_color = "green"
+        encouragement = "Great match! Your experience aligns well with this role 🎉"
+
+    return {
+        'score': score,
+        'match_level': match_level,
+        'match_icon': match_icon,
+        'border_color': border_color,
+        'explanation': [
+            f"Your resume matches {score}% of the job requirements.",
+            encouragement
+        ],
+        'keywords': {
+            'matched': [req for _, req in matched],
+            'missing': [req for _, req in missing]
+        },
+        'requirements': {
+            'matched': matched_grouped,
+            'missing': missing_grouped
+        }
+    }
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+
+from .execution import STAGE_TIMEOUT, StageTimeoutError
+from .metrics import COALESCED_CALLS
+
+# Kinds of model calls whose identical concurrent prompts share one call. Cover letters are
+# left out by default so that simultaneous regenerations still get different letters.
+COALESCE_KINDS = [kind for kind in os.getenv("COVERLY_COALESCE_KINDS", "extraction").split(",") if kind]
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Makes concurrent calls with the same key share one execution: the first caller runs
+    the function and the others wait for its result, or its exception. The key is
+    forgotten as soon as the call finishes, so failures are not remembered and later
+    calls run again.
+
+    Args:
+        name (str): Name used as the label of the coalesced calls counter.
+        timeout (float): Seconds a waiting caller waits for the shared result.
+    """
+
+    def __init__(self, name, timeout=STAGE_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        """
+        Runs fn(*args), or waits for the identical call already in flight.
+
+        Args:
+            key (str): Identity of the call, e.g. a hash of the prompt.
+            fn (callable): Function to run.
+
+        Returns:
+            The value returned by fn.
+
+        Raises:
+            StageTimeoutError: If a waiting caller gets no result within the timeout.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn(*args)
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        COALESCED_CALLS.labels(kind=self.name).inc()
+        if not call.done.wait(self.timeout):
+            raise StageTimeoutError(f"Timed out waiting for a shared '{self.name}' call")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        """
+        Returns:
+            int: Number of distinct calls currently running.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight. The shared call runs as a task, so a caller
+    that is cancelled (e.g. its client disconnected) does not cancel it for the others.
+
+    Args:
+        name (str): Name used as the label of the coalesced calls counter.
+        timeout (float): Seconds a caller waits for the shared result.
+    """
+
+    def __init__(self, name, timeout=STAGE_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self._calls = {}
+
+    async def do(self, key, fn, *args):
+        """
+        Awaits fn(*args), or the identical call already in flight.
+
+        Args:
+            key (str): Identity of the call, e.g. a hash of the prompt.
+            fn (callable): Coroutine function to run.
+
+        Returns:
+            The value returned by fn.
+
+        Raises:
+            StageTimeoutError: If no result arrives within the timeout.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            COALESCED_CALLS.labels(kind=self.name).inc()
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeoutError(f"Timed out waiting for a shared '{self.name}' call")
+
+    def in_flight(self):
+        """
+        Returns:
+            int: Number of distinct calls currently running.
+        """
+        return len(self._calls)
@@ -1,52 +1,71 @@
-import re
+from .languages import get_pipeline
 
-def extract_keywords(text, top_n=20):
+def extract_keywords(text, top_n=20, language=None):
     """
     Extracts the top N keywords from the given text, excluding common stopwords.
 
     Args:
         text (str): The input text to extract keywords from.
         top_n (int): Number of top keywords to return.
+        language (str, optional): Language code or name selecting the stopwords. Defaults to English.
 
     Returns:
         list: List of top N keywords.
     """
-    stopwords = set([
-        "the", "and", "for", "with", "that", "this", "from", "are", "was", "but", "not", "have", "has", "will", "can", "all", "you", "your", "our", "they", "their", "job", "role", "work", "who", "what", "when", "where", "how", "why", "a", "an", "to", "of", "in", "on", "as", "by", "at", "is", "it", "be", "or", "we"
-    ])
-    words = re.findall(r'\b\w+\b', text.lower())
-    words = [w for w in words if len(w) > 2 and w not in stopwords]
-    freq = {}
-    for w in words:
-        freq[w] = freq.get(w, 0) + 1
-    sorted_words = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-    return [w for w, _ in sorted_words[:top_n]]
+    return get_pipeline(language).extract_keywords(text, top_n)
 
-def normalize_requirement(req):
+def normalize_requirement(req, language=None):
     """
     Cleans and normalizes a requirement string by removing common adjectives, parentheticals, and punctuation.
 
     Args:
         req (str): The requirement string.
+        language (str, optional): Language code or name selecting the filler phrases. Defaults to English.
 
     Returns:
         str: Normalized requirement.
     """
-    req = re.sub(r'\(.*?\)', '', req)
-    req = re.sub(r'\b(strong|proven|excellent|nice to have|preferred|required|plus|solid|good|advanced|basic|familiar|experience with|knowledge of|understanding of|ability to|must have|should have|demonstrated|hands-on|expertise in|background in|proficiency in|skills in|skills with|working with|working knowledge of|including|etc\.?)\b', '', req, flags=re.I)
-    req = re.sub(r'[-–•]', '', req)
-    req = req.strip()
-    req = re.sub(r'[.,;:]+$', '', req)
-    return req
+    return get_pipeline(language).normalize_requirement(req)
 
-def normalize_text(text):
+def normalize_text(text, language=None):
     """
     Normalizes text by converting to lowercase and removing whitespace and special characters.
 
     Args:
         text (str): Input text.
+        language (str, optional): Language code or name selecting the Unicode folding. Defaults to English.
 
     Returns:
         str: Normalized text.
     """
-    return re.sub(r'[\s\-_/]', '', text.lower())
\ No newline at end of file
+    return get_pipeline(language).normalize_text(text)
+
+REQUIREMENT_CATEGORIES = ["skills", "tools", "certifications", "education", "experience"]
+
+def flatten_requirements(requirements_json, language=None):
+    """
+    Flattens requirements grouped by category into cleaned, de-duplicated (category, requirement) tuples.
+
+    Args:
+        requirements_json (dict): Requirements grouped by category, as extracted from the job description.
+        language (str, optional): Language of the requirements. Defaults to English.
+
+    Returns:
+        list: List of (category, requirement) tuples, with capitalized category names.
+    """
+    # Flatten and clean requirements
+    all_requirements = []
+    for cat in REQUIREMENT_CATEGORIES:
+        clean_items = [normalize_requirement(req, language) for req in requirements_json.get(cat, [])]
+        clean_items = [req for req in clean_items if req]
+        all_requirements.extend([(cat.capitalize(), req) for req in clean_items])
+
+    # Remove duplicates
+    seen = set()
+    unique_requirements = []
+    for cat, req in all_requirements:
+        key = (cat, req.lower())
+        if key not in seen:
+            seen.add(key)
+            unique_requirements.append((cat, req))
+    return unique_requirements
@@ -1,7 +1,6 @@
 // Smart Cover Letter Generator - Frontend (React + Tailwind)
 
 import React, { useState, useEffect } from "react";
-import axios from "axios";
 import { Toaster, toast } from "react-hot-toast";
 import { BiCopy } from "react-icons/bi";
 import { MdOutlineDone, MdOutlineDarkMode, MdOutlineLightMode, MdExpandMore, MdOutlineEdit, MdCheckCircle, MdErrorOutline, MdInfoOutline, MdOutlineDelete, MdDriveFileRenameOutline, MdOutlineFileDownload } from "react-icons/md";
@@ -168,6 +167,36 @@ async function fetchCompanyName(jobDescription) {
   }
 }
 
+// Posts the generation form to the streaming endpoint and calls onEvent(name, data)
+// for each server-sent event: "score", then one "token" per chunk, then "done" or "error".
+async function streamCoverLetter(formData, onEvent) {
+  const res = await fetch("http://localhost:5000/generate-cover-letter/stream", {
+    method: "POST",
+    body: formData,
+  });
+  if (!res.ok) {
+    const err = new Error(`Request failed with status ${res.status}`);
+    err.status = res.status;
+    throw err;
+  }
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const name = (raw.match(/^event: (.*)$/m) || [])[1];
+      const data = (raw.match(/^data: (.*)$/m) || [])[1];
+      if (name && data) onEvent(name, JSON.parse(data));
+    }
+  }
+}
+
 function saveLetterToHistory(letter, jobDescription, meta = {}) {
   const history = JSON.parse(localStorage.getItem("coverLetterHistory") || "[]");
   const entry = {
@@ -193,6 +222,7 @@ export default function App() {
   // --- State ---
   const [resumeFile, setResumeFile] = useState(null);
   const [resumeFileCache, setResumeFileCache] = useState(null);
+  const [resumeId, setResumeId] = useState(null);
   const [jobDescription, setJobDescription] = useState('');
   const [jobDescriptionCache, setJobDescriptionCache] = useState('');
   const [coverLetter, setCoverLetter] = useState('');
@@ -241,6 +271,7 @@ export default function App() {
   const handleResumeUpload = (file) => {
     setResumeFile(file);
     setResumeFileCache(file);
+    setResumeId(null);
   };
 
   const handleJobDescriptionChange = (desc) => {
@@ -256,7 +287,12 @@ export default function App() {
       return;
     }
     const formData = new FormData();
-    formData.append('resume', resumeToSend);
+    // The backend keeps the extracted resume text, so regenerations only send its ID
+    if (resumeId) {
+      formData.append('resume_id', resumeId);
+    } else {
+      formData.append('resume', resumeToSend);
+    }
     formData.append('job_description', jobDescToSend);
     formData.append('tone', selectedTone === "Custom" && customTone ? customTone : selectedTone);
     formData.append('language', language);
@@ -269,16 +305,28 @@ export default function App() {
     setCoverLetter(null);
     setJobFitScore(null);
     try {
-      const res = await axios.post('http://localhost:5000/generate-cover-letter', formData);
-      setCoverLetter(res.data.cover_letter);
-      setJobFitScore(res.data.job_fit_score);
+      let letter = "";
+      let streamError = null;
+      await streamCoverLetter(formData, (event, data) => {
+        if (event === "score") {
+          // The job-fit score arrives before the letter starts streaming
+          setResumeId(data.resume_id || null);
+          setJobFitScore(data.job_fit_score);
+        } else if (event === "token") {
+          letter += data.text;
+          setCoverLetter(letter);
+        } else if (event === "error") {
+          streamError = new Error(data.error);
+        }
+      });
+      if (streamError) throw streamError;
       setEditMode(false);
       setCopied(false);
       setEditedLetter('');
       toast.success(regenerate ? "Cover letter regenerated!" : "Cover letter generated!");
       const newId = Date.now();
       saveLetterToHistory(
-        res.data.cover_letter,
+        letter,
         jobDescToSend,
         { tone: selectedTone, jobType: jobTitle, company: companyName, id: newId }
       );
@@ -286,6 +334,10 @@ export default function App() {
       setHistory(getHistory());
     } catch (err) {
       console.error(err);
+      if (err.status === 404) {
+        // The stored resume expired; upload the file again on the next attempt
+        setResumeId(null);
+      }
       setError("Something went wrong.");
     } finally {
       setLoading(false);
@@ -294,11 +346,12 @@ export default function App() {
 
   // --- Scroll to output after generation ---
   const outputRef = React.useRef(null);
+  const hasCoverLetter = Boolean(coverLetter);
   useEffect(() => {
-    if (coverLetter && outputRef.current) {
+    if (hasCoverLetter && outputRef.current) {
       outputRef.current.scrollIntoView({ behavior: "smooth", block: "start" });
     }
-  }, [coverLetter]);
+  }, [hasCoverLetter]);
 
   // --- Calculate rating after generation ---
   useEffect(() => {
@@ -311,7 +364,8 @@ export default function App() {
 
   // --- Save to history on new letter ---
   useEffect(() => {
-    if (coverLetter && jobDescription && currentHistoryId === null) {
+    // Wait for a streamed letter to finish before saving it
+    if (coverLetter && jobDescription && currentHistoryId === null && !loading) {
       const newId = Date.now();
       saveLetterToHistory(coverLetter, jobDescription, { tone: selectedTone, jobType: jobTitle, company: companyName, id: newId });
       setCurrentHistoryId(newId);
@@ -697,7 +751,7 @@ export default function App() {
                     file.type === "image/jpeg" ||
                     file.type === "image/jpg"
                   )) {
-                    setResumeFile(file);
+                    handleResumeUpload(file);
                   } else {
                     toast.error(t('form.resumeUpload.error'));
                   }
@@ -717,7 +771,7 @@ export default function App() {
                       file.type === "image/jpeg" ||
                       file.type === "image/jpg"
                     )) {
-                      setResumeFile(file);
+                      handleResumeUpload(file);
                     } else {
                       toast.error(t('form.resumeUpload.error'));
                     }